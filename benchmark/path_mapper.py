@@ -0,0 +1,66 @@
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from colorpicker import PathMapper
+
+'''
+media -> data パス変換のマイクロベンチマーク
+旧実装（findall + str.replace のループ）と PathMapper の1パスあたりの処理時間を比較する
+
+usage:
+    python benchmark/path_mapper.py [パス数] [試行回数]
+'''
+
+MEDIA_PATTERN = r'(.+)[\\/](.+)\.jpg'
+DATA_TEMPLATE = '{1}/PNG/{2}.png'
+MEDIA_DIR = os.path.join(os.path.sep + 'nas', 'project', 'media')
+DATA_DIR = os.path.join(os.path.sep + 'nas', 'project', 'data')
+
+def legacy(media_re, data_re, data_pattern, media_dir, data_dir):
+    '''旧実装 ColorPickerUtil.media_filepath_to_data_filepath
+    '''
+    def media_filepath_to_data_filepath(media_filepath):
+        data_filepath = data_pattern
+        media_m = media_re.findall(media_filepath)[0]
+        i = 0
+        while(data_re.search(data_filepath)):
+            data_filepath = data_filepath.replace('{' + str(i + 1) + '}', media_m[i])
+            i = i + 1
+        return data_filepath.replace(media_dir, data_dir)
+    return media_filepath_to_data_filepath
+
+def measure(name, func, count, repeat, setup = None):
+    '''repeat 回実行して最短時間を表示する
+    '''
+    elapsed = None
+    for _ in range(repeat):
+        if setup: setup()
+        t = time.perf_counter()
+        result = func()
+        e = time.perf_counter() - t
+        elapsed = e if elapsed is None else min(elapsed, e)
+    print('{:<24} {:8.3f} s  {:8.1f} ns/path'.format(name, elapsed, elapsed / count * 1e9))
+    return result
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    paths = [os.path.join(MEDIA_DIR, '{:04d}'.format(i // 1000), '{:06d}.jpg'.format(i)) for i in range(count)]
+
+    old = legacy(re.compile(MEDIA_PATTERN), re.compile(r'\{([0-9])\}'), DATA_TEMPLATE.replace('/', os.path.sep), MEDIA_DIR, DATA_DIR)
+
+    mapper = PathMapper(MEDIA_PATTERN, DATA_TEMPLATE, MEDIA_DIR, DATA_DIR)
+    # 毎回キャッシュを空にして計測する
+    clear = lambda: setattr(mapper, 'data_dir', DATA_DIR)
+
+    print('{} paths, best of {}'.format(count, repeat))
+    expected = measure('legacy (per call)', lambda: [old(p) for p in paths], count, repeat)
+    measure('PathMapper.map', lambda: [mapper.map(p) for p in paths], count, repeat, clear)
+    measure('PathMapper (no cache)', lambda: mapper._map_batch(paths), count, repeat)
+    actual = measure('PathMapper.map_all', lambda: mapper.map_all(paths), count, repeat, clear)
+    measure('PathMapper.map_all (hit)', lambda: mapper.map_all(paths), count, repeat)
+    assert actual == expected
@@ -1,1259 +1,4723 @@
-import glob
-import json
-import os
-import platform
-import re
-import subprocess
-import sys
-
-from collections import defaultdict
-from enum import Enum
-from threading import Timer
-
-from PyQt5.QtCore import QPoint
-from PyQt5.QtCore import QRect
-from PyQt5.QtCore import QRectF
-from PyQt5.QtCore import QSize
-from PyQt5.QtCore import Qt
-from PyQt5.QtCore import pyqtSignal
-from PyQt5.QtGui import QBrush
-from PyQt5.QtGui import QFont
-from PyQt5.QtGui import QKeySequence
-from PyQt5.QtGui import QPixmap
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtWidgets import QComboBox
-from PyQt5.QtWidgets import QDialog
-from PyQt5.QtWidgets import QFileDialog
-from PyQt5.QtWidgets import QGraphicsItem
-from PyQt5.QtWidgets import QGraphicsPixmapItem
-from PyQt5.QtWidgets import QGraphicsScene
-from PyQt5.QtWidgets import QGraphicsSimpleTextItem
-from PyQt5.QtWidgets import QGraphicsView
-from PyQt5.QtWidgets import QGridLayout
-from PyQt5.QtWidgets import QHBoxLayout
-from PyQt5.QtWidgets import QLabel
-from PyQt5.QtWidgets import QLineEdit
-from PyQt5.QtWidgets import QMainWindow
-from PyQt5.QtWidgets import QPushButton
-from PyQt5.QtWidgets import QSlider
-from PyQt5.QtWidgets import QSizePolicy
-from PyQt5.QtWidgets import QVBoxLayout
-from PyQt5.QtWidgets import QWidget
-
-'''
-セグメンテーション支援ツール
-カスタマイズされたPythonが外部ファイルをimportさせてくれないので、
-無理やり一つのファイルにまとめた。超見辛い。
-
-auther:
-    nabedroid <nabedroid@gmail.com>
-version:
-    1.00
-date:
-    31 Dec 2019
-TODO:
-    設定メニューを実装したい
-        色->オブジェクト名の追加・削除、透過率変更、グリッド幅の変更
-'''
-
-class ConfigFormatError(Exception):
-    '''コンフィグエラークラス
-    コンフィグファイルの設定値に漏れがある場合に使用
-    '''
-
-    def __init__(self, filepath, item):
-        '''コンストラクタ
-        Args:
-            filepath (str): configファイルパス
-            item (str): 項目
-        '''
-        self.message = '{} is not found in {}'.format(item, filepath)
-
-class QColorPickerDialog(QFileDialog):
-    '''QFileDialog拡張クラス
-    ファイルパスのセパレーターをOSに準拠したセパレーターに変換して返す
-    '''
-    @classmethod
-    def getExistingDirectory(self, parent = None, caption = '', dir = '', options = QFileDialog.ShowDirsOnly):
-        dir = super().getExistingDirectory(parent, caption, dir, options)
-        return dir.replace('/', os.path.sep)
-    @classmethod
-    def getOpenFileName(self, parent = None, caption = '', dir = '', filter = '', selectedFilter = None, options = QFileDialog.Options()):
-        f = super().getOpenFileName(parent, caption, dir, filter, selectedFilter, options)
-        return f[0].replace('/', os.path.sep)
-
-class ColorPickerUtil():
-    '''Utilクラス
-    クラスに依存しない機能を集めたクラス
-    '''
-
-    __singleton = None
-    '''シングルトン
-    マルチスレッドには非対応
-    '''
-
-    def __new__(cls):
-        '''__init__の前処理
-        一度だけインスタンスを生成する
-        '''
-        if cls.__singleton == None:
-            cls.__singleton = super().__new__(cls)
-        return cls.__singleton
-
-    def __init__(self):
-        '''コンストラクタ
-        不明な色の場合のオブジェクト名を初期化
-        '''
-        # 不明な色の場合は"?"
-        self._color_dic = defaultdict(lambda: '?')
-        self._data_re = re.compile(r'\{([0-9])\}')
-        self._data_dir = None
-        self._media_dir = None
-        # OSに応じてビューアー実行コマンドを選択
-        pf = platform.system()
-        if pf == 'Windows':
-            self._os_imageviewer = lambda filepath: subprocess.run(args = [filepath], shell = True)
-        elif pf == 'Darwin':
-            self._os_imageviewer = lambda filepath: subprocess.run(args = [filepath])
-        elif pf == 'Linux':
-            self._os_imageviewer = lambda filepath: subprocess.run(args = [filepath])
-        else:
-            raise Exception('unknwon os')
-
-    def load(self, filepath):
-        '''コンフィグ読み込み
-        config.json を読み込み各種プロパティを初期化する
-        設定値に漏れがある場合はエラーを投げる
-
-        Args:
-            filepath (str): コンフィグファイルのパス
-        Raises:
-            ConfigFormatError: 設定値に漏れがあった場合
-        '''
-        self._color_dic.clear()
-        self._media_dir = None
-        self._data_dir = None
-        with open(filepath) as f:
-            j = json.load(f)
-            # colors
-            colors = j.get('colors')
-            if not colors: raise ConfigFormatError(filepath, 'colors')
-            for name in colors:
-                self._color_dic[int(colors[name], 16)] = name
-            # media_filepath_to_data_filepath
-            patterns = j.get('media_filepath_to_data_filepath')
-            if not patterns: raise ConfigFormatError(filepath, 'media_filepath_to_data_filepath')
-            self._media_re = re.compile(patterns[0])
-            self._data_pattern = patterns[1].replace('\\', os.path.sep).replace('/', os.path.sep)
-            # media_extension
-            self._media_extension = j.get('media_extension')
-            if not self._media_extension: raise ConfigFormatError(filepath, 'media_extension')
-            # data_extension
-            self._data_extension = j.get('data_extension')
-            if not self._data_extension: raise ConfigFormatError(filepath, 'data_extension')
-
-    @property
-    def color_dic(self):
-        return self._color_dic
-
-    @property
-    def media_dir(self):
-        return self._media_dir
-
-    @media_dir.setter
-    def media_dir(self, media_dir):
-        self._media_dir = media_dir
-
-    @property
-    def data_dir(self):
-        return self._data_extension
-
-    @data_dir.setter
-    def data_dir(self, data_dir):
-        self._data_extension = data_dir
-
-    def get_media_filepaths(self, media_filepath):
-        '''mediaファイル一覧取得
-        mediaファイルの一覧を取得する
-
-        Args:
-            media_filepath (str): mediaファイルの基底パス
-        Return:
-            list: mediaファイルの一覧
-        '''
-        return glob.glob(os.path.join(media_filepath, '**', '*' + self._media_extension), recursive = True)
-
-    def media_filepath_to_data_filepath(self, media_filepath):
-        '''media filepath -> data filepath
-        設定ファイルの置き換え情報を元にmediaファイルパスをdataファイルパスに変換する
-        処理にセンスの欠片もない
-
-        Args:
-            media_filepath (str): mediaファイルのパス
-        Return:
-            str: dataファイルのパス
-        '''
-        data_filepath = self._data_pattern
-        media_m = self._media_re.findall(media_filepath)[0]
-        i = 0
-        while(self._data_re.search(data_filepath)):
-            data_filepath = data_filepath.replace('{' + str(i + 1) + '}', media_m[i])
-            i = i + 1
-        return data_filepath.replace(self._media_dir, self._data_extension)
-
-    def color_to_object_name(self, color):
-        '''color -> object name
-        色（0xRRGGBB）をオブジェクト名に変換する
-
-        Args:
-            color (int): RGB
-        Return:
-            str: オブジェクト名
-        '''
-        return self._color_dic[color]
-    
-    def exe_os_imageviewer(self, filepath):
-        '''イメージビューアー起動
-        OSに準拠したイメージビューアーを起動する
-
-        Args:
-            filepath (str): 画像ファイルのパス
-
-        TODO:
-            OS任せで拡張子に関連付けられたアプリケーションを起動しているだけなので、設定によってはビューアーが開かない可能性あり
-            MACで未検証
-        '''
-        # 空のファイルパスの場合は何もしない
-        if not filepath: return 0
-        return self._os_imageviewer(filepath)
-
-class QPixmapItem(QGraphicsPixmapItem):
-    '''QGaphicsPixmapItem拡張クラス
-    読み込んだ画像のファイルパスを保持し（なお使用していない模様）、指定ピクセルの色データをRGBで取得する
-    '''
-    def __init__(self, filepath = ''):
-        super().__init__()
-        self.filepath = filepath
-        self._image = None
-
-    @property
-    def filepath(self):
-        return self._filepath
-
-    @filepath.setter
-    def filepath(self, filepath):
-        '''filepath setter
-        ファイルパスの設定と同時にpixmapも設定する
-
-        Args:
-            filepath (str): media/dataファイルパス
-        '''
-        self._filepath = filepath
-        pixmap = QPixmap(filepath)
-        if pixmap:
-            self.setPixmap(pixmap)
-            self._image = pixmap.toImage()
-        else:
-            self.setPixmap(None)
-            self._image = None
-
-    def pixel(self, pos):
-        '''ピクセルの色取得
-        引数のQPointで指定されたピクセルの色（0xRRGGBB）を取得する
-
-        Args:
-            pos (QPoint): ピクセルの位置
-        Return:
-            int: RGB
-        '''
-        # 0xAARRGGBBからAlphaを取り除く
-        return self._image.pixel(pos) & 0x00FFFFFF
-    
-    @property
-    def image(self):
-        return self._image
-
-class QPopupItem(QGraphicsSimpleTextItem):
-    '''ポップアップアイテムクラス
-    クリックした位置に n 秒間テキストを表示する
-    QGraphicsTextItemを継承すると謎のmouseMoveEventが発生するので諦めた
-    '''
-    def __init__(self, text = ''):
-        super().__init__(text)
-        # Viewのscaleを無視して描画
-        self.setFlag(QGraphicsItem.ItemIgnoresTransformations, True)
-        self._background_brush = Qt.black
-        self._timer = None
-
-    def paint(self, painter, option, widget):
-        painter.fillRect(self.boundingRect(), self._background_brush)
-        super().paint(painter, option, widget)
-
-    def popup(self, text, pos, sec = 1.0):
-        '''ポップアップの表示
-        text を pos の位置に sec 秒間表示する
-
-        Args:
-            text (str): テキスト
-            pos (QPoint): 表示する位置
-            sec (:obj:`float`, optional): 表示する時間（デフォルトは1秒）
-        '''
-        # タイマーが開始していたらキャンセルして破棄
-        if self._timer: self._timer.cancel()
-        self.setText(text)
-        self.setPos(pos)
-        self.setVisible(True)
-        # sec秒後に非表示とするタイマー開始
-        self._timer = Timer(sec, lambda: self.setVisible(False))
-        self._timer.start()
-
-    def setTextBrush(self, brush):
-        self.setBrush(brush)
-
-    def setBackgroundBrush(self, brush):
-        self._background_brush = brush
-
-class QGridItem(QGraphicsItem):
-    '''グリッドクラス
-    グリッド線を表示するクラス
-    '''
-
-    def __init__(self, width = 100, height = 100, grid_color = Qt.gray, grid_gap = 20, grid_vertical_visible = False, grid_horizontal_visible = False, parent = None):
-        '''コンストラクタ
-        各種プロパティを初期化する
-
-        Args:
-            width (:obj:`int`, optional): 横幅
-            height (:obj:`int`, optional): 縦幅
-            grid_color (:obj:`QColor`, optional): グリッド線の色
-            grid_gap (:obj:`int`, optional): グリッド線の間隔
-            grid_vertical_visible (:obj:`bool`, optional): 縦線の表示有無
-            grid_horizontal_visible (:obj:`bool`, optional): 横線の表示有無
-            parent (QWidget): 親Widget？
-        '''
-        super().__init__(parent)
-        self._width = width
-        self._height = height
-        self.grid_vertical_visible = grid_vertical_visible
-        self.grid_horizontal_visible = grid_horizontal_visible
-        self.grid_color = grid_color
-        self.grid_gap = grid_gap
-
-    def boundingRect(self):
-        '''矩形の取得
-        短径の位置とサイズを取得する
-
-        Return:
-            QRectF: 0, 0, 横幅, 縦幅
-        '''
-        #pen_width = 1
-        #return QRectF(-width / 2 - pen_width / 2, -height / 2 - pen_width / 2, width + pen_width, height + pen_width)
-        return QRectF(0, 0, self._width, self._height)
-
-    @property
-    def width(self):
-        return self._width
-    
-    @width.setter
-    def width(self, width):
-        self._width = width
-    
-    @property
-    def height(self):
-        return self._height
-    
-    @height.setter
-    def height(self, height):
-        self._height = height
-
-    @property
-    def grid_color(self):
-        return self._grid_color
-
-    @grid_color.setter
-    def grid_color(self, color):
-        self._grid_color = color
-
-    @property
-    def grid_gap(self):
-        return self._grid_gap
-    
-    @grid_gap.setter
-    def grid_gap(self, grid_gap):
-        self._grid_gap = grid_gap
-
-    @property
-    def grid_vertical_visible(self):
-        return self._grid_vertical_visible
-    
-    @grid_vertical_visible.setter
-    def grid_vertical_visible(self, visible):
-        self._grid_vertical_visible = visible
-
-    @property
-    def grid_horizontal_visible(self):
-        return self._grid_horizontal_visible
-    
-    @grid_horizontal_visible.setter
-    def grid_horizontal_visible(self, visible):
-        self._grid_horizontal_visible = visible
-
-    def paint(self, painter, option, widget):
-        '''描画
-        グリッド線を描画する
-
-        Args:
-            painter (QPaint): ペイント
-            option (QOption): オプション
-            widget (QWidget): Widget
-        '''
-        gap = self.grid_gap
-        painter.setPen(self.grid_color)
-        if self.grid_horizontal_visible:
-            for h in range(gap, self._height, gap):
-                painter.drawLine(0, h, self._width, h)
-        if self.grid_vertical_visible:
-            for w in range(gap, self._width, gap):
-                painter.drawLine(w, 0, w, self._height)
-
-class QColorPickerScene(QGraphicsScene):
-    '''QGraphicsScene拡張クラス
-    画像部分を表示するSceneクラス
-    '''
-    def __init__(self):
-        '''コンストラクタ
-        UIとUtilの初期化を行う
-        '''
-        super().__init__()
-        self._util = ColorPickerUtil()
-        self.init_ui()
-    
-    def init_ui(self):
-        '''UI初期化
-        data/media画像アイテム、グリッドアイテム、ポップアップアイテムの初期化を行う
-        '''
-        self._data_pixmap_item = QPixmapItem()
-        self._data_pixmap_item.mousePressEvent = self.data_pixmap_click
-
-        self._media_pixmap_item = QPixmapItem()
-        self._media_pixmap_item.setOpacity(0)
-        self._media_pixmap_item.setParentItem(self._data_pixmap_item)
-
-        self._grid_item = QGridItem(grid_gap = 50, grid_horizontal_visible = True)
-        self._grid_item.setParentItem(self._data_pixmap_item)
-        self._grid_item.setVisible(False)
-
-        self._popup_item = QPopupItem()
-        self._popup_item.setParentItem(self._data_pixmap_item)
-        self._popup_item.setBackgroundBrush(Qt.white)
-        self._popup_item.setFont(QFont('ＭＳ ゴシック', 18, QFont.Bold))
-
-        self.addItem(self._data_pixmap_item)
-    
-    def data_pixmap_click(self, event):
-        '''画像クリックイベント
-        画像が読み込まれている場合はクリック位置の少し右にポップアップを表示する
-        '''
-        if not self._data_pixmap_item.pixmap(): return
-
-        color = self._data_pixmap_item.pixel(event.pos().toPoint())
-        self._popup_item.popup(self._util.color_to_object_name(color), QPoint(event.pos().x() + 15, event.pos().y()), 1.0)
-
-    @property
-    def data_filepath(self):
-        return self._data_pixmap_item.filepath
-    
-    @data_filepath.setter
-    def data_filepath(self, filepath):
-        '''data_filepath setter
-        data画像ファイルを設定する
-        更に画像ファイルのサイズを元にグリッドのサイズ変更も行う
-        '''
-        self._data_pixmap_item.filepath = filepath
-        if self._data_pixmap_item.pixmap():
-            self._grid_item.width = self._data_pixmap_item.pixmap().width()
-            self._grid_item.height = self._data_pixmap_item.pixmap().height()
-
-    @property
-    def media_filepath(self):
-        return self._media_pixmap_item.filepath
-    
-    @media_filepath.setter
-    def media_filepath(self, filepath):
-        self._media_pixmap_item.filepath = filepath
-
-    @property
-    def media_opacity(self):
-        return self._media_pixmap_item.opacity()
-    
-    @media_opacity.setter
-    def media_opacity(self, opacity):
-        self._media_pixmap_item.setOpacity(opacity)
-    
-    def setGridVisible(self, visible):
-        self._grid_item.setVisible(visible)
-    
-    def hasImage(self):
-        return (not self._data_pixmap_item.pixmap().isNull()) and (not self._media_pixmap_item.pixmap().isNull())
-
-class GView(QGraphicsView):
-    '''QGraphicsView拡張クラス
-    QQColorPickerSceneを表示するViewクラス
-    マウスホイールのズームアウトやドラッグ時のスクロール機能を持つ
-    '''
-
-    def __init__(self):
-        super().__init__()
-        # 移動前のマウス位置
-        self._old_mouse_point = None
-        # window fit フラグ
-        self._fitting = False
-
-        scene = QColorPickerScene()
-        self.setScene(scene)
-    
-        scene.setBackgroundBrush(Qt.lightGray)
-
-    def mousePressEvent(self, event):
-        '''クリックイベント
-        移動前のマウス位置を設定し、イベントを後続に渡す
-
-        Args:
-            event (QMouseEvent): マウスイベント
-        '''
-        self._old_mouse_point = event.pos()
-        super().mousePressEvent(event)
-
-    def mouseMoveEvent(self, event):
-        '''ドラッグイベント
-        マウスの移動距離に応じてスクロールさせる
-
-        Args:
-            event (QMouseEvent): マウスイベント
-        '''
-        off_x = self._old_mouse_point.x() - event.pos().x()
-        off_y = self._old_mouse_point.y() - event.pos().y()
-        off_x = off_x if abs(off_x) > 2 else 0
-        off_y = off_y if abs(off_y) > 2 else 0
-        
-        self.horizontalScrollBar().setValue(self.horizontalScrollBar().value() + off_x)
-        self.verticalScrollBar().setValue(self.verticalScrollBar().value() + off_y)
-
-        self._old_mouse_point = QPoint(event.pos().x(), event.pos().y())
-
-    def wheelEvent(self, event):
-        '''ホイールイベント
-        ホイールの動きに応じてズームイン、ズームアウトを行う
-        '''
-        if event.angleDelta().y() > 0:
-            self.zoom_in()
-        else:
-            self.zoom_out()
-
-    def zoom_in(self):
-        '''ズームイン
-        1.25倍にする
-
-        TODO:
-            マウス位置を中心にズームさせたい
-        '''
-        if not self._fitting: self.scale(1.25, 1.25)
-    
-    def zoom_out(self):
-        '''ズームアウト
-        0.8倍にする
-
-        TODO:
-            マウス位置を中心にズームアウトさせたい
-        '''
-        if not self._fitting: self.scale(0.8, 0.8)
-    
-    def zoom_reset(self):
-        '''ズームリセット
-        fit中でなければズームのリセットを行う
-        '''
-        if not self._fitting: self.resetTransform()
-
-    def fit_on(self):
-        '''Fit on
-        Window FitをONにする
-        TODO:
-            拡大してからFITさせると微妙な余白が生まれる
-        '''
-        self._fitting = True
-        self.hasImage()
-        self.fitInView(self.scene().sceneRect(), Qt.KeepAspectRatio)
-        
-        #self.fitInView(QRectF(self.contentsRect()), Qt.KeepAspectRatio)
-
-    def fit_off(self):
-        '''Fit off
-        Window FitをOFFにする
-        '''
-        self._fitting = False
-        self.resetTransform()
-    
-    def grid_on(self):
-        '''Grid on
-        グリッドを表示する
-        '''
-        self.scene().setGridVisible(True)
-    
-    def grid_off(self):
-        '''Grid off
-        グリッドを非表示にする
-        '''
-        self.scene().setGridVisible(False)
-
-    def hasImage(self):
-        return self.scene().hasImage()
-
-class QIndexLabel(QLabel):
-    '''インデックスラベル
-    現在のインデックス／全体の形式でラベルを表示する
-    '''
-    def __init__(self, parent = None):
-        super().__init__(parent)
-        self._index = 0
-        self._max_index = 0
-
-    @property
-    def index(self):
-        return self._index
-    
-    @index.setter
-    def index(self, index):
-        self._index = index
-        self.setText('{:03d}/{:03d}'.format(self._index, self._max_index))
-    
-    @property
-    def max_index(self):
-        return self._max_index
-    
-    @max_index.setter
-    def max_index(self, max_index):
-        self._max_index = max_index
-        self.setText('{:03d}/{:03d}'.format(self._index, self._max_index))
-
-class MainWindow(QMainWindow):
-    '''メインウィンドウクラス
-    メニュー、メニューバー、ボタン、スライダーを持つ
-    '''
-    def __init__(self, parent = None):
-        '''コンストラクタ
-        主にイベントの関連付けを行う
-
-        Args:
-            parent (QWidget): 親ウィジェット
-        '''
-        super().__init__()
-        self._project_open_dialog = QProjectOpenDialog(parent = self)
-        self._key_config_dialog = QKeyConfigDialog(parent = self)
-        self._keyconfig = ColorPickerKeyConfig()
-        self._util = ColorPickerUtil()
-        self._media_filepaths = None
-
-        # ui初期化
-        self.init_ui()
-        # event初期化
-        # menu
-        self._open_act.triggered.connect(self.on_file_open)
-        self._quit_act.triggered.connect(self.close)
-        self._zoom_in_act.triggered.connect(self._gview.zoom_in)
-        self._zoom_out_act.triggered.connect(self._gview.zoom_out)
-        self._zoom_reset_act.triggered.connect(self._gview.zoom_reset)
-        self._fit_act.toggled.connect(lambda checked: self._gview.fit_on() if checked else self._gview.fit_off())
-        self._grid_act.toggled.connect(lambda checked: self._gview.grid_on() if checked else self._gview.grid_off())
-        self._key_config_act.triggered.connect(self.on_key_config)
-        # button
-        for b in self._index_buttons:
-            b.clicked.connect(self.on_index_button_click)
-        self._media_button.clicked.connect(self.on_media_button_click)
-        self._data_button.clicked.connect(self.on_data_button_click)
-        # slider
-        self._slider.valueChanged[int].connect(self.on_slider_change)
-
-    def init_ui(self):
-        '''UIの初期化
-        メニュー、メニューバー、ボタン、スライダーにおけるUI関連の初期化を行う
-        '''
-        # file menu
-        self._file_menu = self.menuBar().addMenu('&File')
-        self._open_act = self._file_menu.addAction(self.tr('Project &Open'))
-        self._open_act.setShortcut(QKeySequence.Open)
-        self._open_act.setStatusTip('select directory with data, media and config.json')
-        self._file_menu.addSeparator()
-        self._quit_act = self._file_menu.addAction(self.tr('&Quit'))
-        self._quit_act.setShortcut(QKeySequence.Quit)
-        # view menu
-        self._view_menu = self.menuBar().addMenu(self.tr('&View'))
-        self._zoom_in_act = self._view_menu.addAction(self.tr('Zoom &In'))
-        #self._zoom_in_act.setShortcut(QKeySequence.ZoomIn)
-        self._zoom_in_act.setShortcut(self._keyconfig.zoom_in)
-        self._zoom_in_act.setEnabled(False)
-        self._zoom_out_act = self._view_menu.addAction(self.tr('Zoom &Out'))
-        self._zoom_out_act.setShortcut(self._keyconfig.zoom_out)
-        self._zoom_out_act.setEnabled(False)
-        self._zoom_reset_act = self._view_menu.addAction(self.tr('Zoom &Reset'))
-        self._zoom_reset_act.setShortcut(self._keyconfig.zoom_reset)
-        self._zoom_reset_act.setEnabled(False)
-        self._fit_act = self._view_menu.addAction(self.tr('&Fit Window'))
-        self._fit_act.setShortcut(self._keyconfig.fit)
-        self._fit_act.setCheckable(True)
-        self._fit_act.setEnabled(False)
-        self._view_menu.addSeparator()
-        self._grid_act = self._view_menu.addAction(self.tr('Grid'))
-        self._grid_act.setShortcut(self._keyconfig.grid)
-        self._grid_act.setCheckable(True)
-        self._grid_act.setEnabled(False)
-        # setting menu
-        self._setting_menu = self.menuBar().addMenu(self.tr('&Setting'))
-        self._key_config_act = self._setting_menu.addAction(self.tr('&Key Config'))
-        # slider
-        self._slider = QSlider(Qt.Vertical)
-        self._slider.setMaximum(10)
-        # index label
-        self._index_label = QIndexLabel()
-        self._index_label.setAlignment(Qt.AlignCenter)
-        # button
-        self._index_buttons = [QPushButton("{:+d}".format(num)) for num in [-100, -5, -1, 1, 5, 100]]
-        self._media_button = QPushButton('media')
-        self._data_button = QPushButton('data')
-        # image view
-        self._gview = GView()
-        # layout
-        lower = QHBoxLayout()
-        lower.addWidget(self._media_button)
-        lower.addWidget(self._index_buttons[0])
-        lower.addWidget(self._index_buttons[1])
-        lower.addWidget(self._index_buttons[2])
-        lower.addWidget(self._index_label)
-        lower.addWidget(self._index_buttons[3])
-        lower.addWidget(self._index_buttons[4])
-        lower.addWidget(self._index_buttons[5])
-        lower.addWidget(self._data_button)
-        upper = QHBoxLayout()
-        upper.addWidget(self._gview)
-        upper.addWidget(self._slider)
-        layout = QVBoxLayout()
-        layout.addLayout(upper)
-        layout.addLayout(lower)
-        w = QWidget()
-        w.setLayout(layout)
-    
-        self.setCentralWidget(w)
-        self.statusBar().showMessage('')
-
-    def keyPressEvent(self, event):
-        '''キー押下イベント
-        インデックスを1戻す
-        インデックスを1進める
-        透過率を最大/最小に切り替える
-        '''
-        key = self._keyconfig.keyevent_to_keysquence(event).toString()
-        if key == self._keyconfig.next:
-            self._index_buttons[3].clicked.emit()
-        elif key == self._keyconfig.prev:
-            self._index_buttons[2].clicked.emit()
-        elif key == self._keyconfig.opacity:
-            if self._slider.value() < 10:
-                self._slider.setValue(10)
-            else:
-                self._slider.setValue(0)
-
-    def on_index_button_click(self):
-        '''インデックスボタンクリック
-        インデックスの増減を行う
-        最大（最小）を逸脱する場合は最大（最小）に補正して設定する
-        '''
-        if not self._media_filepaths: return
-        index = self._index_label.index
-        button = int(self.sender().text())
-        new_index = index + button
-
-        if new_index >= len(self._media_filepaths):
-            new_index = len(self._media_filepaths)
-        elif new_index <= 0:
-            new_index = 1
-        # media/data画像の更新
-        scene = self._gview.scene()
-        scene.media_filepath = self._media_filepaths[new_index - 1]
-        scene.data_filepath = self._util.media_filepath_to_data_filepath(self._media_filepaths[new_index - 1])
-        # インデックスラベルの更新
-        self._index_label.index = new_index
-        # ウィンドウファイルパスの更新
-        self.setWindowFilePath(self._media_filepaths[new_index - 1])
-        # viewメニューの活性状態更新
-        self._update_view_act()
-
-    def on_media_button_click(self):
-        '''mediaボタン押下
-        外部のビューアーでmedia画像を表示する
-        '''
-        self._util.exe_os_imageviewer(self._gview.scene().media_filepath)
-    
-    def on_data_button_click(self):
-        '''dataボタン押下
-        外部のビューアーでdata画像を表示する
-        '''
-        self._util.exe_os_imageviewer(self._gview.scene().data_filepath)
-
-    def on_file_open(self):
-        '''project open
-        プロジェクト選択ダイアログを表示し、
-        '''
-        # プロジェクトオープンダイアログを開く
-        result = self._project_open_dialog.exec()
-        # cancel もしくは不正な入力だった場合何もしない
-        if result == QDialog.Rejected: return
-        # ファイルを読み込む
-        self._util.load(self._project_open_dialog.config())
-        self._util.media_dir = self._project_open_dialog.media()
-        self._util.data_dir = self._project_open_dialog.data()
-        self._media_filepaths = self._util.get_media_filepaths(self._project_open_dialog.media())
-        # インデックスを0に戻してから+1ボタンシグナルを発火
-        self._index_label.index = 0
-        self._index_label.max_index = len(self._media_filepaths)
-        self._index_buttons[3].clicked.emit()
-
-    def on_slider_change(self, value):
-        '''スライダーチェンジ
-        スライダーの増減に応じて透過率を設定する
-
-        Args:
-            value (QSliderEvent): スライダーイベント
-        '''
-        self._gview.scene().media_opacity = value / 10
-    
-    def on_key_config(self):
-        print(self._key_config_dialog.result())
-        self._key_config_dialog.exec()
-        print(self._key_config_dialog.result())
-        if self._key_config_dialog.result() == QDialog.Accepted:
-            print(self._keyconfig.zoom_reset)
-            self._zoom_in_act.setShortcut(self._keyconfig.zoom_reset)
-            self._zoom_out_act.setShortcut(self._keyconfig.zoom_out)
-            self._zoom_reset_act.setShortcut(self._keyconfig.zoom_reset)
-            self._fit_act.setShortcut(self._keyconfig.fit)
-            self._grid_act.setShortcut(self._keyconfig.grid)
-        print('end')
-    
-    def _update_view_act(self):
-        '''Viewメニューの活性状態を更新する
-        sceneの画像有無に応じてメニューの活性化、非活性を切り替える
-        '''
-        enable = self._gview.hasImage()
-        self._zoom_in_act.setEnabled(enable)
-        self._zoom_out_act.setEnabled(enable)
-        self._zoom_reset_act.setEnabled(enable)
-        self._fit_act.setEnabled(enable)
-        self._grid_act.setEnabled(enable)
-
-class QProjectOpenDialog(QDialog):
-    '''プロジェクトオープンダイアログ
-    media画像、data画像の基底ディレクトリと設定ファイルを選択するダイアログ
-    '''
-    def __init__(self, parent = None, f = Qt.WindowFlags()):
-        '''コンストラクタ
-        主にイベント処理の関連付けを行う
-
-        Args:
-            parent (QWidget): 親Widget
-            f (Qt.WindowFlag): フラグ一覧
-        '''
-        super().__init__(parent, f)
-        self.init_ui()
-
-        self._media_button.pressed.connect(self.on_browse_button_click)
-        self._data_button.pressed.connect(self.on_browse_button_click)
-        self._config_button.pressed.connect(self.on_browse_button_click)
-        self._ok_button.pressed.connect(self.on_ok_cancel_button_click)
-        self._cancel_button.pressed.connect(self.on_ok_cancel_button_click)
-
-    def init_ui(self):
-        '''UI初期化
-        各種パーツの初期化と配置を行う
-        '''
-        self._media_label = QLabel('Media')
-        self._media_edit = QLineEdit()
-        self._media_button = QPushButton('Browse')
-
-        self._data_label = QLabel('Data')
-        self._data_edit = QLineEdit()
-        self._data_button = QPushButton('Browse')
-
-        self._config_label = QLabel('Config')
-        self._config_edit = QLineEdit()
-        self._config_button = QPushButton('Browse')
-
-        self._ok_button = QPushButton('OK')
-        self._ok_button.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
-        self._cancel_button = QPushButton('Cancel')
-        self._cancel_button.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
-
-        grid = QGridLayout()
-        grid.addWidget(self._media_label, 0, 0)
-        grid.addWidget(self._media_edit, 0, 1)
-        grid.addWidget(self._media_button, 0, 2)
-        grid.addWidget(self._data_label, 1, 0)
-        grid.addWidget(self._data_edit, 1, 1)
-        grid.addWidget(self._data_button, 1, 2)
-        grid.addWidget(self._config_label, 2, 0)
-        grid.addWidget(self._config_edit, 2, 1)
-        grid.addWidget(self._config_button, 2, 2)
-        hbox = QHBoxLayout()
-        hbox.addWidget(self._ok_button)
-        hbox.addWidget(self._cancel_button)
-        layout = QVBoxLayout()
-        layout.addLayout(grid)
-        layout.addSpacing(10)
-        layout.addLayout(hbox)
-        self.setLayout(layout)
-        self.setFixedWidth(500)
-        self.setWindowTitle('Project Open')
-
-    def on_browse_button_click(self):
-        '''browseボタン押下
-        ディレクトリ（ファイル）選択ダイアログを表示する
-        '''
-        sender = self.sender()
-        if sender == self._media_button:
-            self._media_edit.setText(QColorPickerDialog.getExistingDirectory(parent = self, caption = 'select media base directory'))
-        elif sender == self._data_button:
-            self._data_edit.setText(QColorPickerDialog.getExistingDirectory(parent = self, caption = 'select data base directory'))
-        else:
-            self._config_edit.setText(QColorPickerDialog.getOpenFileName(parent = self, caption = 'select config json file', filter = 'config (*.json)'))
-
-    def on_ok_cancel_button_click(self):
-        '''ok(cancel)ボタン押下
-        OKボタンかつ各種データが妥当な場合はresultにQDialog.Acceptを設定し非表示にする
-        '''
-        if self.sender() == self._ok_button and os.path.isdir(self.media()) and os.path.isdir(self.data()) and os.path.isfile(self.config()):
-            self.setResult(QDialog.Accepted)
-        else:
-            self.setResult(QDialog.Rejected)
-        self.hide()
-
-    def media(self):
-        '''mediaディレクトリパス
-
-        Return:
-            str: mediaディレクトリのパス
-        '''
-        return self._media_edit.text()
-    
-    def data(self):
-        '''dataディレクトリパス
-
-        Return:
-            str: dataディレクトリのパス
-        '''
-        return self._data_edit.text()
-
-    def config(self):
-        '''configファイルパス
-
-        Return:
-            str: configファイルのパス
-        '''
-        return self._config_edit.text()    
-
-class QKeyConfigDialog(QDialog):
-    '''キーコンフィグダイアログ
-    キーコンフィグの設定ダイアログ
-    '''
-    def __init__(self, parent = None, f = Qt.WindowFlags()):
-        '''コンストラクタ
-        主にイベント処理の関連付けを行う
-
-        Args:
-            parent (QWidget): 親Widget
-            f (Qt.WindowFlag): フラグ一覧
-        '''
-        super().__init__(parent, f)
-        self._keyconfig = ColorPickerKeyConfig()
-        self._close_index = 0
-        self.init_ui()
-        for child in self.children():
-            if type(child) == QLineEdit and child != self._edit_name: child.keyPressEvent = self.on_key_press
-        self._combo_config.currentIndexChanged.connect(self.update_lineedit)
-        self._ok_button.pressed.connect(self.on_ok_button_click)
-        self._cancel_button.pressed.connect(self.on_cancel_button_click)
-
-    def showEvent(self, event):
-        '''表示イベント
-        再表示された際に、コンフィグコンボボックスのインデックス位置を前回選択された位置に設定する
-
-        Args:
-            event (QShowEvent) : QShowEvent
-        '''
-        self._combo_config.setCurrentIndex(self._close_index)
-        super().showEvent(event)
-
-    def init_ui(self):
-        '''UIの初期化
-        UIの初期化を行う
-        '''
-        self._edit_name = QLineEdit()
-        self._edit_next = QLineEdit()
-        self._edit_prev = QLineEdit()
-        self._edit_opacity = QLineEdit()
-        self._edit_fit = QLineEdit()
-        self._edit_zoom_in = QLineEdit()
-        self._edit_zoom_out = QLineEdit()
-        self._edit_zoom_reset = QLineEdit()
-        self._edit_grid = QLineEdit()
-
-        self._combo_config = QComboBox()
-        for i in range(0, self._keyconfig.count()):
-            self._keyconfig.index = i
-            self._combo_config.addItem(self._keyconfig.name)
-        self.update_lineedit()
-
-        self._ok_button = QPushButton('OK')
-        self._cancel_button = QPushButton('Cancel')
-
-        grid = QGridLayout()
-        def grid_add(title, edit_line):
-            r = grid.rowCount()
-            grid.addWidget(QLabel(title), r, 0)
-            grid.addWidget(edit_line, r, 1)
-        grid_add('名前', self._edit_name)
-        grid_add('進む', self._edit_next)
-        grid_add('戻る', self._edit_prev)
-        grid_add('透過切り替え', self._edit_opacity)
-        grid_add('画面フィット', self._edit_fit)
-        grid_add('拡大', self._edit_zoom_in)
-        grid_add('縮小', self._edit_zoom_out)
-        grid_add('リセット', self._edit_zoom_reset)
-        grid_add('グリッド', self._edit_grid)
-
-        hbox = QHBoxLayout()
-        hbox.addWidget(self._ok_button)
-        hbox.addWidget(self._cancel_button)
-        layout = QVBoxLayout()
-        layout.addWidget(self._combo_config)
-        layout.addLayout(grid)
-        layout.addSpacing(10)
-        layout.addLayout(hbox)
-        self.setLayout(layout)
-
-    def update_lineedit(self):
-        '''lineeditの更新
-        選択されているコンフィグのインデックスを元に各LineEditを更新する
-        '''
-        self._keyconfig.index = self._combo_config.currentIndex()
-
-        self._edit_name.setText(self._keyconfig.name)
-        self._edit_next.setText(self._keyconfig.next)
-        self._edit_prev.setText(self._keyconfig.prev)
-        self._edit_opacity.setText(self._keyconfig.opacity)
-        self._edit_fit.setText(self._keyconfig.fit)
-        self._edit_zoom_in.setText(self._keyconfig.zoom_in)
-        self._edit_zoom_out.setText(self._keyconfig.zoom_out)
-        self._edit_zoom_reset.setText(self._keyconfig.zoom_reset)
-        self._edit_grid.setText(self._keyconfig.grid)
-
-    def on_key_press(self, event):
-        '''キー押下イベント
-        LineEditに「押下されたキーの名前」を設定する
-
-        Args:
-            event (QKeyEvent): QKeyEvent
-        '''
-        if type(self.focusWidget()) == QLineEdit:
-            # QKeyEventをQKeySequenceに変換してキーの文字列を設定
-            self.focusWidget().setText(self._keyconfig.keyevent_to_keysquence(event).toString())
-
-    def on_ok_button_click(self):
-        '''okボタン押下
-        OKボタンかつデフォルト設定以外が選択されている場合は設定を保存する
-        '''
-        self._close_index = self._combo_config.currentIndex()
-        if 0 < self._close_index:
-            self._keyconfig.name = self._edit_name.text()
-            self._keyconfig.next = self._edit_next.text()
-            self._keyconfig.prev = self._edit_prev.text()
-            self._keyconfig.opacity = self._edit_opacity.text()
-            self._keyconfig.fit = self._edit_fit.text()
-            self._keyconfig.zoom_in = self._edit_zoom_in.text()
-            self._keyconfig.zoom_out = self._edit_zoom_out.text()
-            self._keyconfig.zoom_reset = self._edit_zoom_reset.text()
-            self._keyconfig.grid = self._edit_grid.text()
-            self._keyconfig.save()
-        self.setResult(QDialog.Accepted)
-        self.hide()
-
-    def on_cancel_button_click(self):
-        '''cancelボタン押下
-        ダイアログを非表示にする
-        '''
-        self.setResult(QDialog.Rejected)
-        self.hide()
-
-class ColorPickerKeyConfig():
-    '''キーコンフィグクラス
-    キーコンフィグを管理するクラス
-    実行ファイル直下に存在する key_config.json を読み込み初期化する
-    '''
-    __FILENAME = 'key_config.json'
-    __singleton = None
-    '''シングルトン
-    マルチスレッドには非対応
-    '''
-
-    def __new__(cls):
-        '''__init__の前処理
-        一度だけインスタンスを生成する
-        '''
-        if cls.__singleton == None:
-            cls.__singleton = super().__new__(cls)
-        return cls.__singleton
-
-    def __init__(self):
-        '''コンストラクタ
-        '''
-        self._key_dic = {}
-        '''設定ファイル
-        読み込んだjsonをそのまま保持
-        '''
-        self._index = "0"
-        '''設定インデックス
-        設定1～6のインデックス（0はデフォルト設定）
-        '''
-
-        with open(self.__FILENAME, encoding = 'utf8') as f:
-            self._key_dic = json.load(f)
-            #for index in range(0, len(j)):
-            #    self._key_dic[str(index)] = {e : j[str(index)][e.value] for e in ColorPickerKey}
-
-    @property
-    def index(self):
-        return int(self._index)
-
-    @index.setter
-    def index(self, index):
-        if index <= self.count():
-            self._index = str(index)
-
-    @property
-    def next(self):
-        return self._key_dic[self._index]['next']
-    
-    @next.setter
-    def next(self, key):
-        self._key_dic[self._index]['next'] = key
-    
-    @property
-    def prev(self):
-        return self._key_dic[self._index]['prev']
-    
-    @prev.setter
-    def prev(self, key):
-        self._key_dic[self._index]['prev'] = key
-    
-    @property
-    def opacity(self):
-        return self._key_dic[self._index]['opacity']
-    
-    @opacity.setter
-    def opacity(self, key):
-        self._key_dic[self._index]['opacity'] = key
-
-    @property
-    def zoom_in(self):
-        return self._key_dic[self._index]['zoom_in']
-    
-    @zoom_in.setter
-    def zoom_in(self, key):
-        self._key_dic[self._index]['zoom_in'] = key
-    
-    @property
-    def zoom_out(self):
-        return self._key_dic[self._index]['zoom_out']
-    
-    @zoom_out.setter
-    def zoom_out(self, key):
-        self._key_dic[self._index]['zoom_out'] = key
-    
-    @property
-    def zoom_reset(self):
-        return self._key_dic[self._index]['zoom_reset']
-    
-    @zoom_reset.setter
-    def zoom_reset(self, key):
-        self._key_dic[self._index]['zoom_reset'] = key
-    
-    @property
-    def fit(self):
-        return self._key_dic[self._index]['fit']
-    
-    @fit.setter
-    def fit(self, key):
-        self._key_dic[self._index]['fit'] = key
-    
-    @property
-    def grid(self):
-        return self._key_dic[self._index]['grid']
-    
-    @grid.setter
-    def grid(self, key):
-        self._key_dic[self._index]['grid'] = key
-    
-    @property
-    def name(self):
-        return self._key_dic[self._index]['name']
-    
-    @name.setter
-    def name(self, key):
-        self._key_dic[self._index]['name'] = key
-
-    def count(self):
-        '''コンフィグ設定数取得
-        コンフィグの設定上限数を取得する
-        '''
-        return len(self._key_dic)
-
-    def save(self):
-        '''設定保存
-        現在の情報を上書き保存する
-        '''
-        with open(self.__FILENAME, 'w', encoding = 'utf8') as f:
-            json.dump(self._key_dic, f, ensure_ascii = False, indent = 4, sort_keys = True)
-
-    def keyevent_to_keysquence(self, event):
-        '''QKeyEvent->文字列変換
-        QKeyEventをQKeySequenceに変換する
-
-        Args:
-            event (QKeyEvent): QKeyEvent
-        Return:
-            str: キー文字列
-        '''
-        modifier = ''
-        if (event.modifiers() & Qt.ShiftModifier):
-            modifier += "Shift+"
-        if (event.modifiers() & Qt.ControlModifier):
-        	modifier += "Ctrl+"
-        if (event.modifiers() & Qt.AltModifier):
-        	modifier += "Alt+"
-        if (event.modifiers() & Qt.MetaModifier):
-        	modifier += "Meta+"
-        key = QKeySequence(event.key()).toString()
-        return QKeySequence(modifier + key)
-
-if __name__ == '__main__':
-    '''メイン処理
-    スクリーンサイズに応じてウィンドウサイズを設定し
-    メインウィンドウを表示する
-    '''
-    app = QApplication(sys.argv)
-    app.setApplicationDisplayName('Color Picker')
-    # window size calc
-    s_size = app.desktop().availableGeometry().size()
-    w_size = QSize(int(s_size.width() * 9 / 10), int(s_size.height() * 9 / 10))
-    w_pos = QPoint(int((s_size.width() - w_size.width()) / 2), int((s_size.height() - w_size.height()) / 2))
-    main = MainWindow()
-    main.setGeometry(QRect(w_pos, w_size))
-    main.show()
+import bisect
+import glob
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import platform
+import re
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+from collections import OrderedDict
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from threading import Event
+from threading import Lock
+from threading import Thread
+from threading import Timer
+
+try:
+    import numpy as np
+except ImportError:
+    # numpyが無い環境ではQImage.pixelで代替する
+    np = None
+
+from PyQt5.QtCore import QAbstractItemModel
+from PyQt5.QtCore import QAbstractListModel
+from PyQt5.QtCore import QBuffer
+from PyQt5.QtCore import QIODevice
+from PyQt5.QtCore import QLineF
+from PyQt5.QtCore import QModelIndex
+from PyQt5.QtCore import QObject
+from PyQt5.QtCore import QPoint
+from PyQt5.QtCore import QPointF
+from PyQt5.QtCore import QRect
+from PyQt5.QtCore import QRectF
+from PyQt5.QtCore import QSize
+from PyQt5.QtCore import QTimer
+from PyQt5.QtCore import Qt
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtGui import QBrush
+from PyQt5.QtGui import QFont
+from PyQt5.QtGui import QImage
+from PyQt5.QtGui import QImageReader
+from PyQt5.QtGui import QKeySequence
+from PyQt5.QtGui import QPainter
+from PyQt5.QtGui import QPainterPath
+from PyQt5.QtGui import QPixmap
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtWidgets import QComboBox
+from PyQt5.QtWidgets import QDialog
+from PyQt5.QtWidgets import QDockWidget
+from PyQt5.QtWidgets import QFileDialog
+from PyQt5.QtWidgets import QGraphicsItem
+from PyQt5.QtWidgets import QGraphicsPixmapItem
+from PyQt5.QtWidgets import QGraphicsScene
+from PyQt5.QtWidgets import QGraphicsSimpleTextItem
+from PyQt5.QtWidgets import QGraphicsView
+from PyQt5.QtWidgets import QGridLayout
+from PyQt5.QtWidgets import QHBoxLayout
+from PyQt5.QtWidgets import QInputDialog
+from PyQt5.QtWidgets import QLabel
+from PyQt5.QtWidgets import QLineEdit
+from PyQt5.QtWidgets import QListView
+from PyQt5.QtWidgets import QListWidget
+from PyQt5.QtWidgets import QListWidgetItem
+from PyQt5.QtWidgets import QMainWindow
+from PyQt5.QtWidgets import QPushButton
+from PyQt5.QtWidgets import QSlider
+from PyQt5.QtWidgets import QSizePolicy
+from PyQt5.QtWidgets import QStyleOptionGraphicsItem
+from PyQt5.QtWidgets import QTreeView
+from PyQt5.QtWidgets import QVBoxLayout
+from PyQt5.QtWidgets import QWidget
+
+'''
+セグメンテーション支援ツール
+カスタマイズされたPythonが外部ファイルをimportさせてくれないので、
+無理やり一つのファイルにまとめた。超見辛い。
+
+auther:
+    nabedroid <nabedroid@gmail.com>
+version:
+    1.00
+date:
+    31 Dec 2019
+TODO:
+    設定メニューを実装したい
+        色->オブジェクト名の追加・削除、透過率変更、グリッド幅の変更
+'''
+
+class ConfigFormatError(Exception):
+    '''コンフィグエラークラス
+    コンフィグファイルの設定値に漏れがある場合に使用
+    '''
+
+    def __init__(self, filepath, item):
+        '''コンストラクタ
+        Args:
+            filepath (str): configファイルパス
+            item (str): 項目
+        '''
+        self.message = '{} is not found in {}'.format(item, filepath)
+
+class QColorPickerDialog(QFileDialog):
+    '''QFileDialog拡張クラス
+    ファイルパスのセパレーターをOSに準拠したセパレーターに変換して返す
+    '''
+    @classmethod
+    def getExistingDirectory(self, parent = None, caption = '', dir = '', options = QFileDialog.ShowDirsOnly):
+        dir = super().getExistingDirectory(parent, caption, dir, options)
+        return dir.replace('/', os.path.sep)
+    @classmethod
+    def getOpenFileName(self, parent = None, caption = '', dir = '', filter = '', selectedFilter = None, options = QFileDialog.Options()):
+        f = super().getOpenFileName(parent, caption, dir, filter, selectedFilter, options)
+        return f[0].replace('/', os.path.sep)
+
+class ColorPickerUtil():
+    '''Utilクラス
+    クラスに依存しない機能を集めたクラス
+    '''
+
+    __singleton = None
+    '''シングルトン
+    マルチスレッドには非対応
+    '''
+
+    DEFAULT_PREFETCH_WINDOW = 4
+    '''先読み枚数の初期値
+    config.json に prefetch_window が無い場合に使用
+    '''
+
+    DEFAULT_CACHE_SIZE = 512
+    '''画像キャッシュ上限（MB）の初期値
+    config.json に cache_size が無い場合に使用
+    '''
+
+    DEFAULT_CACHE_DIR = 'cache'
+    '''ディスクキャッシュの保存先の初期値
+    config.json に cache_dir が無い場合に使用（config.json からの相対パス）
+    '''
+
+    DEFAULT_LABEL_CACHE = False
+    '''data画像を展開済みの配列ファイルでキャッシュするかの初期値
+    config.json に label_cache が無い場合に使用
+    '''
+
+    DEFAULT_LABEL_CACHE_SIZE = 8192
+    '''展開済みの配列ファイルの合計上限（MB）の初期値
+    config.json に label_cache_size が無い場合に使用
+    '''
+
+    def __new__(cls):
+        '''__init__の前処理
+        一度だけインスタンスを生成する
+        '''
+        if cls.__singleton == None:
+            cls.__singleton = super().__new__(cls)
+        return cls.__singleton
+
+    def __init__(self):
+        '''コンストラクタ
+        不明な色の場合のオブジェクト名を初期化
+        '''
+        # 不明な色の場合は"?"
+        self._color_dic = defaultdict(lambda: '?')
+        self._mapper = None
+        self._data_dir = None
+        self._media_dir = None
+        self._prefetch_window = self.DEFAULT_PREFETCH_WINDOW
+        self._cache_size = self.DEFAULT_CACHE_SIZE
+        self._cache_dir = None
+        self._label_cache = self.DEFAULT_LABEL_CACHE
+        self._label_cache_size = self.DEFAULT_LABEL_CACHE_SIZE
+        # OSに応じてビューアー実行コマンドを選択
+        pf = platform.system()
+        if pf == 'Windows':
+            self._os_imageviewer = lambda filepath: subprocess.run(args = [filepath], shell = True)
+        elif pf == 'Darwin':
+            self._os_imageviewer = lambda filepath: subprocess.run(args = [filepath])
+        elif pf == 'Linux':
+            self._os_imageviewer = lambda filepath: subprocess.run(args = [filepath])
+        else:
+            raise Exception('unknwon os')
+
+    def load(self, filepath):
+        '''コンフィグ読み込み
+        config.json を読み込み各種プロパティを初期化する
+        設定値に漏れがある場合はエラーを投げる
+
+        Args:
+            filepath (str): コンフィグファイルのパス
+        Raises:
+            ConfigFormatError: 設定値に漏れがあった場合
+        '''
+        self._color_dic.clear()
+        self._media_dir = None
+        self._data_dir = None
+        with open(filepath) as f:
+            j = json.load(f)
+            # colors
+            colors = j.get('colors')
+            if not colors: raise ConfigFormatError(filepath, 'colors')
+            for name in colors:
+                self._color_dic[int(colors[name], 16)] = name
+            # media_filepath_to_data_filepath
+            patterns = j.get('media_filepath_to_data_filepath')
+            if not patterns: raise ConfigFormatError(filepath, 'media_filepath_to_data_filepath')
+            self._mapping = patterns
+            self._mapper = PathMapper(patterns[0], patterns[1])
+            # media_extension
+            self._media_extension = j.get('media_extension')
+            if not self._media_extension: raise ConfigFormatError(filepath, 'media_extension')
+            # data_extension
+            self._data_extension = j.get('data_extension')
+            if not self._data_extension: raise ConfigFormatError(filepath, 'data_extension')
+            # prefetch_window（任意）
+            self._prefetch_window = int(j.get('prefetch_window', self.DEFAULT_PREFETCH_WINDOW))
+            # cache_size（任意）
+            self._cache_size = int(j.get('cache_size', self.DEFAULT_CACHE_SIZE))
+            # cache_dir（任意）
+            self._cache_dir = os.path.join(os.path.dirname(os.path.abspath(filepath)), j.get('cache_dir', self.DEFAULT_CACHE_DIR))
+            # label_cache（任意）
+            self._label_cache = bool(j.get('label_cache', self.DEFAULT_LABEL_CACHE))
+            # label_cache_size（任意）
+            self._label_cache_size = int(j.get('label_cache_size', self.DEFAULT_LABEL_CACHE_SIZE))
+
+    @property
+    def color_dic(self):
+        return self._color_dic
+
+    @property
+    def prefetch_window(self):
+        return self._prefetch_window
+
+    @property
+    def cache_size(self):
+        return self._cache_size
+
+    @property
+    def cache_dir(self):
+        return self._cache_dir
+
+    @property
+    def label_cache(self):
+        return self._label_cache
+
+    @property
+    def label_cache_size(self):
+        return self._label_cache_size
+
+    @property
+    def data_extension(self):
+        return self._data_extension
+
+    @property
+    def media_extensions(self):
+        '''mediaファイルの拡張子
+        config.json の media_extension は文字列、もしくは文字列のリストで指定できる
+
+        Return:
+            tuple: 小文字の拡張子
+        '''
+        if isinstance(self._media_extension, str):
+            return (self._media_extension.lower(),)
+        return tuple(ext.lower() for ext in self._media_extension)
+
+    @property
+    def mapping(self):
+        return self._mapping
+
+    @property
+    def media_dir(self):
+        return self._media_dir
+
+    @media_dir.setter
+    def media_dir(self, media_dir):
+        self._media_dir = media_dir
+        if self._mapper: self._mapper.media_dir = media_dir
+
+    @property
+    def data_dir(self):
+        return self._data_dir
+
+    @data_dir.setter
+    def data_dir(self, data_dir):
+        self._data_dir = data_dir
+        if self._mapper: self._mapper.data_dir = data_dir
+
+    def get_media_filepaths(self, media_filepath):
+        '''mediaファイル一覧取得
+        mediaファイルの一覧を取得する
+
+        Args:
+            media_filepath (str): mediaファイルの基底パス
+        Return:
+            list: mediaファイルの一覧
+        '''
+        filepaths = []
+        for ext in self.media_extensions:
+            filepaths.extend(glob.glob(os.path.join(media_filepath, '**', '*' + ext), recursive = True))
+        return filepaths
+
+    def media_filepath_to_data_filepath(self, media_filepath):
+        '''media filepath -> data filepath
+        設定ファイルの置き換え情報を元にmediaファイルパスをdataファイルパスに変換する
+
+        Args:
+            media_filepath (str): mediaファイルのパス
+        Return:
+            str: dataファイルのパス
+        '''
+        return self._mapper.map(media_filepath)
+
+    def media_filepaths_to_data_filepaths(self, media_filepaths):
+        '''media filepaths -> data filepaths
+        media_filepath_to_data_filepath の一括版
+
+        Args:
+            media_filepaths (list): mediaファイルのパスのリスト
+        Return:
+            list: dataファイルのパスのリスト
+        '''
+        return self._mapper.map_all(media_filepaths)
+
+    @staticmethod
+    def qimage_to_array(image):
+        '''QImage -> numpy配列
+        QImageの画素データをコピーせずに (高さ, 幅) の uint32（0xAARRGGBB）配列として参照する
+        RGB32/ARGB32以外の形式の場合のみ変換（コピー）が発生する
+        配列は画素データを参照しているだけなので、使用中はQImageを破棄しないこと
+
+        Args:
+            image (QImage): 画像
+        Return:
+            tuple: (numpy.ndarray, 配列が参照しているQImage)
+        '''
+        if image.format() not in (QImage.Format_RGB32, QImage.Format_ARGB32):
+            image = image.convertToFormat(QImage.Format_ARGB32)
+        ptr = image.constBits()
+        ptr.setsize(image.bytesPerLine() * image.height())
+        array = np.frombuffer(ptr, np.uint32).reshape(image.height(), image.bytesPerLine() // 4)[:, :image.width()]
+        return array, image
+
+    def color_to_object_name(self, color):
+        '''color -> object name
+        色（0xRRGGBB）をオブジェクト名に変換する
+
+        Args:
+            color (int): RGB
+        Return:
+            str: オブジェクト名
+        '''
+        return self._color_dic[color]
+    
+    def exe_os_imageviewer(self, filepath):
+        '''イメージビューアー起動
+        OSに準拠したイメージビューアーを起動する
+
+        Args:
+            filepath (str): 画像ファイルのパス
+
+        TODO:
+            OS任せで拡張子に関連付けられたアプリケーションを起動しているだけなので、設定によってはビューアーが開かない可能性あり
+            MACで未検証
+        '''
+        # 空のファイルパスの場合は何もしない
+        if not filepath: return 0
+        return self._os_imageviewer(filepath)
+
+class PathMapper():
+    '''パス変換クラス
+    media_filepath_to_data_filepath の設定を一度だけコンパイルし、mediaファイルパスをdataファイルパスに変換する
+    テンプレートの {n} は正規表現の n 番目のグループに置き換わる
+    一括変換では改行で連結した全パスに対して正規表現を1回だけ実行し、変換結果はキャッシュする
+    '''
+
+    def __init__(self, media_pattern, data_template, media_dir = None, data_dir = None):
+        '''コンストラクタ
+        テンプレートを str.format 用の書式（{1}/PNG/{2}.png -> {0}/PNG/{1}.png）に変換する
+
+        Args:
+            media_pattern (str): mediaファイルパスの正規表現
+            data_template (str): dataファイルパスのテンプレート
+            media_dir (:obj:`str`, optional): mediaファイルの基底パス
+            data_dir (:obj:`str`, optional): dataファイルの基底パス
+        '''
+        media_re = re.compile(media_pattern)
+        self._search = media_re.search
+        self._groups = media_re.groups
+        # 行頭から最左一致を探す（search と同じ一致になる）行単位の正規表現
+        # 埋め込みフラグ等で組み立てられない場合は一括変換を使わない
+        try:
+            self._findall = re.compile('(?m)^.*?(?:' + media_pattern + ')').findall
+        except re.error:
+            self._findall = None
+        data_template = data_template.replace('\\', os.path.sep).replace('/', os.path.sep)
+        parts = re.split(r'\{([0-9])\}', data_template)
+        # 偶数番目はリテラル（format用に波括弧をエスケープ）、奇数番目はグループ番号
+        self._format = ''.join(
+            '{' + str(int(p) - 1) + '}' if i % 2 else p.replace('{', '{{').replace('}', '}}')
+            for i, p in enumerate(parts)).format
+        self._media_dir = media_dir
+        self._data_dir = data_dir
+        self._prefixes = self._dir_prefixes()
+        self._cache = {}
+
+    @property
+    def media_dir(self):
+        return self._media_dir
+
+    @media_dir.setter
+    def media_dir(self, media_dir):
+        self._media_dir = media_dir
+        self._prefixes = self._dir_prefixes()
+        self._cache.clear()
+
+    @property
+    def data_dir(self):
+        return self._data_dir
+
+    @data_dir.setter
+    def data_dir(self, data_dir):
+        self._data_dir = data_dir
+        self._prefixes = self._dir_prefixes()
+        self._cache.clear()
+
+    def map(self, media_filepath):
+        '''変換
+
+        Args:
+            media_filepath (str): mediaファイルのパス
+        Return:
+            str: dataファイルのパス（正規表現に一致しない場合は空文字）
+        '''
+        data_filepath = self._cache.get(media_filepath)
+        if data_filepath is None:
+            m = self._search(media_filepath)
+            data_filepath = self._replace_dir(self._format(*m.groups())) if m else ''
+            self._cache[media_filepath] = data_filepath
+        return data_filepath
+
+    def map_all(self, media_filepaths):
+        '''一括変換
+        キャッシュに無いパスだけをまとめて変換する
+
+        Args:
+            media_filepaths (list): mediaファイルのパスのリスト
+        Return:
+            list: dataファイルのパスのリスト
+        '''
+        cache = self._cache
+        missing = [p for p in media_filepaths if p not in cache]
+        if missing:
+            cache.update(zip(missing, self._map_batch(missing)))
+        return [cache[p] for p in media_filepaths]
+
+    def _map_batch(self, media_filepaths):
+        '''一括変換（キャッシュ無し）
+        改行で連結した全パスに行単位の正規表現を1回だけ適用してグループを取り出し、
+        基底パスの置き換えも連結した文字列に対して1回で行う
+        パスに改行を含む、一致しない行がある等で行とグループが対応しない場合は1パスずつ変換する
+
+        Args:
+            media_filepaths (list): mediaファイルのパスのリスト
+        Return:
+            list: dataファイルのパスのリスト
+        '''
+        fmt = self._format
+        groups = None
+        if self._findall is not None:
+            text = '\n'.join(media_filepaths)
+            if text.count('\n') == len(media_filepaths) - 1:
+                groups = self._findall(text)
+                if len(groups) != len(media_filepaths): groups = None
+        if groups is None:
+            search = self._search
+            replace_dir = self._replace_dir
+            data_filepaths = []
+            for media_filepath in media_filepaths:
+                m = search(media_filepath)
+                data_filepaths.append(replace_dir(fmt(*m.groups())) if m else '')
+            return data_filepaths
+        if self._groups == 1:
+            # グループが1つの場合 findall はタプルではなく文字列を返す
+            text = '\n'.join([fmt(g) for g in groups])
+        else:
+            text = '\n'.join([fmt(*g) for g in groups])
+        if text.count('\n') != len(media_filepaths) - 1:
+            # グループに改行を含む（行をまたいで一致した）場合
+            return [self.map(p) for p in media_filepaths]
+        prefixes = self._prefixes
+        if prefixes:
+            text = ('\n' + text).replace('\n' + prefixes[0], '\n' + prefixes[1])[1:]
+        return text.split('\n')
+
+    def _dir_prefixes(self):
+        '''基底パスの置き換え情報
+
+        Return:
+            tuple: (media基底パス, data基底パス)、置き換えない場合はNone
+        '''
+        if not self._media_dir or self._data_dir is None: return None
+        return (self._media_dir.rstrip(os.path.sep) + os.path.sep, self._data_dir.rstrip(os.path.sep) + os.path.sep)
+
+    def _replace_dir(self, data_filepath):
+        '''基底パスの置き換え
+        media基底パスで始まる場合のみ、その部分をdata基底パスに置き換える
+
+        Args:
+            data_filepath (str): 置き換え前のdataファイルのパス
+        Return:
+            str: dataファイルのパス
+        '''
+        prefixes = self._prefixes
+        if prefixes and data_filepath.startswith(prefixes[0]):
+            return prefixes[1] + data_filepath[len(prefixes[0]):]
+        return data_filepath
+
+class ProjectManifest():
+    '''プロジェクトマニフェストクラス
+    mediaファイル一覧と対応するdataファイルパス、サイズ、更新日時をconfig.jsonの隣に保存する
+    再オープン時は更新日時が変わったディレクトリだけを再走査し、それ以外は保存内容を使う
+    （ディレクトリの更新日時はファイルの追加・削除・リネームでしか変わらない点に注意）
+    '''
+
+    VERSION = 1
+
+    def __init__(self, filepath):
+        '''コンストラクタ
+
+        Args:
+            filepath (str): マニフェストファイルのパス
+        '''
+        self._filepath = filepath
+        self._header = None
+        self._dirty = False
+        # mediaディレクトリからの相対パス : ディレクトリ情報
+        # ディレクトリ情報 = {'mtime', 'dirs', 'names', 'sizes', 'mtimes', 'data'}
+        self._dirs = {}
+
+    @staticmethod
+    def filepath_for(config_filepath):
+        '''マニフェストファイルパス取得
+        config.json -> config.manifest.json
+
+        Args:
+            config_filepath (str): configファイルのパス
+        Return:
+            str: マニフェストファイルのパス
+        '''
+        return os.path.splitext(config_filepath)[0] + '.manifest.json'
+
+    def load(self):
+        '''マニフェスト読み込み
+        ファイルが無い、壊れている、バージョンが異なる場合は空として扱う
+        '''
+        self._header = None
+        self._dirs = {}
+        try:
+            with open(self._filepath, encoding = 'utf8') as f:
+                j = json.load(f)
+        except (OSError, ValueError):
+            return
+        if j.get('version') != self.VERSION: return
+        self._header = j.get('header')
+        self._dirs = j.get('dirs', {})
+
+    def save(self):
+        '''マニフェスト保存
+        前回の走査で変更が無ければ何もしない
+        書き込み途中で落ちても壊れないよう一時ファイルに書いてから置き換える
+        保存できない場合（読み取り専用など）は何もしない
+        '''
+        if not self._dirty: return
+        tmp = self._filepath + '.tmp'
+        try:
+            with open(tmp, 'w', encoding = 'utf8') as f:
+                json.dump({'version' : self.VERSION, 'header' : self._header, 'dirs' : self._dirs}, f, ensure_ascii = False, separators = (',', ':'))
+            os.replace(tmp, self._filepath)
+            self._dirty = False
+        except OSError:
+            pass
+
+    def scan(self, media_dir, media_extensions, to_data_filepaths, signature = None):
+        '''走査
+        media_dir 以下のmediaファイルとdataファイルの組を全て取得する
+
+        Args:
+            media_dir (str): mediaファイルの基底パス
+            media_extensions (tuple): mediaファイルの拡張子（小文字）
+            to_data_filepaths (callable): mediaファイルパスのリスト -> dataファイルパスのリスト
+            signature (:obj:`list`, optional): dataファイルパスの変換に影響する設定値
+        Return:
+            tuple: (mediaファイルパスの一覧, dataファイルパスの一覧)
+        '''
+        media_filepaths = []
+        data_filepaths = []
+        for media, data in self.walk(media_dir, media_extensions, to_data_filepaths, signature):
+            media_filepaths.extend(media)
+            data_filepaths.extend(data)
+        return media_filepaths, data_filepaths
+
+    def walk(self, media_dir, media_extensions, to_data_filepaths, signature = None, cancel = None):
+        '''逐次走査
+        media_dir 以下をディレクトリ単位で走査し、mediaファイルとdataファイルの組を順次返す
+        更新日時が変わっていないディレクトリはマニフェストの内容をそのまま使う
+        media_dir や signature（data_dir、変換パターン等）が前回と異なる場合は全て走査し直す
+        cancel がセットされた時点で走査を打ち切る
+
+        Args:
+            media_dir (str): mediaファイルの基底パス
+            media_extensions (tuple): mediaファイルの拡張子（小文字）
+            to_data_filepaths (callable): mediaファイルパスのリスト -> dataファイルパスのリスト
+            signature (:obj:`list`, optional): dataファイルパスの変換に影響する設定値
+            cancel (:obj:`threading.Event`, optional): 中断フラグ
+        Yields:
+            tuple: (mediaファイルパスのリスト, dataファイルパスのリスト)
+        '''
+        header = {'media_dir' : media_dir, 'media_extensions' : list(media_extensions), 'signature' : signature}
+        old = self._dirs if self._header == header else {}
+        self._dirty = self._header != header
+        self._header = header
+        self._dirs = {}
+        stack = ['']
+        while stack:
+            if cancel is not None and cancel.is_set(): return
+            rel = stack.pop()
+            dirpath = os.path.join(media_dir, rel) if rel else media_dir
+            try:
+                mtime = os.stat(dirpath).st_mtime_ns
+            except OSError:
+                continue
+            entry = old.get(rel)
+            if entry is None or entry['mtime'] != mtime:
+                entry = self._scan_dir(dirpath, mtime, media_extensions, to_data_filepaths)
+                self._dirty = True
+            self._dirs[rel] = entry
+            # 名前順に処理するため逆順に積む
+            stack.extend([os.path.join(rel, d) for d in reversed(entry['dirs'])])
+            if entry['names']:
+                prefix = dirpath + os.path.sep
+                yield [prefix + name for name in entry['names']], entry['data']
+        # 削除されたディレクトリ
+        if len(self._dirs) != len(old): self._dirty = True
+
+    @staticmethod
+    def _scan_dir(dirpath, mtime, media_extensions, to_data_filepaths):
+        '''ディレクトリ走査
+        dirpath 直下のみを走査する（サブディレクトリは呼び出し側で辿る）
+
+        Args:
+            dirpath (str): ディレクトリパス
+            mtime (int): ディレクトリの更新日時
+            media_extensions (tuple): mediaファイルの拡張子（小文字）
+            to_data_filepaths (callable): mediaファイルパスのリスト -> dataファイルパスのリスト
+        Return:
+            dict: ディレクトリ情報
+        '''
+        dirs = []
+        files = []
+        try:
+            with os.scandir(dirpath) as it:
+                for e in it:
+                    if e.is_dir():
+                        dirs.append(e.name)
+                    elif e.name.lower().endswith(media_extensions):
+                        st = e.stat()
+                        files.append((e.name, st.st_size, st.st_mtime_ns))
+        except OSError:
+            pass
+        dirs.sort()
+        files.sort()
+        prefix = dirpath + os.path.sep
+        return {
+            'mtime' : mtime,
+            'dirs' : dirs,
+            'names' : [f[0] for f in files],
+            'sizes' : [f[1] for f in files],
+            'mtimes' : [f[2] for f in files],
+            'data' : to_data_filepaths([prefix + f[0] for f in files])
+        }
+
+class MediaScanner(QObject):
+    '''mediaファイル走査クラス
+    ワーカースレッドでマニフェストを元に走査し、見つかったmedia/dataファイルの組を順次通知する
+    最初の組は見つかり次第通知し、以降は一定数（一定時間）ごとにまとめて通知する
+    '''
+
+    found = pyqtSignal(object, object)
+    '''発見シグナル
+    (mediaファイルパスのリスト, dataファイルパスのリスト)
+    '''
+
+    finished = pyqtSignal(bool)
+    '''終了シグナル
+    最後まで走査した場合はTrue、中断した場合はFalse
+    '''
+
+    BATCH_SIZE = 5000
+    BATCH_INTERVAL = 0.1
+
+    def __init__(self, manifest, media_dir, media_extensions, to_data_filepaths, signature = None):
+        '''コンストラクタ
+
+        Args:
+            manifest (ProjectManifest): マニフェスト
+            media_dir (str): mediaファイルの基底パス
+            media_extensions (tuple): mediaファイルの拡張子（小文字）
+            to_data_filepaths (callable): mediaファイルパスのリスト -> dataファイルパスのリスト
+            signature (:obj:`list`, optional): dataファイルパスの変換に影響する設定値
+        '''
+        super().__init__()
+        self._manifest = manifest
+        self._args = (media_dir, media_extensions, to_data_filepaths, signature)
+        self._cancel = Event()
+        self._thread = Thread(target = self._run, daemon = True)
+
+    def start(self):
+        '''走査開始
+        '''
+        self._thread.start()
+
+    def cancel(self):
+        '''走査中断
+        現在のディレクトリの処理が終わった時点で中断する
+        '''
+        self._cancel.set()
+
+    def _run(self):
+        '''走査処理
+        ワーカースレッドで実行される
+        最後まで走査できた場合のみマニフェストを保存する
+        '''
+        self._manifest.load()
+        media_filepaths = []
+        data_filepaths = []
+        last = 0
+        for media, data in self._manifest.walk(*self._args, cancel = self._cancel):
+            media_filepaths.extend(media)
+            data_filepaths.extend(data)
+            now = time.monotonic()
+            if len(media_filepaths) >= self.BATCH_SIZE or now - last >= self.BATCH_INTERVAL:
+                self.found.emit(media_filepaths, data_filepaths)
+                media_filepaths = []
+                data_filepaths = []
+                last = now
+        if media_filepaths and not self._cancel.is_set():
+            self.found.emit(media_filepaths, data_filepaths)
+        completed = not self._cancel.is_set()
+        if completed: self._manifest.save()
+        self.finished.emit(completed)
+
+class ReviewStore():
+    '''レビュー状態保存クラス
+    mediaファイルごとのレビュー状態（状態、レビュー者、日時、メモ）をconfig.jsonの隣のSQLite（WALモード）に保存する
+    キー操作からの書き込みは溜めておき、flush でまとめて1トランザクションで書き込む
+    開けない場合（読み取り専用など）は保存せずメモリ上でのみ保持する
+    '''
+
+    UNREVIEWED = 0
+    OK = 1
+    FLAGGED = 2
+    STATUS_NAMES = {UNREVIEWED : 'unreviewed', OK : 'ok', FLAGGED : 'flagged'}
+
+    FLUSH_INTERVAL = 1000
+    '''書き込みをまとめる間隔（ミリ秒）'''
+
+    def __init__(self, filepath):
+        '''コンストラクタ
+
+        Args:
+            filepath (str): データベースファイルのパス
+        '''
+        self._filepath = filepath
+        self._conn = None
+        # 未書き込みのレビュー状態 mediaファイルパス : (状態, レビュー者, 日時, メモ)
+        self._pending = {}
+
+    @staticmethod
+    def filepath_for(config_filepath):
+        '''データベースファイルパス取得
+        config.json -> config.review.sqlite3
+
+        Args:
+            config_filepath (str): configファイルのパス
+        Return:
+            str: データベースファイルのパス
+        '''
+        return os.path.splitext(config_filepath)[0] + '.review.sqlite3'
+
+    def open(self):
+        '''データベースを開く
+        読み込み中も書き込みを妨げないようWALモードにする
+        状態での絞り込み用に status の索引を作る
+        '''
+        try:
+            self._conn = sqlite3.connect(self._filepath)
+            self._conn.execute('PRAGMA journal_mode = WAL')
+            self._conn.execute('PRAGMA synchronous = NORMAL')
+            with self._conn:
+                self._conn.execute('CREATE TABLE IF NOT EXISTS review ('
+                    'path TEXT PRIMARY KEY, status INTEGER NOT NULL, reviewer TEXT, updated REAL, note TEXT) WITHOUT ROWID')
+                self._conn.execute('CREATE INDEX IF NOT EXISTS review_status ON review (status)')
+        except sqlite3.Error:
+            self._conn = None
+
+    def close(self):
+        '''データベースを閉じる
+        未書き込みの分は書き込む
+        '''
+        self.flush()
+        if self._conn: self._conn.close()
+        self._conn = None
+
+    def statuses(self):
+        '''レビュー済みの状態一覧
+
+        Return:
+            dict: mediaファイルパス : 状態（未レビューは含まない）
+        '''
+        statuses = {}
+        if self._conn:
+            try:
+                statuses = dict(self._conn.execute('SELECT path, status FROM review WHERE status > ?', (self.UNREVIEWED,)))
+            except sqlite3.Error:
+                pass
+        statuses.update((path, r[0]) for path, r in self._pending.items() if r[0] != self.UNREVIEWED)
+        return statuses
+
+    def get(self, media_filepath):
+        '''レビュー状態取得
+
+        Args:
+            media_filepath (str): mediaファイルパス
+        Return:
+            tuple: (状態, レビュー者, 日時, メモ)、未レビューの場合は None
+        '''
+        record = self._pending.get(media_filepath)
+        if record is None and self._conn:
+            try:
+                record = self._conn.execute('SELECT status, reviewer, updated, note FROM review WHERE path = ?', (media_filepath,)).fetchone()
+            except sqlite3.Error:
+                record = None
+        return record
+
+    def set(self, media_filepath, status, reviewer, note = None):
+        '''レビュー状態設定
+        flush するまでは書き込まない
+
+        Args:
+            media_filepath (str): mediaファイルパス
+            status (int): 状態
+            reviewer (str): レビュー者
+            note (:obj:`str`, optional): メモ（省略時は前回のメモを残す）
+        '''
+        if note is None:
+            record = self.get(media_filepath)
+            note = record[3] if record else None
+        self._pending[media_filepath] = (status, reviewer, time.time(), note)
+
+    def flush(self):
+        '''書き込み
+        溜めておいたレビュー状態を1トランザクションで書き込む
+        '''
+        if not self._pending or not self._conn: return
+        try:
+            with self._conn:
+                self._conn.executemany('INSERT OR REPLACE INTO review VALUES (?, ?, ?, ?, ?)',
+                    [(path,) + record for path, record in self._pending.items()])
+            self._pending = {}
+        except sqlite3.Error:
+            pass
+
+class ReviewIndex():
+    '''レビュー状態索引クラス
+    mediaファイルの一覧での位置ごとの状態と、状態ごとの位置の昇順リストを持ち、
+    次の未レビュー（フラグ付き）の画像を二分探索で求める
+    '''
+    def __init__(self):
+        '''コンストラクタ
+        '''
+        # 位置ごとの状態
+        self._statuses = bytearray()
+        # 状態 : 位置の昇順リスト（未レビュー以外）
+        self._positions = {ReviewStore.OK : [], ReviewStore.FLAGGED : []}
+        # レビュー済み（未レビュー以外）の位置の昇順リスト
+        self._reviewed = []
+
+    def __len__(self):
+        return len(self._statuses)
+
+    def extend(self, statuses):
+        '''一覧の末尾に追加された分の状態を追加する
+
+        Args:
+            statuses (iterable): 追加された画像の状態
+        '''
+        for status in statuses:
+            pos = len(self._statuses)
+            self._statuses.append(status)
+            if status != ReviewStore.UNREVIEWED:
+                self._positions[status].append(pos)
+                self._reviewed.append(pos)
+
+    def status(self, pos):
+        return self._statuses[pos]
+
+    def set(self, pos, status):
+        '''状態更新
+
+        Args:
+            pos (int): 一覧での位置
+            status (int): 状態
+        '''
+        old = self._statuses[pos]
+        if old == status: return
+        self._statuses[pos] = status
+        if old != ReviewStore.UNREVIEWED:
+            self._remove(self._positions[old], pos)
+            self._remove(self._reviewed, pos)
+        if status != ReviewStore.UNREVIEWED:
+            bisect.insort(self._positions[status], pos)
+            bisect.insort(self._reviewed, pos)
+
+    def next(self, status, pos):
+        '''pos の次にある status の画像の位置
+        末尾まで無ければ先頭から探す
+
+        Args:
+            status (int): 状態
+            pos (int): 現在の位置
+        Return:
+            int: 位置（無い場合は None）
+        '''
+        found = self._find(status, pos + 1)
+        if found is None: found = self._find(status, 0)
+        return found
+
+    def _find(self, status, start):
+        '''start 以降で最初の status の画像の位置
+        '''
+        if start >= len(self._statuses): return None
+        if status != ReviewStore.UNREVIEWED:
+            positions = self._positions[status]
+            k = bisect.bisect_left(positions, start)
+            return positions[k] if k < len(positions) else None
+        # 未レビューはレビュー済みの位置の隙間
+        # start から続くレビュー済みの連続区間の終わりを、値と添字の差が変わらない範囲として二分探索する
+        reviewed = self._reviewed
+        k = bisect.bisect_left(reviewed, start)
+        if k == len(reviewed) or reviewed[k] != start: return start
+        lo, hi = k, len(reviewed) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if reviewed[mid] - start == mid - k:
+                lo = mid
+            else:
+                hi = mid - 1
+        found = reviewed[lo] + 1
+        return found if found < len(self._statuses) else None
+
+    @staticmethod
+    def _remove(positions, pos):
+        k = bisect.bisect_left(positions, pos)
+        if k < len(positions) and positions[k] == pos: del positions[k]
+
+class FilenameIndex():
+    '''ファイル名検索索引クラス
+    mediaファイル名（拡張子なし、小文字）を改行区切りで連結した文字列を、走査で見つかったまとまりごとに持つ
+    前方一致、部分一致は str.find で探し（Cで走査されるため100万件でも数ms）、改行を数えて一覧での位置に戻す
+    あいまい一致は検索文字列の半分の長さの部分文字列を含む名前を候補とし、3文字組の一致数で順位を付ける
+    部分文字列は含む名前の少ないものから調べるため、全ての名前が同じ文字で始まる場合でも連番の部分で絞り込める
+    '''
+
+    MAX_RESULTS = 200
+    '''検索結果の上限'''
+
+    FUZZY_CANDIDATES = 2000
+    '''あいまい一致で部分文字列ごとに調べる候補の上限'''
+
+    FUZZY_PIECES = 4
+    '''あいまい一致に使う部分文字列の数（先頭と末尾を含めて等間隔に取る）'''
+
+    CHUNK_SIZE = 64 * 1024
+    '''これより短いまとまりには次の追加分を連結する'''
+
+    PREFIX = 'prefix'
+    SUBSTRING = 'substring'
+    FUZZY = 'fuzzy'
+
+    def __init__(self):
+        '''コンストラクタ
+        '''
+        # (まとまりの先頭の一覧での位置, '\n' + '\n'.join(名前) + '\n')
+        self._chunks = []
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @staticmethod
+    def normalize(filepath):
+        '''索引に使う名前
+
+        Args:
+            filepath (str): ファイルパス
+        Return:
+            str: 拡張子を除いたファイル名（小文字）
+        '''
+        name = filepath[filepath.rfind(os.path.sep) + 1:]
+        dot = name.rfind('.')
+        if dot > 0: name = name[:dot]
+        return name.lower().replace('\n', ' ')
+
+    @staticmethod
+    def ngrams(text, n = 3):
+        return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+    def extend(self, filepaths):
+        '''一覧の末尾に追加されたファイルを索引に追加する
+
+        Args:
+            filepaths (list): 追加されたファイルパスのリスト
+        '''
+        if not filepaths: return
+        text = '\n'.join(self.normalize(fp) for fp in filepaths) + '\n'
+        if self._chunks and len(self._chunks[-1][1]) < self.CHUNK_SIZE:
+            start, chunk = self._chunks[-1]
+            self._chunks[-1] = (start, chunk + text)
+        else:
+            self._chunks.append((self._count, '\n' + text))
+        self._count += len(filepaths)
+
+    def clear(self):
+        '''索引を空にする
+        '''
+        self._chunks = []
+        self._count = 0
+
+    def search(self, text, limit = MAX_RESULTS):
+        '''検索
+        前方一致、部分一致、あいまい一致の順に最大 limit 件返す
+
+        Args:
+            text (str): 検索文字列
+            limit (int): 検索結果の上限
+        Return:
+            list: (一覧での位置, 一致の種類) のリスト
+        '''
+        q = text.strip().lower().replace('\n', '')
+        if not q: return []
+        results = {}
+        for kind, needle in ((self.PREFIX, '\n' + q), (self.SUBSTRING, q)):
+            for start, chunk in self._chunks:
+                for line, _ in self._find(chunk, needle):
+                    if len(results) >= limit: return list(results.items())
+                    results.setdefault(start + line, kind)
+        # 1文字違いであれば、違う文字を含まない半分の長さの部分文字列がそのまま含まれる
+        if len(q) < 4: return list(results.items())
+        grams = self.ngrams(q)
+        threshold = (len(grams) + 1) // 2
+        size = len(q) // 2
+        last = len(q) - size
+        pieces = {q[i:i + size] for i in sorted({last * k // (self.FUZZY_PIECES - 1) for k in range(self.FUZZY_PIECES)})}
+        counts = {piece : sum(chunk.count(piece) for start, chunk in self._chunks) for piece in pieces}
+        candidates = {}
+        for piece in sorted(pieces, key = lambda piece: (counts[piece], piece)):
+            if not counts[piece]: continue
+            examined = 0
+            for pos, name in self._names(piece):
+                if pos in results or pos in candidates: continue
+                examined += 1
+                if examined > self.FUZZY_CANDIDATES: break
+                score = sum(g in name for g in grams)
+                if score >= threshold: candidates[pos] = score
+        for pos in sorted(candidates, key = lambda pos: (-candidates[pos], pos))[:limit - len(results)]:
+            results[pos] = self.FUZZY
+        return list(results.items())
+
+    def _names(self, needle):
+        '''needle を含む名前
+
+        Args:
+            needle (str): 探す文字列
+        Yields:
+            tuple: (一覧での位置, 名前)
+        '''
+        for start, chunk in self._chunks:
+            for line, i in self._find(chunk, needle):
+                yield start + line, chunk[chunk.rfind('\n', 0, i) + 1:chunk.find('\n', i)]
+
+    @staticmethod
+    def _find(chunk, needle):
+        '''needle を含む名前
+
+        Args:
+            chunk (str): 改行区切りで連結した名前
+            needle (str): 探す文字列
+        Yields:
+            tuple: (まとまりの中での名前の位置, 見つかった文字の位置)
+        '''
+        lines = 0
+        counted = 0
+        i = chunk.find(needle)
+        while i >= 0:
+            # 先頭の改行から i までの改行の数 - 1 が名前の位置
+            lines += chunk.count('\n', counted, i + 1)
+            counted = i + 1
+            yield lines - 1, i
+            end = chunk.find('\n', i + 1)
+            if end < 0: return
+            i = chunk.find(needle, end)
+
+class ImageCache():
+    '''デコード済み画像キャッシュクラス
+    (ファイルパス, 更新日時, ファイルサイズ) をキーにデコード済みのQImageを保持する
+    上限はエントリ数ではなくバイト数で、超えた分は参照が古い順に破棄する（LRU）
+    先読みスレッドからも使用されるため、内部状態はロックで保護する
+    '''
+
+    def __init__(self, budget = ColorPickerUtil.DEFAULT_CACHE_SIZE * 1024 * 1024, loader = QImage):
+        '''コンストラクタ
+
+        Args:
+            budget (:obj:`int`, optional): 上限バイト数
+            loader (:obj:`callable`, optional): ファイルパスを受け取りQImageを返すデコード関数
+        '''
+        self._budget = budget
+        self._loader = loader
+        self._lock = Lock()
+        # (filepath, mtime, size) : QImage
+        self._entries = OrderedDict()
+        # filepath : (filepath, mtime, size)
+        self._keys = {}
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def budget(self):
+        return self._budget
+
+    @budget.setter
+    def budget(self, budget):
+        '''budget setter
+        上限を変更し、超過していれば破棄する
+        '''
+        with self._lock:
+            self._budget = budget
+            self._evict()
+
+    @property
+    def loader(self):
+        return self._loader
+
+    @loader.setter
+    def loader(self, loader):
+        '''loader setter
+        デコード関数を変更する。キャッシュ済みの画像はそのまま使用する
+        '''
+        self._loader = loader
+
+    @property
+    def stats(self):
+        '''統計情報
+
+        Return:
+            dict: hits, misses, evictions, entries, bytes, budget
+        '''
+        with self._lock:
+            return {
+                'hits' : self._hits,
+                'misses' : self._misses,
+                'evictions' : self._evictions,
+                'entries' : len(self._entries),
+                'bytes' : self._bytes,
+                'budget' : self._budget
+            }
+
+    @staticmethod
+    def key(filepath):
+        '''キャッシュキー取得
+
+        Args:
+            filepath (str): 画像ファイルパス
+        Return:
+            tuple: (ファイルパス, 更新日時, ファイルサイズ)、ファイルが存在しない場合はNone
+        '''
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return None
+        return (filepath, st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def image_bytes(image):
+        '''画像のバイト数
+
+        Args:
+            image (QImage): 画像
+        Return:
+            int: 画素データのバイト数
+        '''
+        return image.bytesPerLine() * image.height()
+
+    def get(self, filepath):
+        '''画像取得
+        キャッシュにあればそれを返し、無ければデコードしてキャッシュに追加する
+        ファイルが更新されている場合はキーが変わるため再デコードされる
+
+        Args:
+            filepath (str): 画像ファイルパス
+        Return:
+            QImage: デコード済みの画像（読み込めない場合はNull）
+        '''
+        key = self.key(filepath)
+        if key is None: return QImage()
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return image
+            self._misses += 1
+        image = self._loader(filepath)
+        self.put(key, image)
+        return image
+
+    def derived(self, filepath, name, build):
+        '''派生画像取得
+        デコード済み画像から作った画像（輪郭など）を、元画像と同じ更新日時、ファイルサイズのキーでキャッシュする
+        キャッシュに無ければ元画像を取得して build で作る
+
+        Args:
+            filepath (str): 元画像ファイルパス
+            name (str): 派生画像の種類
+            build (callable): 元画像（QImage）を受け取り派生画像（QImage）を返す関数
+        Return:
+            QImage: 派生画像（元画像が読み込めない場合はNull）
+        '''
+        key = self.key(filepath)
+        if key is None: return QImage()
+        key = ((filepath, name),) + key[1:]
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return image
+            self._misses += 1
+        image = self.get(filepath)
+        image = build(image) if not image.isNull() else QImage()
+        self.put(key, image)
+        return image
+
+    def put(self, key, image):
+        '''画像追加
+        同じファイルの古いエントリは置き換える
+        上限を超える画像とNull画像はキャッシュしない
+
+        Args:
+            key (tuple): キャッシュキー
+            image (QImage): 画像
+        '''
+        if image.isNull(): return
+        size = self.image_bytes(image)
+        with self._lock:
+            old = self._keys.get(key[0])
+            if old is not None:
+                self._bytes -= self.image_bytes(self._entries.pop(old))
+                del self._keys[key[0]]
+            if size > self._budget: return
+            self._entries[key] = image
+            self._keys[key[0]] = key
+            self._bytes += size
+            self._evict()
+
+    def clear(self):
+        '''全エントリ破棄
+        統計情報は保持する
+        '''
+        with self._lock:
+            self._entries.clear()
+            self._keys.clear()
+            self._bytes = 0
+
+    def _evict(self):
+        '''破棄
+        上限以下になるまで参照が古い順に破棄する
+        呼び出し側でロックを取得していること
+        '''
+        while self._bytes > self._budget and self._entries:
+            key, image = self._entries.popitem(last = False)
+            del self._keys[key[0]]
+            self._bytes -= self.image_bytes(image)
+            self._evictions += 1
+
+    def __str__(self):
+        stats = self.stats
+        return 'cache hit {} / miss {} / evict {} / {:.1f}MB'.format(stats['hits'], stats['misses'], stats['evictions'], stats['bytes'] / 1024 / 1024)
+
+class MappedImage(QImage):
+    '''配列参照QImageクラス
+    numpy配列（メモリマップを含む）の画素をコピーせずに参照するQImage
+    QImageは画素データを所有しないため、参照先の配列をこのオブジェクトで保持する
+    '''
+
+    def __init__(self, array):
+        '''コンストラクタ
+
+        Args:
+            array (numpy.ndarray): (高さ, 幅) の uint32（0xAARRGGBB）配列
+        '''
+        super().__init__(array.data, array.shape[1], array.shape[0], array.strides[0], QImage.Format_ARGB32)
+        self.array = array
+
+class LabelContour():
+    '''ラベル輪郭クラス
+    data画像の画素を左右、上下の隣とクラス（色）で比較し、境界の画素だけをそのクラスの色で残した画像を作る
+    巨大画像でも一時配列が大きくならないよう、上下1行を余分に含めた STRIP 行ずつ処理する
+    '''
+
+    NAME = 'contour'
+    '''ImageCache の派生画像の種類'''
+
+    STRIP = 1024
+
+    @staticmethod
+    def build(image):
+        '''輪郭画像作成
+
+        Args:
+            image (QImage): data画像
+        Return:
+            QImage: 境界の画素以外が透明な画像（numpyが無い場合はNull）
+        '''
+        if np is None or image.isNull(): return QImage()
+        a, image = ColorPickerUtil.qimage_to_array(image)
+        h, w = a.shape
+        out = np.empty((h, w), dtype = np.uint32)
+        for y0 in range(0, h, LabelContour.STRIP):
+            y1 = min(y0 + LabelContour.STRIP, h)
+            lo = max(y0 - 1, 0)
+            rgb = a[lo:min(y1 + 1, h)] & np.uint32(0x00FFFFFF)
+            edge = np.zeros(rgb.shape, dtype = bool)
+            # 境界の両側に印を付ける（縮小表示でも線が消えにくいよう2画素幅）
+            d = rgb[:, 1:] != rgb[:, :-1]
+            edge[:, 1:] |= d
+            edge[:, :-1] |= d
+            d = rgb[1:] != rgb[:-1]
+            edge[1:] |= d
+            edge[:-1] |= d
+            s = slice(y0 - lo, y1 - lo)
+            out[y0:y1] = np.where(edge[s], rgb[s] | np.uint32(0xFF000000), np.uint32(0))
+        return MappedImage(out)
+
+class LabelArrayCache():
+    '''data画像の展開済みキャッシュクラス
+    data画像を一度だけデコードし、無圧縮の .npy（uint32, 高さ x 幅）として cache_dir/labels に保存する
+    2回目以降はファイルをメモリマップしてQImageを被せるだけなので、PNGの展開もコピーも発生しない
+    ファイルは ファイルパスのハッシュ/(更新日時, ファイルサイズ)のハッシュ.npy のため、data画像が更新されれば作り直し、古いファイルは削除する
+    合計が budget を超えたら、最後に使った日時（更新日時）の古いファイルから PRUNE_RATIO まで削除する
+    '''
+
+    PRUNE_RATIO = 0.8
+    '''削除後の合計の budget に対する割合
+    超えるたびに走査しないよう、余裕を持たせて削除する
+    '''
+
+    def __init__(self, cache_dir = None, extensions = ('.png',), budget = ColorPickerUtil.DEFAULT_LABEL_CACHE_SIZE * 1024 * 1024):
+        '''コンストラクタ
+
+        Args:
+            cache_dir (:obj:`str`, optional): キャッシュの保存先（Noneの場合はキャッシュしない）
+            extensions (:obj:`tuple`, optional): キャッシュ対象の拡張子（小文字）
+            budget (:obj:`int`, optional): 保存するファイルの合計上限（バイト）
+        '''
+        self._cache_dir = cache_dir
+        self._extensions = extensions
+        self._budget = budget
+        self._lock = Lock()
+        # 保存済みファイルの合計（バイト）、最初に保存するときに走査して求める
+        self._usage = None
+
+    @property
+    def cache_dir(self):
+        return self._cache_dir
+
+    @cache_dir.setter
+    def cache_dir(self, cache_dir):
+        with self._lock:
+            self._cache_dir = cache_dir
+            self._usage = None
+
+    @property
+    def extensions(self):
+        return self._extensions
+
+    @extensions.setter
+    def extensions(self, extensions):
+        self._extensions = extensions
+
+    @property
+    def budget(self):
+        return self._budget
+
+    @budget.setter
+    def budget(self, budget):
+        self._budget = budget
+
+    def filepath_for(self, filepath):
+        '''キャッシュファイルパス取得
+
+        Args:
+            filepath (str): data画像ファイルパス
+        Return:
+            str: .npy ファイルパス（data画像が存在しない場合はNone）
+        '''
+        key = ImageCache.key(filepath)
+        if key is None: return None
+        name = hashlib.sha1(filepath.encode('utf8')).hexdigest()
+        version = hashlib.sha1(repr(key[1:]).encode('utf8')).hexdigest()[:16]
+        return os.path.join(self._cache_dir, 'labels', name, version + '.npy')
+
+    def load_array(self, filepath):
+        '''配列読み込み
+        キャッシュがあればメモリマップし、無ければデコードしてキャッシュを作成する
+        メモリマップは copy-on-write で開くため、書き込まれてもファイルは変わらない
+
+        Args:
+            filepath (str): data画像ファイルパス
+        Return:
+            numpy.ndarray: (高さ, 幅) の uint32 配列（読み込めない場合はNone）
+        '''
+        npy = self.filepath_for(filepath)
+        if npy is None: return None
+        try:
+            array = np.load(npy, mmap_mode = 'c')
+            # 最後に使った日時として更新日時を進める
+            os.utime(npy)
+            return array
+        except (OSError, ValueError):
+            pass
+        image = QImage(filepath)
+        if image.isNull(): return None
+        array, image = ColorPickerUtil.qimage_to_array(image)
+        array = np.ascontiguousarray(array)
+        # 書き込み途中のファイルを読まないよう、一時ファイルに書いてから置き換える
+        # 一時ファイル名は他のスレッド、プロセス（dataset_check のワーカーなど）と重ならないよう mkstemp で作る
+        tmp = None
+        try:
+            os.makedirs(os.path.dirname(npy), exist_ok = True)
+            fd, tmp = tempfile.mkstemp(suffix = '.tmp', dir = os.path.dirname(npy))
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, array)
+            os.replace(tmp, npy)
+            self._saved(npy)
+            return np.load(npy, mmap_mode = 'c')
+        except OSError:
+            if tmp and os.path.exists(tmp): LabelArrayCache._remove(tmp)
+            # 保存できない場合はデコード結果をそのまま使う
+            return array
+
+    def _saved(self, npy):
+        '''保存後の整理
+        同じdata画像の古いファイルを削除し、合計が budget を超えたら古いファイルから削除する
+        '''
+        with self._lock:
+            # 初めて数える場合は保存したファイルも含まれている
+            if self._usage is None:
+                self._usage = sum(size for path, mtime, size in self._entries())
+            else:
+                self._usage += os.path.getsize(npy)
+            for path in glob.glob(os.path.join(os.path.dirname(npy), '*.npy')):
+                if path != npy: self._usage -= self._remove(path)
+            if self._usage <= self._budget: return
+            # 他のプロセスが保存した分も含めて数え直す
+            entries = sorted(self._entries(), key = lambda e: e[1])
+            usage = sum(size for path, mtime, size in entries)
+            limit = self._budget * self.PRUNE_RATIO
+            for path, mtime, size in entries:
+                if usage <= limit: break
+                if path != npy: usage -= self._remove(path)
+            self._usage = usage
+
+    def _entries(self):
+        '''保存済みファイルの一覧 [(パス, 更新日時, サイズ), ...]
+        '''
+        entries = []
+        for dirpath, dirnames, filenames in os.walk(os.path.join(self._cache_dir, 'labels')):
+            for filename in filenames:
+                if not filename.endswith('.npy'): continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_mtime, stat.st_size))
+        return entries
+
+    @staticmethod
+    def _remove(path):
+        '''ファイル削除
+        使用中（Windowsでメモリマップ中など）で削除できない場合は残す
+
+        Return:
+            int: 削除したファイルのサイズ（削除できない場合は0）
+        '''
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return 0
+        # 空になったディレクトリも消す
+        try:
+            os.rmdir(os.path.dirname(path))
+        except OSError:
+            pass
+        return size
+
+    def load(self, filepath):
+        '''画像読み込み
+        ImageCache の loader として使用する
+        キャッシュ対象外のファイルや、numpyが無い場合は通常通りデコードする
+
+        Args:
+            filepath (str): 画像ファイルパス
+        Return:
+            QImage: 画像（読み込めない場合はNull）
+        '''
+        if np is None or not self._cache_dir or not filepath.lower().endswith(self._extensions):
+            return QImage(filepath)
+        array = self.load_array(filepath)
+        if array is None: return QImage()
+        return MappedImage(array)
+
+class ImagePrefetcher():
+    '''画像先読みクラス
+    現在位置の前後にある画像をワーカースレッドでQImageにデコードしておく
+    QPixmapはGUIスレッド以外で扱えないため、スレッド側ではQImageまでしか作らない
+    '''
+
+    def __init__(self, cache, workers = 2):
+        '''コンストラクタ
+
+        Args:
+            cache (ImageCache): デコード結果を格納するキャッシュ
+            workers (:obj:`int`, optional): デコードに使用するスレッド数
+        '''
+        self._cache = cache
+        self._executor = ThreadPoolExecutor(max_workers = workers)
+        # filepath : Future(QImage)
+        self._futures = {}
+
+    def prefetch(self, filepaths, derive = None):
+        '''先読み
+        filepaths を先頭から順にデコード予約する
+        filepaths に含まれない予約は未着手ならキャンセルし、結果も破棄する
+
+        Args:
+            filepaths (list): 先読みする画像ファイルパス（優先度順）
+            derive (:obj:`dict`, optional): ファイルパス : (派生画像の種類, 作成関数)、デコードに続けて派生画像も作る
+        '''
+        derive = derive or {}
+        wanted = set(filepaths)
+        for filepath in [fp for fp in self._futures if fp not in wanted]:
+            self._futures.pop(filepath).cancel()
+        for filepath in filepaths:
+            if filepath in self._futures: continue
+            self._futures[filepath] = self._executor.submit(self._load, filepath, derive.get(filepath))
+
+    def _load(self, filepath, derive = None):
+        '''デコード（と派生画像の作成）
+        ワーカースレッドで実行される
+        '''
+        image = self._cache.get(filepath)
+        if derive: self._cache.derived(filepath, *derive)
+        return image
+
+    def get(self, filepath):
+        '''画像取得
+        デコード中であれば完了を待って返す
+        それ以外はキャッシュから取得する（キャッシュに無ければその場でデコードする）
+
+        Args:
+            filepath (str): 画像ファイルパス
+        Return:
+            QImage: デコード済みの画像
+        '''
+        future = self._futures.get(filepath)
+        if future and not future.cancelled():
+            return future.result()
+        return self._cache.get(filepath)
+
+    def shutdown(self):
+        '''終了処理
+        未着手の予約をキャンセルしてスレッドを停止する
+        '''
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        self._executor.shutdown(wait = False)
+
+class RegionIndex():
+    '''領域インデックスクラス
+    data画像を同じ色が上下左右に連結した領域（連結成分）に分割し、領域ごとの情報を保持する
+    ピクセル -> 領域番号の対応表を持つため、クリック位置の領域は O(1) で引ける
+
+    属性:
+        labels (numpy.ndarray): (高さ, 幅) の領域番号
+        color (numpy.ndarray): 領域ごとの色（0xRRGGBB）
+        area (numpy.ndarray): 領域ごとの面積（ピクセル数）
+        bbox (numpy.ndarray): 領域ごとの (x0, y0, x1, y1)（x1, y1 を含む）
+        centroid (numpy.ndarray): 領域ごとの重心 (x, y)
+    '''
+
+    def __init__(self, labels, color, area, bbox, centroid):
+        self.labels = labels
+        self.color = color
+        self.area = area
+        self.bbox = bbox
+        self.centroid = centroid
+
+    @classmethod
+    def build(cls, rgb):
+        '''インデックス作成
+        行ごとの同色ランを求め、上下に同色で接するラン同士を併合して領域とする
+        併合はラン単位で「小さい番号への付け替え」と「経路圧縮」を収束するまで繰り返す
+        全てnumpyの一括処理で行い、ピクセル単位のPythonループやflood fillは行わない
+
+        Args:
+            rgb (numpy.ndarray): (高さ, 幅) の 0xRRGGBB 配列
+        Return:
+            RegionIndex: 領域インデックス
+        '''
+        h, w = rgb.shape
+        flat = np.ascontiguousarray(rgb).ravel()
+        # ランの開始位置（行頭もしくは左と色が異なる）
+        start = np.empty(h * w, dtype = bool)
+        start[0] = True
+        start[1:] = flat[1:] != flat[:-1]
+        start[::w] = True
+        run_of_pixel = np.cumsum(start, dtype = np.int64) - 1
+        run_start = np.flatnonzero(start)
+        n = len(run_start)
+        run_y = run_start // w
+        run_x0 = run_start - run_y * w
+        run_len = np.diff(np.append(run_start, h * w))
+        # 上下に同色で接しているランの組
+        same = np.flatnonzero((flat[w:] == flat[:-w]))
+        pair = np.unique(run_of_pixel[same + w] * n + run_of_pixel[same])
+        lower = pair // n
+        upper = pair - lower * n
+        # 併合（各ランの根を小さい方に付け替え、経路圧縮）
+        root = np.arange(n)
+        while True:
+            a = root[lower]
+            b = root[upper]
+            diff = a != b
+            if not diff.any(): break
+            a = a[diff]
+            b = b[diff]
+            np.minimum.at(root, np.maximum(a, b), np.minimum(a, b))
+            while True:
+                nxt = root[root]
+                if (nxt == root).all(): break
+                root = nxt
+        _, region_of_run = np.unique(root, return_inverse = True)
+        region_of_run = region_of_run.ravel()
+        count = int(region_of_run.max()) + 1 if n else 0
+        dtype = np.uint16 if count <= 0xFFFF else np.uint32
+        labels = region_of_run.astype(dtype)[run_of_pixel].reshape(h, w)
+        # 領域ごとの集計（ラン単位）
+        order = np.argsort(region_of_run, kind = 'stable')
+        sorted_region = region_of_run[order]
+        bounds = np.flatnonzero(np.r_[True, sorted_region[1:] != sorted_region[:-1]])
+        run_x1 = run_x0 + run_len - 1
+        bbox = np.stack([
+            np.minimum.reduceat(run_x0[order], bounds),
+            np.minimum.reduceat(run_y[order], bounds),
+            np.maximum.reduceat(run_x1[order], bounds),
+            np.maximum.reduceat(run_y[order], bounds)], axis = 1).astype(np.int32)
+        area = np.bincount(region_of_run, weights = run_len, minlength = count)
+        centroid = np.stack([
+            np.bincount(region_of_run, weights = run_len * (run_x0 + run_x1) / 2, minlength = count) / area,
+            np.bincount(region_of_run, weights = run_len * run_y, minlength = count) / area], axis = 1)
+        color = flat[run_start[order[bounds]]].astype(np.uint32)
+        return cls(labels, color, area.astype(np.int64), bbox, centroid)
+
+    @classmethod
+    def load(cls, filepath):
+        '''読み込み
+
+        Args:
+            filepath (str): npzファイルのパス
+        Return:
+            RegionIndex: 領域インデックス
+        '''
+        with np.load(filepath) as f:
+            return cls(f['labels'], f['color'], f['area'], f['bbox'], f['centroid'])
+
+    def save(self, filepath):
+        '''保存
+        書き込み途中のファイルが残らないよう一時ファイルに書いてから置き換える
+
+        Args:
+            filepath (str): npzファイルのパス
+        '''
+        tmp = filepath + '.tmp.npz'
+        np.savez_compressed(tmp, labels = self.labels, color = self.color, area = self.area, bbox = self.bbox, centroid = self.centroid)
+        os.replace(tmp, filepath)
+
+    def region(self, x, y):
+        '''領域番号取得
+
+        Args:
+            x (int): x座標
+            y (int): y座標
+        Return:
+            int: 領域番号（範囲外の場合はNone）
+        '''
+        h, w = self.labels.shape
+        if x < 0 or y < 0 or x >= w or y >= h: return None
+        return int(self.labels[y, x])
+
+    def mask(self, region):
+        '''領域マスク取得
+        領域の外接矩形の範囲だけを切り出して比較する
+
+        Args:
+            region (int): 領域番号
+        Return:
+            numpy.ndarray: 外接矩形内の (高さ, 幅) のbool配列
+        '''
+        x0, y0, x1, y1 = self.bbox[region]
+        return self.labels[y0:y1 + 1, x0:x1 + 1] == region
+
+class RegionIndexer(QObject):
+    '''領域インデックス作成クラス
+    ワーカースレッドでdata画像の領域インデックスを作成し、作成できたらシグナルで通知する
+    作成したインデックスはキャッシュディレクトリに .npz で保存し、次回からはそれを読み込む
+    numpyが無い環境では何もしない
+    '''
+
+    ready = pyqtSignal(str, object)
+    '''作成完了シグナル
+    (dataファイルパス, RegionIndex)
+    '''
+
+    def __init__(self, cache):
+        '''コンストラクタ
+
+        Args:
+            cache (ImageCache): data画像の取得に使用するキャッシュ
+        '''
+        super().__init__()
+        self._cache = cache
+        self._cache_dir = None
+        self._executor = ThreadPoolExecutor(max_workers = 1)
+        self._future = None
+
+    @property
+    def cache_dir(self):
+        return self._cache_dir
+
+    @cache_dir.setter
+    def cache_dir(self, cache_dir):
+        self._cache_dir = cache_dir
+
+    def request(self, data_filepath):
+        '''作成依頼
+        前回の依頼が未着手であればキャンセルする
+
+        Args:
+            data_filepath (str): dataファイルパス
+        '''
+        if np is None or not data_filepath: return
+        if self._future: self._future.cancel()
+        self._future = self._executor.submit(self._build, data_filepath)
+
+    def shutdown(self):
+        '''終了処理
+        '''
+        if self._future: self._future.cancel()
+        self._executor.shutdown(wait = False)
+
+    def _build(self, data_filepath):
+        '''作成処理
+        ワーカースレッドで実行される
+
+        Args:
+            data_filepath (str): dataファイルパス
+        '''
+        key = ImageCache.key(data_filepath)
+        if key is None: return
+        npz = None
+        if self._cache_dir:
+            npz = os.path.join(self._cache_dir, 'regions', hashlib.sha1(repr(key).encode('utf8')).hexdigest() + '.npz')
+        index = None
+        if npz and os.path.isfile(npz):
+            try:
+                index = RegionIndex.load(npz)
+            except (OSError, ValueError, KeyError):
+                index = None
+        if index is None:
+            image = self._cache.get(data_filepath)
+            if image.isNull(): return
+            array, image = ColorPickerUtil.qimage_to_array(image)
+            index = RegionIndex.build(array & 0x00FFFFFF)
+            if npz:
+                try:
+                    os.makedirs(os.path.dirname(npz), exist_ok = True)
+                    index.save(npz)
+                except OSError:
+                    pass
+        self.ready.emit(data_filepath, index)
+
+class ThumbnailCache(QObject):
+    '''サムネイルキャッシュクラス
+    media画像にdata画像を半透明で重ねたサムネイルをプロセスプールで作成し、作成できたらシグナルで通知する
+    作成したサムネイルはmedia/dataファイルのキー（パス、更新日時、サイズ）のハッシュを名前にしてキャッシュディレクトリに保存し、次回からはそれを読み込む
+    メモリ上には最近使った MAX_THUMBNAILS 枚だけ保持する
+    '''
+
+    ready = pyqtSignal(str)
+    '''作成完了シグナル
+    (mediaファイルパス)
+    '''
+
+    _done = pyqtSignal(str, object)
+    '''作成終了シグナル（プロセスプールの管理スレッド -> メインスレッド）
+    (mediaファイルパス, concurrent.futures.Future)
+    '''
+
+    SIZE = 160
+    '''サムネイルの長辺'''
+
+    MAX_THUMBNAILS = 512
+    '''メモリ上に保持するサムネイル数'''
+
+    MAX_PENDING = 256
+    '''作成待ちの上限
+    超えた場合は古い依頼（スクロールして見えなくなったセル）から取り消す
+    '''
+
+    OPACITY = 0.5
+    '''data画像の不透明度'''
+
+    def __init__(self, workers = None):
+        '''コンストラクタ
+
+        Args:
+            workers (:obj:`int`, optional): プロセス数（省略時はCPU数の半分）
+        '''
+        super().__init__()
+        self._workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        self._executor = None
+        self._cache_dir = None
+        self._thumbnails = OrderedDict()
+        self._pending = OrderedDict()
+        self._done.connect(self._on_done)
+
+    @property
+    def cache_dir(self):
+        return self._cache_dir
+
+    @cache_dir.setter
+    def cache_dir(self, cache_dir):
+        self._cache_dir = cache_dir
+
+    def get(self, media_filepath, data_filepath):
+        '''サムネイル取得
+        作成済みでなければ作成を依頼し、Noneを返す（作成できたら ready で通知する）
+
+        Args:
+            media_filepath (str): mediaファイルパス
+            data_filepath (str): dataファイルパス
+        Return:
+            QPixmap: サムネイル（作成中の場合は None）
+        '''
+        pixmap = self._thumbnails.get(media_filepath)
+        if pixmap is not None:
+            self._thumbnails.move_to_end(media_filepath)
+            return pixmap
+        future = self._pending.get(media_filepath)
+        if future is not None:
+            self._pending.move_to_end(media_filepath)
+            return None
+        if self._executor is None:
+            # Qtや先読みのスレッドが持つロックを引き継がないよう、forkせずに新しいプロセスで起動する
+            self._executor = ProcessPoolExecutor(max_workers = self._workers, mp_context = multiprocessing.get_context('spawn'))
+        thumbnail_dir = os.path.join(self._cache_dir, 'thumbnails') if self._cache_dir else None
+        future = self._executor.submit(ThumbnailCache.make, media_filepath, data_filepath, self.SIZE, self.OPACITY, thumbnail_dir)
+        self._pending[media_filepath] = future
+        future.add_done_callback(lambda f: self._done.emit(media_filepath, f))
+        while len(self._pending) > self.MAX_PENDING:
+            self._pending.popitem(last = False)[1].cancel()
+        return None
+
+    def clear(self):
+        '''キャッシュクリア
+        作成待ちの依頼は取り消す
+        取り消すとその場で _on_done が呼ばれるため、先に一覧を空にしてから取り消す
+        '''
+        pending = list(self._pending.values())
+        self._pending.clear()
+        for future in pending:
+            future.cancel()
+        self._thumbnails.clear()
+
+    def shutdown(self):
+        '''終了処理
+        '''
+        self.clear()
+        # 作成中の1枚はすぐ終わるので待つ（待たずに終了するとプロセスプールの後始末が失敗することがある）
+        if self._executor: self._executor.shutdown()
+
+    def _on_done(self, media_filepath, future):
+        # 取り消した依頼、クリア前の依頼は捨てる
+        if self._pending.get(media_filepath) is not future: return
+        del self._pending[media_filepath]
+        if future.cancelled() or future.exception() is not None: return
+        data = future.result()
+        if not data: return
+        image = QImage.fromData(data)
+        if image.isNull(): return
+        self._thumbnails[media_filepath] = QPixmap.fromImage(image)
+        while len(self._thumbnails) > self.MAX_THUMBNAILS:
+            self._thumbnails.popitem(last = False)
+        self.ready.emit(media_filepath)
+
+    @staticmethod
+    def read_scaled(filepath, size):
+        '''縮小読み込み
+        JPEGはデコード時に縮小されるため、元画像の大きさのメモリを使わない
+
+        Args:
+            filepath (str): 画像ファイルパス
+            size (int): 長辺
+        Return:
+            QImage: 縮小画像
+        '''
+        reader = QImageReader(filepath)
+        original = reader.size()
+        if original.isValid():
+            reader.setScaledSize(original.scaled(size, size, Qt.KeepAspectRatio))
+        return reader.read()
+
+    @staticmethod
+    def make(media_filepath, data_filepath, size, opacity, thumbnail_dir = None):
+        '''サムネイル作成
+        プロセスプールで実行される
+
+        Args:
+            media_filepath (str): mediaファイルパス
+            data_filepath (str): dataファイルパス
+            size (int): 長辺
+            opacity (float): data画像の不透明度
+            thumbnail_dir (:obj:`str`, optional): 保存先ディレクトリ
+        Return:
+            bytes: サムネイル（JPEG）、media/dataのどちらも読めない場合はNone
+        '''
+        filepath = None
+        if thumbnail_dir:
+            key = (ImageCache.key(media_filepath), ImageCache.key(data_filepath), size, opacity)
+            name = hashlib.sha1(repr(key).encode('utf8')).hexdigest()
+            filepath = os.path.join(thumbnail_dir, name[:2], name + '.jpg')
+            try:
+                with open(filepath, 'rb') as f:
+                    return f.read()
+            except OSError:
+                pass
+        media = ThumbnailCache.read_scaled(media_filepath, size)
+        data = ThumbnailCache.read_scaled(data_filepath, size)
+        if media.isNull() and data.isNull(): return None
+        thumbnail = QImage((data if media.isNull() else media).size(), QImage.Format_RGB32)
+        thumbnail.fill(Qt.black)
+        painter = QPainter(thumbnail)
+        if not media.isNull(): painter.drawImage(0, 0, media)
+        if not data.isNull():
+            painter.setOpacity(opacity)
+            painter.drawImage(thumbnail.rect(), data)
+        painter.end()
+        buf = QBuffer()
+        buf.open(QIODevice.WriteOnly)
+        thumbnail.save(buf, 'JPG', 85)
+        data = bytes(buf.data())
+        if filepath:
+            try:
+                os.makedirs(os.path.dirname(filepath), exist_ok = True)
+                tmp = '{}.{}.tmp'.format(filepath, os.getpid())
+                with open(tmp, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp, filepath)
+            except OSError:
+                pass
+        return data
+
+class DiffScorer(QObject):
+    '''ラベル差分スコア計算クラス
+    新旧のdata画像の組ごとに、クラス（色）が変化した画素の割合をスレッドプールで計算し、計算できた分から順次通知する
+    QImageのデコードとnumpyの計算はGILを解放するため、GUIプロセスからプロセスを作らずに並列に計算できる
+    計算結果は新旧のファイルのキー（更新日時、サイズ）と共にキャッシュディレクトリに保存し、次回からはキーが同じものを再利用する
+    numpyが無い環境では何もしない
+    '''
+
+    progress = pyqtSignal(object)
+    '''計算進捗シグナル
+    [(一覧での位置, スコア), ...]
+    '''
+
+    finished = pyqtSignal(bool)
+    '''終了シグナル
+    最後まで計算した場合はTrue、中断した場合はFalse
+    '''
+
+    BATCH_SIZE = 500
+    '''この件数ごとに通知する'''
+
+    def __init__(self, data_filepaths, data_dir, old_dir, cache_dir = None, workers = None):
+        '''コンストラクタ
+
+        Args:
+            data_filepaths (list): dataファイルパスのリスト
+            data_dir (str): dataファイルの基底パス
+            old_dir (str): 比較する（旧）dataファイルの基底パス
+            cache_dir (:obj:`str`, optional): キャッシュディレクトリ
+            workers (:obj:`int`, optional): スレッド数（省略時はCPU数の半分）
+        '''
+        super().__init__()
+        self._data_filepaths = data_filepaths
+        self._data_dir = data_dir
+        self._old_dir = old_dir
+        self._cache_filepath = None
+        if cache_dir:
+            name = hashlib.sha1(repr((data_dir, old_dir)).encode('utf8')).hexdigest()
+            self._cache_filepath = os.path.join(cache_dir, 'diff', name + '.json')
+        self._workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        self._cancel = Event()
+        self._thread = Thread(target = self._run, daemon = True)
+
+    def start(self):
+        '''計算開始
+        '''
+        if np is None: return
+        self._thread.start()
+
+    def cancel(self):
+        '''計算中断
+        '''
+        self._cancel.set()
+
+    @staticmethod
+    def rebase(filepath, data_dir, old_dir):
+        '''旧dataファイルパス
+        data_dir 以下のパスを old_dir 以下に置き換える
+
+        Args:
+            filepath (str): dataファイルパス
+            data_dir (str): dataファイルの基底パス
+            old_dir (str): 旧dataファイルの基底パス
+        Return:
+            str: 旧dataファイルパス
+        '''
+        prefix = os.path.join(data_dir, '')
+        if filepath.startswith(prefix): return os.path.join(old_dir, filepath[len(prefix):])
+        return os.path.join(old_dir, os.path.basename(filepath))
+
+    @staticmethod
+    def diff_mask(new, old):
+        '''クラスが変化した画素
+        アルファを除いた色を比較する
+
+        Args:
+            new (numpy.ndarray): 新しいdata画像（uint32 0xAARRGGBB）
+            old (numpy.ndarray): 古いdata画像（uint32 0xAARRGGBB）
+        Return:
+            numpy.ndarray: 変化した画素がTrueの配列（大きさが異なる場合はすべてTrue）
+        '''
+        if new.shape != old.shape: return np.ones(new.shape, dtype = bool)
+        return ((new ^ old) & 0x00FFFFFF) != 0
+
+    @staticmethod
+    def score(filepath, old_filepath):
+        '''差分スコア
+        スレッドプールで実行される
+
+        Args:
+            filepath (str): dataファイルパス
+            old_filepath (str): 旧dataファイルパス
+        Return:
+            float: クラスが変化した画素の割合（片方しか無い場合は1、どちらも無い場合は0）
+        '''
+        new = QImage(filepath)
+        old = QImage(old_filepath)
+        if new.isNull() or old.isNull(): return 0.0 if new.isNull() and old.isNull() else 1.0
+        a, new = ColorPickerUtil.qimage_to_array(new)
+        b, old = ColorPickerUtil.qimage_to_array(old)
+        mask = DiffScorer.diff_mask(a, b)
+        return float(np.count_nonzero(mask)) / mask.size
+
+    def _load_cache(self):
+        if not self._cache_filepath: return {}
+        try:
+            with open(self._cache_filepath, encoding = 'utf8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self, cache):
+        if not self._cache_filepath: return
+        tmp = self._cache_filepath + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(self._cache_filepath), exist_ok = True)
+            with open(tmp, 'w', encoding = 'utf8') as f:
+                json.dump(cache, f, separators = (',', ':'))
+            os.replace(tmp, self._cache_filepath)
+        except OSError:
+            pass
+
+    def _run(self):
+        '''計算処理
+        ワーカースレッドで実行される
+        キャッシュのキーが一致する分を先に通知し、残りをスレッドプールで計算する
+        '''
+        old_cache = self._load_cache()
+        cache = {}
+        done = []
+        jobs = []
+        for pos, filepath in enumerate(self._data_filepaths):
+            if self._cancel.is_set(): break
+            old_filepath = self.rebase(filepath, self._data_dir, self._old_dir)
+            key = [ImageCache.key(filepath), ImageCache.key(old_filepath)]
+            key = [list(k[1:]) if k else None for k in key]
+            entry = old_cache.get(filepath)
+            if entry and entry[:2] == key:
+                cache[filepath] = entry
+                done.append((pos, entry[2]))
+            else:
+                jobs.append((pos, filepath, old_filepath, key))
+        if done and not self._cancel.is_set(): self.progress.emit(done)
+        results = []
+        if jobs and not self._cancel.is_set():
+            with ThreadPoolExecutor(max_workers = self._workers) as executor:
+                scores = executor.map(DiffScorer.score, [j[1] for j in jobs], [j[2] for j in jobs])
+                for (pos, filepath, old_filepath, key), score in zip(jobs, scores):
+                    cache[filepath] = key + [score]
+                    results.append((pos, score))
+                    if len(results) >= self.BATCH_SIZE:
+                        self.progress.emit(results)
+                        results = []
+                    if self._cancel.is_set():
+                        # 未着手の分は取り消される
+                        scores.close()
+                        break
+        completed = not self._cancel.is_set()
+        if results and completed: self.progress.emit(results)
+        # 中断した場合は前回の結果も残す
+        if not completed:
+            old_cache.update(cache)
+            cache = old_cache
+        self._save_cache(cache)
+        self.finished.emit(completed)
+
+class TilePyramid():
+    '''タイルピラミッドクラス
+    巨大な画像をタイルに分割し、表示倍率に合った縮小レベルのタイルだけをQPixmapにする
+    タイルは描画に必要になった時点で作成し、上限を超えたら参照が古い順に破棄する（LRU）
+    元画像はフル解像度のQImageのまま保持するため、ピクセル参照はフル解像度で行える
+    '''
+
+    TILE_SIZE = 512
+    '''タイル1枚の大きさ（ピクセル）
+    '''
+
+    MAX_TILES = 128
+    '''保持するタイル数の上限（512x512x4byte x 128 = 128MB）
+    '''
+
+    def __init__(self, image, array = None):
+        '''コンストラクタ
+
+        Args:
+            image (QImage): フル解像度の画像
+            array (:obj:`numpy.ndarray`, optional): image の画素を参照する uint32 配列
+        '''
+        self._image = image
+        self._array = array
+        self._width = image.width()
+        self._height = image.height()
+        # (level, tx, ty) : QPixmap
+        self._tiles = OrderedDict()
+        # 最上位レベルはタイル1枚に収まる大きさ
+        self._levels = 1
+        while max(self._width, self._height) >> (self._levels - 1) > self.TILE_SIZE:
+            self._levels += 1
+
+    @property
+    def width(self):
+        return self._width
+
+    @property
+    def height(self):
+        return self._height
+
+    @property
+    def levels(self):
+        return self._levels
+
+    @property
+    def tile_count(self):
+        return len(self._tiles)
+
+    def level_for(self, scale):
+        '''縮小レベルの取得
+        画面1ピクセルに元画像の 2^level ピクセル以上が収まる最大のレベルを返す
+
+        Args:
+            scale (float): 表示倍率（画面ピクセル / 画像ピクセル）
+        Return:
+            int: 縮小レベル（0はフル解像度）
+        '''
+        level = 0
+        while level + 1 < self._levels and (1 << (level + 1)) * scale <= 1:
+            level += 1
+        return level
+
+    def tile(self, level, tx, ty):
+        '''タイル取得
+        作成済みであればそれを返し、無ければ元画像から間引いて作成する
+        data画像の色が混ざらないよう、縮小は補間せずに間引きで行う
+
+        Args:
+            level (int): 縮小レベル
+            tx (int): タイルのx番号
+            ty (int): タイルのy番号
+        Return:
+            QPixmap: タイル
+        '''
+        key = (level, tx, ty)
+        pixmap = self._tiles.get(key)
+        if pixmap is not None:
+            self._tiles.move_to_end(key)
+            return pixmap
+        step = 1 << level
+        span = self.TILE_SIZE * step
+        x0 = tx * span
+        y0 = ty * span
+        x1 = min(x0 + span, self._width)
+        y1 = min(y0 + span, self._height)
+        if self._array is not None:
+            tile = np.ascontiguousarray(self._array[y0:y1:step, x0:x1:step])
+            # tile はこの関数を抜けると解放されるため、QImage側にコピーしておく
+            image = QImage(tile.data, tile.shape[1], tile.shape[0], tile.strides[0], self._image.format()).copy()
+        else:
+            image = self._image.copy(x0, y0, x1 - x0, y1 - y0)
+            if step > 1:
+                image = image.scaled((x1 - x0 + step - 1) // step, (y1 - y0 + step - 1) // step, Qt.IgnoreAspectRatio, Qt.FastTransformation)
+        pixmap = QPixmap.fromImage(image)
+        self._tiles[key] = pixmap
+        return pixmap
+
+    def paint(self, painter, rect):
+        '''描画
+        rect と交差するタイルだけを、painter の倍率に合ったレベルで描画する
+        描画後、上限を超えたタイル（画面外のものから順）を破棄する
+
+        Args:
+            painter (QPainter): ペインタ
+            rect (QRectF): 描画範囲（画像座標）
+        '''
+        level = self.level_for(QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform()))
+        step = 1 << level
+        span = self.TILE_SIZE * step
+        rect = rect.intersected(QRectF(0, 0, self._width, self._height))
+        if rect.isEmpty(): return
+        # 端数のある範囲も、かかっているタイルはすべて描画する
+        for ty in range(math.floor(rect.top()) // span, (math.ceil(rect.bottom()) - 1) // span + 1):
+            for tx in range(math.floor(rect.left()) // span, (math.ceil(rect.right()) - 1) // span + 1):
+                pixmap = self.tile(level, tx, ty)
+                target = QRectF(tx * span, ty * span, pixmap.width() * step, pixmap.height() * step)
+                painter.drawPixmap(target, pixmap, QRectF(pixmap.rect()))
+        while len(self._tiles) > self.MAX_TILES:
+            self._tiles.popitem(last = False)
+
+class QPixmapItem(QGraphicsPixmapItem):
+    '''QGaphicsPixmapItem拡張クラス
+    読み込んだ画像のファイルパスを保持し（なお使用していない模様）、指定ピクセルの色データをRGBで取得する
+    TILED_PIXELS を超える画像は1枚のQPixmapにせず、TilePyramidで表示範囲のタイルだけを描画する
+    '''
+
+    TILED_PIXELS = 8192 * 8192
+    '''タイル表示に切り替える画素数
+    '''
+
+    def __init__(self, filepath = ''):
+        super().__init__()
+        self._image = None
+        # 画素データを直接参照するnumpy配列（numpyが無い場合はNone）
+        self._array = None
+        # 巨大画像のタイル（通常の画像はNone）
+        self._pyramid = None
+        # paint で option.exposedRect を使う
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)
+        self.filepath = filepath
+
+    @property
+    def filepath(self):
+        return self._filepath
+
+    @filepath.setter
+    def filepath(self, filepath):
+        '''filepath setter
+        ファイルパスの設定と同時にpixmapも設定する
+
+        Args:
+            filepath (str): media/dataファイルパス
+        '''
+        self.set_image(filepath, QImage(filepath) if filepath else None)
+
+    def set_image(self, filepath, image):
+        '''デコード済み画像の設定
+        ファイルパスとデコード済みのQImageを設定する
+        ファイルの読み込みを行わないため、先読みした画像をそのまま表示できる
+
+        Args:
+            filepath (str): media/dataファイルパス
+            image (QImage): デコード済みの画像
+        '''
+        self._filepath = filepath
+        self.prepareGeometryChange()
+        self._pyramid = None
+        if image is not None and not image.isNull():
+            self._image = image
+            self._array = None
+            if np is not None:
+                self._array, self._image = ColorPickerUtil.qimage_to_array(image)
+            if image.width() * image.height() > self.TILED_PIXELS:
+                self._pyramid = TilePyramid(self._image, self._array)
+                self.setPixmap(QPixmap())
+            else:
+                self.setPixmap(QPixmap.fromImage(image))
+        else:
+            self.setPixmap(QPixmap())
+            self._image = None
+            self._array = None
+
+    def boundingRect(self):
+        if self._pyramid:
+            return QRectF(0, 0, self._pyramid.width, self._pyramid.height)
+        return super().boundingRect()
+
+    def shape(self):
+        if self._pyramid:
+            path = QPainterPath()
+            path.addRect(self.boundingRect())
+            return path
+        return super().shape()
+
+    def contains(self, point):
+        if self._pyramid:
+            return self.boundingRect().contains(point)
+        return super().contains(point)
+
+    def paint(self, painter, option, widget):
+        '''描画
+        タイル表示の場合は表示範囲のタイルだけを描画する
+        '''
+        if self._pyramid:
+            self._pyramid.paint(painter, option.exposedRect)
+        else:
+            super().paint(painter, option, widget)
+
+    def pixel(self, pos):
+        '''ピクセルの色取得
+        引数のQPointで指定されたピクセルの色（0xRRGGBB）を取得する
+
+        Args:
+            pos (QPoint): ピクセルの位置
+        Return:
+            int: RGB
+        '''
+        if self._array is not None:
+            rgb = self.pixel_at(pos.x(), pos.y())
+            return 0 if rgb is None else rgb
+        # 0xAARRGGBBからAlphaを取り除く
+        return self._image.pixel(pos) & 0x00FFFFFF
+
+    def pixel_at(self, x, y):
+        '''ピクセルの色取得（範囲チェック付き）
+        numpy配列があればPyQtを経由せずに直接参照する
+        マウス移動のたびに呼ばれるため、範囲外の場合は警告を出さずにNoneを返す
+
+        Args:
+            x (int): x座標
+            y (int): y座標
+        Return:
+            int: RGB（画像が無い、もしくは範囲外の場合はNone）
+        '''
+        if self._image is None: return None
+        if x < 0 or y < 0 or x >= self._image.width() or y >= self._image.height(): return None
+        if self._array is not None:
+            return int(self._array[y, x]) & 0x00FFFFFF
+        return self._image.pixel(x, y) & 0x00FFFFFF
+    
+    @property
+    def image(self):
+        return self._image
+
+    @property
+    def array(self):
+        return self._array
+
+class QPopupItem(QGraphicsSimpleTextItem):
+    '''ポップアップアイテムクラス
+    クリックした位置に n 秒間テキストを表示する
+    QGraphicsTextItemを継承すると謎のmouseMoveEventが発生するので諦めた
+    '''
+    def __init__(self, text = ''):
+        super().__init__(text)
+        # Viewのscaleを無視して描画
+        self.setFlag(QGraphicsItem.ItemIgnoresTransformations, True)
+        self._background_brush = Qt.black
+        self._timer = None
+
+    def paint(self, painter, option, widget):
+        painter.fillRect(self.boundingRect(), self._background_brush)
+        super().paint(painter, option, widget)
+
+    def popup(self, text, pos, sec = 1.0):
+        '''ポップアップの表示
+        text を pos の位置に sec 秒間表示する
+
+        Args:
+            text (str): テキスト
+            pos (QPoint): 表示する位置
+            sec (:obj:`float`, optional): 表示する時間（デフォルトは1秒）
+        '''
+        # タイマーが開始していたらキャンセルして破棄
+        if self._timer: self._timer.cancel()
+        self.setText(text)
+        self.setPos(pos)
+        self.setVisible(True)
+        # sec秒後に非表示とするタイマー開始
+        self._timer = Timer(sec, lambda: self.setVisible(False))
+        self._timer.start()
+
+    def setTextBrush(self, brush):
+        self.setBrush(brush)
+
+    def setBackgroundBrush(self, brush):
+        self._background_brush = brush
+
+class QGridItem(QGraphicsItem):
+    '''グリッドクラス
+    グリッド線を表示するクラス
+    描画範囲（exposedRect）と交差する線だけを描画し、描画結果はデバイス座標でキャッシュする
+    間隔や表示有無を変更した場合は、このアイテムのキャッシュだけを作り直す
+    '''
+
+    def __init__(self, width = 100, height = 100, grid_color = Qt.gray, grid_gap = 20, grid_vertical_visible = False, grid_horizontal_visible = False, parent = None):
+        '''コンストラクタ
+        各種プロパティを初期化する
+
+        Args:
+            width (:obj:`int`, optional): 横幅
+            height (:obj:`int`, optional): 縦幅
+            grid_color (:obj:`QColor`, optional): グリッド線の色
+            grid_gap (:obj:`int`, optional): グリッド線の間隔
+            grid_vertical_visible (:obj:`bool`, optional): 縦線の表示有無
+            grid_horizontal_visible (:obj:`bool`, optional): 横線の表示有無
+            parent (QWidget): 親Widget？
+        '''
+        super().__init__(parent)
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        self._width = width
+        self._height = height
+        self.grid_vertical_visible = grid_vertical_visible
+        self.grid_horizontal_visible = grid_horizontal_visible
+        self.grid_color = grid_color
+        self.grid_gap = grid_gap
+
+    def boundingRect(self):
+        '''矩形の取得
+        短径の位置とサイズを取得する
+
+        Return:
+            QRectF: 0, 0, 横幅, 縦幅
+        '''
+        #pen_width = 1
+        #return QRectF(-width / 2 - pen_width / 2, -height / 2 - pen_width / 2, width + pen_width, height + pen_width)
+        return QRectF(0, 0, self._width, self._height)
+
+    @property
+    def width(self):
+        return self._width
+    
+    @width.setter
+    def width(self, width):
+        self.prepareGeometryChange()
+        self._width = width
+    
+    @property
+    def height(self):
+        return self._height
+    
+    @height.setter
+    def height(self, height):
+        self.prepareGeometryChange()
+        self._height = height
+
+    @property
+    def grid_color(self):
+        return self._grid_color
+
+    @grid_color.setter
+    def grid_color(self, color):
+        self._grid_color = color
+        self.update()
+
+    @property
+    def grid_gap(self):
+        return self._grid_gap
+    
+    @grid_gap.setter
+    def grid_gap(self, grid_gap):
+        self._grid_gap = max(1, int(grid_gap))
+        self.update()
+
+    @property
+    def grid_vertical_visible(self):
+        return self._grid_vertical_visible
+    
+    @grid_vertical_visible.setter
+    def grid_vertical_visible(self, visible):
+        self._grid_vertical_visible = visible
+        self.update()
+
+    @property
+    def grid_horizontal_visible(self):
+        return self._grid_horizontal_visible
+    
+    @grid_horizontal_visible.setter
+    def grid_horizontal_visible(self, visible):
+        self._grid_horizontal_visible = visible
+        self.update()
+
+    def paint(self, painter, option, widget):
+        '''描画
+        描画範囲と交差するグリッド線だけを、まとめて1回で描画する
+
+        Args:
+            painter (QPaint): ペイント
+            option (QOption): オプション
+            widget (QWidget): Widget
+        '''
+        rect = option.exposedRect.intersected(self.boundingRect())
+        if rect.isEmpty(): return
+        gap = self.grid_gap
+        lines = []
+        if self.grid_horizontal_visible:
+            # 描画範囲より上にある最後の線から始める
+            first = max(gap, int(rect.top()) // gap * gap)
+            lines.extend(QLineF(rect.left(), h, rect.right(), h) for h in range(first, min(int(rect.bottom()) + 1, self._height), gap))
+        if self.grid_vertical_visible:
+            first = max(gap, int(rect.left()) // gap * gap)
+            lines.extend(QLineF(w, rect.top(), w, rect.bottom()) for w in range(first, min(int(rect.right()) + 1, self._width), gap))
+        if not lines: return
+        painter.setPen(self.grid_color)
+        painter.drawLines(lines)
+
+class QColorPickerScene(QGraphicsScene):
+    '''QGraphicsScene拡張クラス
+    画像部分を表示するSceneクラス
+    '''
+    def __init__(self):
+        '''コンストラクタ
+        UIとUtilの初期化を行う
+        '''
+        super().__init__()
+        self._util = ColorPickerUtil()
+        self.init_ui()
+    
+    def init_ui(self):
+        '''UI初期化
+        data/media画像アイテム、グリッドアイテム、ポップアップアイテムの初期化を行う
+        '''
+        self._data_pixmap_item = QPixmapItem()
+        self._data_pixmap_item.mousePressEvent = self.data_pixmap_click
+
+        self._media_pixmap_item = QPixmapItem()
+        self._media_pixmap_item.setOpacity(0)
+        self._media_pixmap_item.setParentItem(self._data_pixmap_item)
+
+        # media画像より上に重ねる
+        self._contour_item = QPixmapItem()
+        self._contour_item.setParentItem(self._data_pixmap_item)
+        self._contour_item.setVisible(False)
+        self._outline = False
+        self._media_opacity = 0
+
+        self._diff_item = QPixmapItem()
+        self._diff_item.setParentItem(self._data_pixmap_item)
+        self._diff_item.setVisible(False)
+        self._diff_visible = True
+
+        self._grid_item = QGridItem(grid_gap = 50, grid_horizontal_visible = True)
+        self._grid_item.setParentItem(self._data_pixmap_item)
+        self._grid_item.setVisible(False)
+
+        self._region_item = QGraphicsPixmapItem()
+        self._region_item.setParentItem(self._data_pixmap_item)
+        self._region_index = None
+
+        self._popup_item = QPopupItem()
+        self._popup_item.setParentItem(self._data_pixmap_item)
+        self._popup_item.setBackgroundBrush(Qt.white)
+        self._popup_item.setFont(QFont('ＭＳ ゴシック', 18, QFont.Bold))
+
+        self.addItem(self._data_pixmap_item)
+    
+    REGION_HIGHLIGHT_COLOR = 0x80FFFF00
+    '''クリックした領域の強調色（0xAARRGGBB）
+    '''
+
+    DIFF_HIGHLIGHT_COLOR = 0xE0FF00FF
+    '''比較用data画像とクラスが異なる画素の強調色（0xAARRGGBB）
+    '''
+
+    def data_pixmap_click(self, event):
+        '''画像クリックイベント
+        画像が読み込まれている場合はクリック位置の少し右にポップアップを表示する
+        領域インデックスが作成済みであれば、領域の面積と外接矩形も表示して領域全体を強調する
+        '''
+        if self._data_pixmap_item.image is None: return
+
+        pos = event.pos().toPoint()
+        popup_pos = QPointF(event.pos().x() + 15, event.pos().y())
+        index = self._region_index
+        region = index.region(pos.x(), pos.y()) if index else None
+        if region is None:
+            # 前回クリックした領域の強調は消す
+            self._region_item.setVisible(False)
+            color = self._data_pixmap_item.pixel(pos)
+            self._popup_item.popup(self._util.color_to_object_name(color), popup_pos, 1.0)
+            return
+        x0, y0, x1, y1 = index.bbox[region]
+        self._popup_item.popup('{}\n{}px ({},{})-({},{})'.format(
+            self._util.color_to_object_name(int(index.color[region])), index.area[region], x0, y0, x1, y1), popup_pos, 1.0)
+        self._highlight_region(index, region)
+
+    def _highlight_region(self, index, region):
+        '''領域の強調表示
+        領域の外接矩形分だけのマスク画像を作成して重ねる
+
+        Args:
+            index (RegionIndex): 領域インデックス
+            region (int): 領域番号
+        '''
+        x0, y0, x1, y1 = index.bbox[region]
+        argb = np.where(index.mask(region), np.uint32(self.REGION_HIGHLIGHT_COLOR), np.uint32(0))
+        image = QImage(argb.data, argb.shape[1], argb.shape[0], argb.strides[0], QImage.Format_ARGB32)
+        self._region_item.setPixmap(QPixmap.fromImage(image))
+        self._region_item.setPos(int(x0), int(y0))
+        self._region_item.setVisible(True)
+
+    def object_name_at(self, scene_pos):
+        '''オブジェクト名取得
+        sceneの座標にあるdata画像のピクセルのオブジェクト名を取得する
+
+        Args:
+            scene_pos (QPointF): sceneの座標
+        Return:
+            str: "x,y : オブジェクト名"（画像外の場合はNone）
+        '''
+        pos = self._data_pixmap_item.mapFromScene(scene_pos)
+        x = int(pos.x())
+        y = int(pos.y())
+        rgb = self._data_pixmap_item.pixel_at(x, y)
+        if rgb is None: return None
+        return '{},{} : {}'.format(x, y, self._util.color_to_object_name(rgb))
+
+    def set_region_index(self, filepath, index):
+        '''領域インデックスの設定
+        表示中のdata画像のインデックスでなければ無視する
+
+        Args:
+            filepath (str): dataファイルパス
+            index (RegionIndex): 領域インデックス
+        '''
+        if filepath == self.data_filepath:
+            self._region_index = index
+
+    @property
+    def data_filepath(self):
+        return self._data_pixmap_item.filepath
+    
+    @data_filepath.setter
+    def data_filepath(self, filepath):
+        '''data_filepath setter
+        data画像ファイルを設定する
+        '''
+        self.set_data_image(filepath, QImage(filepath))
+
+    def set_data_image(self, filepath, image):
+        '''data画像の設定
+        デコード済みのdata画像を設定する
+        更に画像のサイズを元にグリッドのサイズ変更も行う
+
+        Args:
+            filepath (str): dataファイルパス
+            image (QImage): デコード済みの画像
+        '''
+        self._data_pixmap_item.set_image(filepath, image)
+        self._region_index = None
+        self._region_item.setVisible(False)
+        self.set_diff_image(None, None)
+        self.set_contour_image('', None)
+        if self._data_pixmap_item.image is not None:
+            self._grid_item.width = self._data_pixmap_item.image.width()
+            self._grid_item.height = self._data_pixmap_item.image.height()
+
+    def set_diff_image(self, filepath, image):
+        '''比較用data画像の設定
+        表示中のdata画像と画素ごとにクラス（色）を比較し、異なる画素を強調色で塗った画像を重ねる
+        比較用data画像が無い場合はすべての画素を異なるものとする
+        numpyが無い環境では何もしない
+
+        Args:
+            filepath (str): 比較用dataファイルパス（Noneの場合は比較をやめる）
+            image (QImage): デコード済みの比較用data画像
+        '''
+        self._diff_item.set_image('', None)
+        self._diff_item.setVisible(False)
+        new = self._data_pixmap_item.array
+        if not filepath or new is None: return
+        if image is not None and not image.isNull():
+            old, image = ColorPickerUtil.qimage_to_array(image)
+            mask = DiffScorer.diff_mask(new, old)
+        else:
+            mask = np.ones(new.shape, dtype = bool)
+        highlight = np.where(mask, np.uint32(self.DIFF_HIGHLIGHT_COLOR), np.uint32(0))
+        self._diff_item.set_image(filepath, MappedImage(highlight))
+        self._diff_item.setVisible(self._diff_visible)
+
+    def set_contour_image(self, filepath, image):
+        '''輪郭画像の設定
+
+        Args:
+            filepath (str): dataファイルパス
+            image (QImage): LabelContour で作成した輪郭画像（Noneの場合は消す）
+        '''
+        self._contour_item.set_image(filepath, image)
+        self._contour_item.setVisible(self._outline and self._contour_item.image is not None)
+
+    @property
+    def outline(self):
+        return self._outline
+
+    @outline.setter
+    def outline(self, outline):
+        '''outline setter
+        輪郭表示中はmedia画像を不透明にし、塗りつぶしのdata画像の代わりに輪郭だけを重ねる
+        '''
+        self._outline = outline
+        self._media_pixmap_item.setOpacity(1 if outline else self._media_opacity)
+        self._contour_item.setVisible(outline and self._contour_item.image is not None)
+
+    @property
+    def diff_filepath(self):
+        return self._diff_item.filepath
+
+    def setDiffVisible(self, visible):
+        self._diff_visible = visible
+        self._diff_item.setVisible(visible and self._diff_item.image is not None)
+
+    @property
+    def media_filepath(self):
+        return self._media_pixmap_item.filepath
+    
+    @media_filepath.setter
+    def media_filepath(self, filepath):
+        self._media_pixmap_item.filepath = filepath
+
+    def set_media_image(self, filepath, image):
+        '''media画像の設定
+        デコード済みのmedia画像を設定する
+
+        Args:
+            filepath (str): mediaファイルパス
+            image (QImage): デコード済みの画像
+        '''
+        self._media_pixmap_item.set_image(filepath, image)
+
+    @property
+    def media_opacity(self):
+        return self._media_opacity
+    
+    @media_opacity.setter
+    def media_opacity(self, opacity):
+        self._media_opacity = opacity
+        if not self._outline: self._media_pixmap_item.setOpacity(opacity)
+    
+    def setGridVisible(self, visible):
+        self._grid_item.setVisible(visible)
+    
+    def hasImage(self):
+        return (self._data_pixmap_item.image is not None) and (self._media_pixmap_item.image is not None)
+
+class GView(QGraphicsView):
+    '''QGraphicsView拡張クラス
+    QQColorPickerSceneを表示するViewクラス
+    マウスホイールのズームアウトやドラッグ時のスクロール機能を持つ
+    ホバーモード中はカーソル位置のオブジェクト名をシグナルで通知する
+    '''
+
+    hover = pyqtSignal(str)
+    '''ホバーシグナル
+    カーソル位置のオブジェクト名（画像外の場合は空文字）
+    '''
+
+    HOVER_INTERVAL = 7
+    '''ホバー判定の間隔（ミリ秒）
+    144Hzの1フレーム分。この間のマウス移動は最後の位置だけを判定する
+    '''
+
+    def __init__(self):
+        super().__init__()
+        # 移動前のマウス位置
+        self._old_mouse_point = None
+        # window fit フラグ
+        self._fitting = False
+        # ホバー判定待ちのマウス位置
+        self._hover_point = None
+        self._hover_text = None
+        self._hover_timer = QTimer(self)
+        self._hover_timer.setSingleShot(True)
+        self._hover_timer.setInterval(self.HOVER_INTERVAL)
+        self._hover_timer.timeout.connect(self._update_hover)
+
+        scene = QColorPickerScene()
+        self.setScene(scene)
+    
+        scene.setBackgroundBrush(Qt.lightGray)
+
+    def mousePressEvent(self, event):
+        '''クリックイベント
+        移動前のマウス位置を設定し、イベントを後続に渡す
+
+        Args:
+            event (QMouseEvent): マウスイベント
+        '''
+        self._old_mouse_point = event.pos()
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        '''ドラッグイベント
+        マウスの移動距離に応じてスクロールさせる
+        ホバーモード中はボタンを押していなくても呼ばれるため、その場合はホバー判定だけを予約する
+
+        Args:
+            event (QMouseEvent): マウスイベント
+        '''
+        if self.hasMouseTracking():
+            self._hover_point = event.pos()
+            if not self._hover_timer.isActive(): self._hover_timer.start()
+        if not event.buttons() or self._old_mouse_point is None: return
+        off_x = self._old_mouse_point.x() - event.pos().x()
+        off_y = self._old_mouse_point.y() - event.pos().y()
+        off_x = off_x if abs(off_x) > 2 else 0
+        off_y = off_y if abs(off_y) > 2 else 0
+        
+        self.horizontalScrollBar().setValue(self.horizontalScrollBar().value() + off_x)
+        self.verticalScrollBar().setValue(self.verticalScrollBar().value() + off_y)
+
+        self._old_mouse_point = QPoint(event.pos().x(), event.pos().y())
+
+    def hover_on(self):
+        '''Hover on
+        マウス移動の追跡を開始する
+        '''
+        self.setMouseTracking(True)
+        self.viewport().setMouseTracking(True)
+
+    def hover_off(self):
+        '''Hover off
+        マウス移動の追跡を終了する
+        '''
+        self.setMouseTracking(False)
+        self.viewport().setMouseTracking(False)
+        self._hover_timer.stop()
+        self._hover_text = None
+        self.hover.emit('')
+
+    def _update_hover(self):
+        '''ホバー判定
+        最後のマウス位置のオブジェクト名を取得し、変化した場合のみ通知する
+        '''
+        if self._hover_point is None: return
+        text = self.scene().object_name_at(self.mapToScene(self._hover_point)) or ''
+        if text != self._hover_text:
+            self._hover_text = text
+            self.hover.emit(text)
+
+    def wheelEvent(self, event):
+        '''ホイールイベント
+        ホイールの動きに応じてズームイン、ズームアウトを行う
+        '''
+        if event.angleDelta().y() > 0:
+            self.zoom_in()
+        else:
+            self.zoom_out()
+
+    def zoom_in(self):
+        '''ズームイン
+        1.25倍にする
+
+        TODO:
+            マウス位置を中心にズームさせたい
+        '''
+        if not self._fitting: self.scale(1.25, 1.25)
+    
+    def zoom_out(self):
+        '''ズームアウト
+        0.8倍にする
+
+        TODO:
+            マウス位置を中心にズームアウトさせたい
+        '''
+        if not self._fitting: self.scale(0.8, 0.8)
+    
+    def zoom_reset(self):
+        '''ズームリセット
+        fit中でなければズームのリセットを行う
+        '''
+        if not self._fitting: self.resetTransform()
+
+    def fit_on(self):
+        '''Fit on
+        Window FitをONにする
+        TODO:
+            拡大してからFITさせると微妙な余白が生まれる
+        '''
+        self._fitting = True
+        self.hasImage()
+        self.fitInView(self.scene().sceneRect(), Qt.KeepAspectRatio)
+        
+        #self.fitInView(QRectF(self.contentsRect()), Qt.KeepAspectRatio)
+
+    def fit_off(self):
+        '''Fit off
+        Window FitをOFFにする
+        '''
+        self._fitting = False
+        self.resetTransform()
+    
+    def grid_on(self):
+        '''Grid on
+        グリッドを表示する
+        '''
+        self.scene().setGridVisible(True)
+    
+    def grid_off(self):
+        '''Grid off
+        グリッドを非表示にする
+        '''
+        self.scene().setGridVisible(False)
+
+    def hasImage(self):
+        return self.scene().hasImage()
+
+class QIndexLabel(QLabel):
+    '''インデックスラベル
+    現在のインデックス／全体の形式でラベルを表示する
+    '''
+    def __init__(self, parent = None):
+        super().__init__(parent)
+        self._index = 0
+        self._max_index = 0
+
+    @property
+    def index(self):
+        return self._index
+    
+    @index.setter
+    def index(self, index):
+        self._index = index
+        self.setText('{:03d}/{:03d}'.format(self._index, self._max_index))
+    
+    @property
+    def max_index(self):
+        return self._max_index
+    
+    @max_index.setter
+    def max_index(self, max_index):
+        self._max_index = max_index
+        self.setText('{:03d}/{:03d}'.format(self._index, self._max_index))
+
+class PathIndex():
+    '''パス索引クラス
+    ファイルパスを基底パスからの相対パス（区切りは /）の文字列順に並べ、一覧での位置と組にして持つ
+    ファイルの位置、ディレクトリ以下の範囲を二分探索で求める
+    '''
+    def __init__(self, root = '', filepaths = ()):
+        '''コンストラクタ
+
+        Args:
+            root (str): 基底パス
+            filepaths (list): ファイルパスのリスト（一覧の順）
+        '''
+        self._prefix = os.path.join(root, '') if root else ''
+        self._entries = sorted((self.key(fp), i) for i, fp in enumerate(filepaths))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, filepath):
+        '''相対パス
+
+        Args:
+            filepath (str): ファイルパス
+        Return:
+            str: 基底パスからの相対パス（区切りは /）
+        '''
+        if self._prefix and filepath.startswith(self._prefix): filepath = filepath[len(self._prefix):]
+        return filepath.replace(os.path.sep, '/') if os.path.sep != '/' else filepath
+
+    def index(self, pos):
+        '''一覧での位置
+
+        Args:
+            pos (int): 索引上の位置
+        Return:
+            int: ファイルパスのリストでの位置
+        '''
+        return self._entries[pos][1]
+
+    def find(self, filepath):
+        '''ファイル検索
+
+        Args:
+            filepath (str): ファイルパス
+        Return:
+            int: ファイルパスのリストでの位置（無い場合は None）
+        '''
+        key = self.key(filepath)
+        pos = bisect.bisect_left(self._entries, (key,))
+        if pos < len(self._entries) and self._entries[pos][0] == key: return self._entries[pos][1]
+        return None
+
+    def range(self, dirkey):
+        '''ディレクトリ以下の範囲
+        同じ接頭辞を持つ相対パスは文字列順で連続する
+
+        Args:
+            dirkey (str): ディレクトリの相対パス（基底パスは空文字）
+        Return:
+            tuple: 索引上の範囲 (先頭, 終わり)
+        '''
+        if not dirkey: return 0, len(self._entries)
+        # '0' は '/' の次の文字
+        return (bisect.bisect_left(self._entries, (dirkey + '/',)),
+            bisect.bisect_left(self._entries, (dirkey + '0',)))
+
+    def child(self, dirkey, pos):
+        '''pos にある子
+
+        Args:
+            dirkey (str): ディレクトリの相対パス（基底パスは空文字）
+            pos (int): 索引上の位置（dirkey の範囲内）
+        Return:
+            tuple: (名前, 索引上の子の範囲の終わり, ディレクトリであればTrue)
+        '''
+        prefix = dirkey + '/' if dirkey else ''
+        name, slash, _ = self._entries[pos][0][len(prefix):].partition('/')
+        if not slash: return name, pos + 1, False
+        # サブディレクトリ以下は読み飛ばす
+        return name, bisect.bisect_left(self._entries, (prefix + name + '0',), pos), True
+
+class FileTreeItem():
+    '''ファイルツリーのアイテムクラス
+    treetest の TreeItem と同じく行番号を持ち、子は fetchMore で必要な分だけ作る
+    m_begin, m_end は PathIndex 上の範囲、m_next は未読み込みの子の位置（全て読み込み済みなら None）
+    '''
+
+    # 40万ファイル規模でもメモリを抑えるため __dict__ を持たない
+    __slots__ = ('m_childItems', 'm_itemData', 'm_parentItem', 'm_row', 'm_next', 'm_end', 'm_begin', 'm_key', 'm_dir')
+
+    def __init__(self, key, name, begin, end, is_dir, parent = None):
+        '''コンストラクタ
+
+        Args:
+            key (str): 相対パス（基底パスは空文字）
+            name (str): 表示名
+            begin (int): PathIndex 上の範囲の先頭
+            end (int): PathIndex 上の範囲の終わり
+            is_dir (bool): ディレクトリであればTrue
+            parent (FileTreeItem): 親アイテム
+        '''
+        self.m_childItems = []
+        # [名前, 画像数, dataファイルが無い数（数え終わるまでは None）]
+        self.m_itemData = [name, end - begin, None]
+        self.m_parentItem = parent
+        self.m_row = 0
+        self.m_next = begin if is_dir and begin < end else None
+        self.m_end = end
+        self.m_begin = begin
+        self.m_key = key
+        self.m_dir = is_dir
+
+    def appendChild(self, item):
+        item.m_row = len(self.m_childItems)
+        self.m_childItems.append(item)
+
+    def canFetchMore(self):
+        return self.m_next is not None
+
+    def hasChildren(self):
+        return bool(self.m_childItems) or self.m_next is not None
+
+    def child(self, row):
+        if row < 0 or row >= len(self.m_childItems):
+            return None
+        return self.m_childItems[row]
+
+    def childCount(self):
+        return len(self.m_childItems)
+
+    def data(self, column):
+        return self.m_itemData[column]
+
+    def parentItem(self):
+        return self.m_parentItem
+
+    def row(self):
+        return self.m_row
+
+class QFileTreeModel(QAbstractItemModel):
+    '''ファイルツリーモデルクラス
+    treetest の TreeModel を元に、mediaディレクトリの階層を PathIndex の範囲から遅延読み込みする
+    画像数は範囲の幅、dataファイルが無い数はワーカースレッドで索引順に数えた累積値の差で求め、アイテムに保持する
+    '''
+
+    FETCH_SIZE = 256
+    '''fetchMore 1回で作るアイテム数'''
+
+    COUNT_BATCH = 5000
+    '''dataファイルの有無をこの件数数えるごとに通知する'''
+
+    HEADER = ['name', 'images', 'missing']
+
+    _indexed = pyqtSignal(int, object, object)
+    '''索引作成完了シグナル（ワーカースレッド -> モデル）
+    (世代, PathIndex, dataファイルが無い数の累積値のリスト)
+    '''
+
+    _counted = pyqtSignal(int)
+    '''dataファイルの有無の集計進捗シグナル（ワーカースレッド -> モデル）
+    (世代)
+    '''
+
+    def __init__(self, parent = None):
+        '''コンストラクタ
+
+        Args:
+            parent (QObject): 親オブジェクト
+        '''
+        super().__init__(parent)
+        self._index = PathIndex()
+        self._missing = [0]
+        self._root_item = FileTreeItem('', '', 0, 0, True)
+        self._pending = set()
+        self._generation = 0
+        self._cancel = Event()
+        self._executor = ThreadPoolExecutor(max_workers = 1)
+        self._indexed.connect(self._on_indexed)
+        self._counted.connect(self._on_counted)
+
+    def set_files(self, root, media_filepaths, data_filepaths):
+        '''ファイル一覧の設定
+        索引の作成とdataファイルの有無の集計はワーカースレッドで行い、索引ができた時点でツリーを作り直す
+
+        Args:
+            root (str): mediaファイルの基底パス
+            media_filepaths (list): mediaファイルパスのリスト
+            data_filepaths (list): dataファイルパスのリスト
+        '''
+        self.clear()
+        self._executor.submit(self._build, self._generation, self._cancel, root, media_filepaths, data_filepaths)
+
+    def clear(self):
+        '''ツリーを空にする
+        作成中の索引、集計は中断する
+        '''
+        self._cancel.set()
+        self._cancel = Event()
+        self._generation += 1
+        self._reset(PathIndex(), [0])
+
+    def shutdown(self):
+        '''終了処理
+        '''
+        self._cancel.set()
+        self._executor.shutdown(wait = False)
+
+    def media_index(self, index):
+        '''アイテムが指すmediaファイルの位置
+        ディレクトリは索引上の先頭（文字列順で最初）のファイル
+
+        Args:
+            index (QModelIndex): アイテムのインデックス
+        Return:
+            int: mediaファイルパスのリストでの位置（無い場合は None）
+        '''
+        item = self.itemFromIndex(index)
+        if item.m_begin >= item.m_end: return None
+        return self._index.index(item.m_begin)
+
+    @property
+    def path_index(self):
+        return self._index
+
+    def columnCount(self, parent = QModelIndex()):
+        return len(self.HEADER)
+
+    def data(self, index, role = Qt.DisplayRole):
+        if not index.isValid(): return None
+        item = index.internalPointer()
+        column = index.column()
+        if role == Qt.TextAlignmentRole and column > 0:
+            return Qt.AlignRight | Qt.AlignVCenter
+        if role != Qt.DisplayRole: return None
+        if column == 0: return item.data(0)
+        if not item.m_dir:
+            # ファイルは data ファイルが無い場合のみ表示する
+            return 'missing' if column == 2 and self._missing_count(item) else None
+        if column == 1: return str(item.data(1))
+        missing = self._missing_count(item)
+        return '' if missing is None else str(missing)
+
+    def flags(self, index):
+        if not index.isValid(): return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def headerData(self, section, orientation, role = Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole: return self.HEADER[section]
+        return None
+
+    def index(self, row, column, parent = QModelIndex()):
+        if not self.hasIndex(row, column, parent): return QModelIndex()
+        child = self.itemFromIndex(parent).child(row)
+        return self.createIndex(row, column, child) if child else QModelIndex()
+
+    def parent(self, index):
+        if not index.isValid(): return QModelIndex()
+        parent = index.internalPointer().parentItem()
+        if parent is None or parent is self._root_item: return QModelIndex()
+        return self.createIndex(parent.row(), 0, parent)
+
+    def rowCount(self, parent = QModelIndex()):
+        if parent.column() > 0: return 0
+        return self.itemFromIndex(parent).childCount()
+
+    def hasChildren(self, parent = QModelIndex()):
+        if parent.column() > 0: return False
+        return self.itemFromIndex(parent).hasChildren()
+
+    def canFetchMore(self, parent):
+        if parent.column() > 0: return False
+        return self.itemFromIndex(parent).canFetchMore()
+
+    def fetchMore(self, parent):
+        '''未読み込みの子を FETCH_SIZE 件だけ読み込んで追加する
+        '''
+        item = self.itemFromIndex(parent)
+        items = self.fetchChildren(item, self.FETCH_SIZE)
+        if not items: return
+        first = item.childCount()
+        self.beginInsertRows(parent, first, first + len(items) - 1)
+        for child in items:
+            item.appendChild(child)
+        self.endInsertRows()
+
+    def itemFromIndex(self, index):
+        if not index.isValid(): return self._root_item
+        return index.internalPointer()
+
+    def fetchChildren(self, item, count):
+        '''item の未読み込みの子を最大 count 件作る
+        サブディレクトリ以下は二分探索で読み飛ばすので、作った件数分の処理で済む
+        '''
+        items = []
+        pos = item.m_next
+        while pos is not None and pos < item.m_end and len(items) < count:
+            name, end, is_dir = self._index.child(item.m_key, pos)
+            key = item.m_key + '/' + name if item.m_key else name
+            items.append(FileTreeItem(key, name, pos, end, is_dir, item))
+            pos = end
+        item.m_next = pos if pos is not None and pos < item.m_end else None
+        return items
+
+    def _missing_count(self, item):
+        '''dataファイルが無い数
+        集計が範囲の終わりまで進んでいればアイテムに保持し、まだであれば集計の進捗を待つ
+
+        Args:
+            item (FileTreeItem): アイテム
+        Return:
+            int: dataファイルが無い数（集計中は None）
+        '''
+        if item.m_itemData[2] is None:
+            if item.m_end < len(self._missing):
+                item.m_itemData[2] = self._missing[item.m_end] - self._missing[item.m_begin]
+            else:
+                self._pending.add(item)
+        return item.m_itemData[2]
+
+    def _reset(self, index, missing):
+        self.beginResetModel()
+        self._index = index
+        self._missing = missing
+        self._pending = set()
+        self._root_item = FileTreeItem('', '', 0, len(index), True)
+        self.endResetModel()
+
+    def _on_indexed(self, generation, index, missing):
+        if generation != self._generation: return
+        self._reset(index, missing)
+
+    def _on_counted(self, generation):
+        # 表示済みで集計待ちのアイテムのみ更新を通知する
+        if generation != self._generation: return
+        for item in [item for item in self._pending if item.m_end < len(self._missing)]:
+            self._pending.discard(item)
+            self._missing_count(item)
+            index = self.createIndex(item.row(), 2, item)
+            self.dataChanged.emit(index, index)
+
+    def _build(self, generation, cancel, root, media_filepaths, data_filepaths):
+        '''索引作成、dataファイルの有無の集計
+        ワーカースレッドで実行される
+        ファイルごとに stat せず、dataディレクトリごとに1度だけ一覧を取得して判定する
+
+        Args:
+            generation (int): 世代（set_files ごとに増える）
+            cancel (threading.Event): 中断フラグ
+            root (str): mediaファイルの基底パス
+            media_filepaths (list): mediaファイルパスのリスト
+            data_filepaths (list): dataファイルパスのリスト
+        '''
+        index = PathIndex(root, media_filepaths)
+        if cancel.is_set(): return
+        missing = [0]
+        self._indexed.emit(generation, index, missing)
+        listings = {}
+        n = 0
+        for pos in range(len(index)):
+            dirpath, name = os.path.split(data_filepaths[index.index(pos)])
+            names = listings.get(dirpath)
+            if names is None:
+                try:
+                    names = set(os.path.normcase(e) for e in os.listdir(dirpath))
+                except OSError:
+                    names = set()
+                listings[dirpath] = names
+            if os.path.normcase(name) not in names: n += 1
+            missing.append(n)
+            if len(missing) % self.COUNT_BATCH == 0:
+                if cancel.is_set(): return
+                self._counted.emit(generation)
+        self._counted.emit(generation)
+
+class QThumbnailModel(QAbstractListModel):
+    '''サムネイル一覧モデルクラス
+    media/dataファイルパスのリストを参照し、1行1画像のサムネイルを返す
+    サムネイルはビューが描画する（見えている）行の分だけ要求する
+    '''
+
+    def __init__(self, thumbnails, parent = None):
+        '''コンストラクタ
+
+        Args:
+            thumbnails (ThumbnailCache): サムネイルキャッシュ
+            parent (QObject): 親オブジェクト
+        '''
+        super().__init__(parent)
+        self._thumbnails = thumbnails
+        self._media_filepaths = []
+        self._data_filepaths = []
+        self._count = 0
+        # 作成待ちのmediaファイルパス : 行
+        self._requested = {}
+        self._thumbnails.ready.connect(self._on_ready)
+
+    def set_files(self, media_filepaths, data_filepaths):
+        '''ファイル一覧の設定
+        リストは走査中に追記されるため参照を保持し、行数は update_count で更新する
+
+        Args:
+            media_filepaths (list): mediaファイルパスのリスト
+            data_filepaths (list): dataファイルパスのリスト
+        '''
+        self.beginResetModel()
+        self._media_filepaths = media_filepaths
+        self._data_filepaths = data_filepaths
+        self._count = len(media_filepaths)
+        self._requested = {}
+        self.endResetModel()
+
+    def update_count(self):
+        '''追記された分の行を追加する
+        '''
+        count = len(self._media_filepaths)
+        if count <= self._count: return
+        self.beginInsertRows(QModelIndex(), self._count, count - 1)
+        self._count = count
+        self.endInsertRows()
+
+    def rowCount(self, parent = QModelIndex()):
+        return 0 if parent.isValid() else self._count
+
+    def data(self, index, role = Qt.DisplayRole):
+        if not index.isValid(): return None
+        row = index.row()
+        if role == Qt.DecorationRole:
+            media_filepath = self._media_filepaths[row]
+            pixmap = self._thumbnails.get(media_filepath, self._data_filepaths[row])
+            if pixmap is None: self._requested[media_filepath] = row
+            return pixmap
+        if role == Qt.ToolTipRole:
+            return '{}: {}'.format(row + 1, self._media_filepaths[row])
+        return None
+
+    def _on_ready(self, media_filepath):
+        row = self._requested.pop(media_filepath, None)
+        if row is None or row >= self._count: return
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+class QThumbnailView(QListView):
+    '''サムネイル一覧ビュークラス
+    大きさが揃ったセルを並べるので、見えているセルのみ配置、描画される
+    '''
+    def __init__(self, wrapping = True, parent = None):
+        '''コンストラクタ
+
+        Args:
+            wrapping (bool): Trueであれば折り返して格子状に並べる、Falseであれば横一列に並べる
+            parent (QWidget): 親ウィジェット
+        '''
+        super().__init__(parent)
+        size = ThumbnailCache.SIZE
+        self.setViewMode(QListView.ListMode)
+        self.setFlow(QListView.LeftToRight)
+        self.setWrapping(wrapping)
+        self.setResizeMode(QListView.Adjust)
+        self.setMovement(QListView.Static)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.Batched)
+        self.setIconSize(QSize(size, size))
+        self.setGridSize(QSize(size + 8, size + 8))
+        self.setSelectionMode(QListView.SingleSelection)
+        if not wrapping:
+            self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+            self.setFixedHeight(size + 8 + self.horizontalScrollBar().sizeHint().height() + 2 * self.frameWidth())
+
+    def set_current(self, row):
+        '''現在の画像を選択し、見える位置までスクロールする
+
+        Args:
+            row (int): 行
+        '''
+        index = self.model().index(row, 0)
+        if not index.isValid(): return
+        self.setCurrentIndex(index)
+        self.scrollTo(index)
+
+class QOverviewDialog(QDialog):
+    '''一覧ダイアログクラス
+    ウィンドウの大きさに合わせてサムネイルを N×M の格子状に並べる
+    PageUp/PageDown で1画面ずつ移動する
+    '''
+    def __init__(self, model, parent = None, f = Qt.WindowFlags()):
+        '''コンストラクタ
+
+        Args:
+            model (QThumbnailModel): サムネイル一覧モデル
+            parent (QWidget): 親ウィジェット
+            f (Qt.WindowFlags): ウィンドウフラグ
+        '''
+        super().__init__(parent, f)
+        self.init_ui(model)
+
+    def init_ui(self, model):
+        '''UIの初期化
+        '''
+        self.setWindowTitle(self.tr('Overview'))
+        self._view = QThumbnailView()
+        self._view.setModel(model)
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self._view)
+        self.setLayout(layout)
+        self.resize(1000, 700)
+
+    @property
+    def view(self):
+        return self._view
+
+class MainWindow(QMainWindow):
+    '''メインウィンドウクラス
+    メニュー、メニューバー、ボタン、スライダーを持つ
+    '''
+    SEARCH_DELAY = 50
+    '''入力が止まってから検索するまでの時間（ミリ秒）'''
+
+    def __init__(self, parent = None):
+        '''コンストラクタ
+        主にイベントの関連付けを行う
+
+        Args:
+            parent (QWidget): 親ウィジェット
+        '''
+        super().__init__()
+        self._project_open_dialog = QProjectOpenDialog(parent = self)
+        self._key_config_dialog = QKeyConfigDialog(parent = self)
+        self._keyconfig = ColorPickerKeyConfig()
+        self._util = ColorPickerUtil()
+        self._cache = ImageCache()
+        self._label_cache = LabelArrayCache()
+        self._prefetcher = ImagePrefetcher(self._cache)
+        self._region_indexer = RegionIndexer(self._cache)
+        self._file_tree_model = QFileTreeModel()
+        self._thumbnails = ThumbnailCache()
+        self._thumbnail_model = QThumbnailModel(self._thumbnails)
+        self._review_store = None
+        self._review_statuses = {}
+        self._review_index = ReviewIndex()
+        self._review_timer = QTimer()
+        self._review_timer.setSingleShot(True)
+        self._review_timer.setInterval(ReviewStore.FLUSH_INTERVAL)
+        self._reviewer = os.environ.get('USERNAME') or os.environ.get('USER', '')
+        self._filename_index = FilenameIndex()
+        self._diff_dir = None
+        self._diff_scorer = None
+        # 一覧での位置 : 差分スコア
+        self._diff_scores = {}
+        # スコアの大きい順の位置（0は除く）と、位置 : 順位
+        self._diff_order = None
+        self._diff_rank = {}
+        self._search_timer = QTimer()
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.SEARCH_DELAY)
+        self._media_filepaths = None
+        self._data_filepaths = None
+        self._scanner = None
+
+        # ui初期化
+        self.init_ui()
+        # event初期化
+        # menu
+        self._open_act.triggered.connect(self.on_file_open)
+        self._quit_act.triggered.connect(self.close)
+        self._zoom_in_act.triggered.connect(self._gview.zoom_in)
+        self._zoom_out_act.triggered.connect(self._gview.zoom_out)
+        self._zoom_reset_act.triggered.connect(self._gview.zoom_reset)
+        self._fit_act.toggled.connect(lambda checked: self._gview.fit_on() if checked else self._gview.fit_off())
+        self._grid_act.toggled.connect(lambda checked: self._gview.grid_on() if checked else self._gview.grid_off())
+        self._hover_act.toggled.connect(lambda checked: self._gview.hover_on() if checked else self._gview.hover_off())
+        self._gview.hover.connect(self.statusBar().showMessage)
+        self._key_config_act.triggered.connect(self.on_key_config)
+        self._outline_act.toggled.connect(self.on_outline_toggle)
+        self._review_ok_act.triggered.connect(lambda: self.on_review(ReviewStore.OK))
+        self._review_flag_act.triggered.connect(lambda: self.on_review(ReviewStore.FLAGGED))
+        self._review_clear_act.triggered.connect(lambda: self.on_review(ReviewStore.UNREVIEWED))
+        self._review_note_act.triggered.connect(self.on_review_note)
+        self._next_unreviewed_act.triggered.connect(lambda: self.on_next_review(ReviewStore.UNREVIEWED))
+        self._next_flagged_act.triggered.connect(lambda: self.on_next_review(ReviewStore.FLAGGED))
+        self._review_timer.timeout.connect(self.flush_review)
+        self._compare_act.triggered.connect(self.on_compare)
+        self._stop_compare_act.triggered.connect(self.stop_compare)
+        self._diff_act.toggled.connect(self._gview.scene().setDiffVisible)
+        self._next_changed_act.triggered.connect(lambda: self.on_next_changed(1))
+        self._prev_changed_act.triggered.connect(lambda: self.on_next_changed(-1))
+        # button
+        for b in self._index_buttons:
+            b.clicked.connect(self.on_index_button_click)
+        self._media_button.clicked.connect(self.on_media_button_click)
+        self._data_button.clicked.connect(self.on_data_button_click)
+        # slider
+        self._slider.valueChanged[int].connect(self.on_slider_change)
+        # region index
+        self._region_indexer.ready.connect(self._gview.scene().set_region_index)
+        # file tree
+        self._file_tree.clicked.connect(self.on_file_tree_click)
+        # thumbnail
+        self._filmstrip.clicked.connect(self.on_thumbnail_click)
+        self._overview_dialog.view.clicked.connect(self.on_thumbnail_click)
+        self._overview_act.triggered.connect(self._overview_dialog.show)
+        # search
+        self._search_edit.textChanged.connect(self._search_timer.start)
+        self._search_edit.returnPressed.connect(self.on_search_return)
+        self._search_timer.timeout.connect(self.on_search)
+        self._search_results.itemClicked.connect(self.on_search_result_click)
+
+    def init_ui(self):
+        '''UIの初期化
+        メニュー、メニューバー、ボタン、スライダーにおけるUI関連の初期化を行う
+        '''
+        # file menu
+        self._file_menu = self.menuBar().addMenu('&File')
+        self._open_act = self._file_menu.addAction(self.tr('Project &Open'))
+        self._open_act.setShortcut(QKeySequence.Open)
+        self._open_act.setStatusTip('select directory with data, media and config.json')
+        self._file_menu.addSeparator()
+        self._quit_act = self._file_menu.addAction(self.tr('&Quit'))
+        self._quit_act.setShortcut(QKeySequence.Quit)
+        # view menu
+        self._view_menu = self.menuBar().addMenu(self.tr('&View'))
+        self._zoom_in_act = self._view_menu.addAction(self.tr('Zoom &In'))
+        #self._zoom_in_act.setShortcut(QKeySequence.ZoomIn)
+        self._zoom_in_act.setShortcut(self._keyconfig.zoom_in)
+        self._zoom_in_act.setEnabled(False)
+        self._zoom_out_act = self._view_menu.addAction(self.tr('Zoom &Out'))
+        self._zoom_out_act.setShortcut(self._keyconfig.zoom_out)
+        self._zoom_out_act.setEnabled(False)
+        self._zoom_reset_act = self._view_menu.addAction(self.tr('Zoom &Reset'))
+        self._zoom_reset_act.setShortcut(self._keyconfig.zoom_reset)
+        self._zoom_reset_act.setEnabled(False)
+        self._fit_act = self._view_menu.addAction(self.tr('&Fit Window'))
+        self._fit_act.setShortcut(self._keyconfig.fit)
+        self._fit_act.setCheckable(True)
+        self._fit_act.setEnabled(False)
+        self._view_menu.addSeparator()
+        self._grid_act = self._view_menu.addAction(self.tr('Grid'))
+        self._grid_act.setShortcut(self._keyconfig.grid)
+        self._grid_act.setCheckable(True)
+        self._grid_act.setEnabled(False)
+        self._hover_act = self._view_menu.addAction(self.tr('&Hover Inspector'))
+        self._hover_act.setCheckable(True)
+        self._outline_act = self._view_menu.addAction(self.tr('&Outline'))
+        self._outline_act.setShortcut(self._keyconfig.outline)
+        self._outline_act.setCheckable(True)
+        # file tree
+        self._file_tree = QTreeView()
+        self._file_tree.setUniformRowHeights(True)
+        self._file_tree.setModel(self._file_tree_model)
+        self._file_tree_dock = QDockWidget(self.tr('Files'))
+        self._file_tree_dock.setObjectName('file_tree_dock')
+        self._file_tree_dock.setWidget(self._file_tree)
+        self.addDockWidget(Qt.LeftDockWidgetArea, self._file_tree_dock)
+        self._view_menu.addSeparator()
+        self._view_menu.addAction(self._file_tree_dock.toggleViewAction())
+        # filmstrip
+        self._filmstrip = QThumbnailView(wrapping = False)
+        self._filmstrip.setModel(self._thumbnail_model)
+        self._filmstrip_dock = QDockWidget(self.tr('Filmstrip'))
+        self._filmstrip_dock.setObjectName('filmstrip_dock')
+        self._filmstrip_dock.setWidget(self._filmstrip)
+        self.addDockWidget(Qt.BottomDockWidgetArea, self._filmstrip_dock)
+        self._view_menu.addAction(self._filmstrip_dock.toggleViewAction())
+        # overview
+        self._overview_dialog = QOverviewDialog(self._thumbnail_model, parent = self)
+        self._overview_act = self._view_menu.addAction(self.tr('O&verview'))
+        # search
+        self._search_edit = QLineEdit()
+        self._search_edit.setPlaceholderText(self.tr('file name'))
+        self._search_edit.setClearButtonEnabled(True)
+        self._search_results = QListWidget()
+        self._search_results.setUniformItemSizes(True)
+        search_layout = QVBoxLayout()
+        search_layout.setContentsMargins(0, 0, 0, 0)
+        search_layout.addWidget(self._search_edit)
+        search_layout.addWidget(self._search_results)
+        search = QWidget()
+        search.setLayout(search_layout)
+        self._search_dock = QDockWidget(self.tr('Search'))
+        self._search_dock.setObjectName('search_dock')
+        self._search_dock.setWidget(search)
+        self.addDockWidget(Qt.RightDockWidgetArea, self._search_dock)
+        self._view_menu.addAction(self._search_dock.toggleViewAction())
+        # review menu
+        self._review_menu = self.menuBar().addMenu(self.tr('&Review'))
+        self._review_ok_act = self._review_menu.addAction(self.tr('Mark &OK'))
+        self._review_ok_act.setShortcut(self._keyconfig.review_ok)
+        self._review_flag_act = self._review_menu.addAction(self.tr('&Flag'))
+        self._review_flag_act.setShortcut(self._keyconfig.review_flag)
+        self._review_clear_act = self._review_menu.addAction(self.tr('&Clear'))
+        self._review_note_act = self._review_menu.addAction(self.tr('&Note...'))
+        self._review_menu.addSeparator()
+        self._next_unreviewed_act = self._review_menu.addAction(self.tr('Next &Unreviewed'))
+        self._next_unreviewed_act.setShortcut(self._keyconfig.next_unreviewed)
+        self._next_flagged_act = self._review_menu.addAction(self.tr('Next F&lagged'))
+        self._next_flagged_act.setShortcut(self._keyconfig.next_flagged)
+        # diff menu
+        self._diff_menu = self.menuBar().addMenu(self.tr('&Diff'))
+        self._compare_act = self._diff_menu.addAction(self.tr('&Compare With...'))
+        self._compare_act.setStatusTip('select the data directory of the previous labels')
+        self._stop_compare_act = self._diff_menu.addAction(self.tr('&Stop Comparing'))
+        self._diff_menu.addSeparator()
+        self._diff_act = self._diff_menu.addAction(self.tr('Show &Diff'))
+        self._diff_act.setCheckable(True)
+        self._diff_act.setChecked(True)
+        self._next_changed_act = self._diff_menu.addAction(self.tr('&Next Most Changed'))
+        self._next_changed_act.setShortcut('Ctrl+]')
+        self._prev_changed_act = self._diff_menu.addAction(self.tr('&Previous Most Changed'))
+        self._prev_changed_act.setShortcut('Ctrl+[')
+        self._update_diff_act()
+        # setting menu
+        self._setting_menu = self.menuBar().addMenu(self.tr('&Setting'))
+        self._key_config_act = self._setting_menu.addAction(self.tr('&Key Config'))
+        # slider
+        self._slider = QSlider(Qt.Vertical)
+        self._slider.setMaximum(10)
+        # index label
+        self._index_label = QIndexLabel()
+        self._index_label.setAlignment(Qt.AlignCenter)
+        # button
+        self._index_buttons = [QPushButton("{:+d}".format(num)) for num in [-100, -5, -1, 1, 5, 100]]
+        self._media_button = QPushButton('media')
+        self._data_button = QPushButton('data')
+        # image view
+        self._gview = GView()
+        # layout
+        lower = QHBoxLayout()
+        lower.addWidget(self._media_button)
+        lower.addWidget(self._index_buttons[0])
+        lower.addWidget(self._index_buttons[1])
+        lower.addWidget(self._index_buttons[2])
+        lower.addWidget(self._index_label)
+        lower.addWidget(self._index_buttons[3])
+        lower.addWidget(self._index_buttons[4])
+        lower.addWidget(self._index_buttons[5])
+        lower.addWidget(self._data_button)
+        upper = QHBoxLayout()
+        upper.addWidget(self._gview)
+        upper.addWidget(self._slider)
+        layout = QVBoxLayout()
+        layout.addLayout(upper)
+        layout.addLayout(lower)
+        w = QWidget()
+        w.setLayout(layout)
+    
+        self.setCentralWidget(w)
+        self.statusBar().showMessage('')
+        # cache label
+        self._cache_label = QLabel()
+        self.statusBar().addPermanentWidget(self._cache_label)
+        # review label
+        self._review_label = QLabel()
+        self.statusBar().addPermanentWidget(self._review_label)
+        # diff label
+        self._diff_label = QLabel()
+        self.statusBar().addPermanentWidget(self._diff_label)
+
+    def keyPressEvent(self, event):
+        '''キー押下イベント
+        インデックスを1戻す
+        インデックスを1進める
+        透過率を最大/最小に切り替える
+        '''
+        key = self._keyconfig.keyevent_to_keysquence(event).toString()
+        if key == self._keyconfig.next:
+            self._index_buttons[3].clicked.emit()
+        elif key == self._keyconfig.prev:
+            self._index_buttons[2].clicked.emit()
+        elif key == self._keyconfig.opacity:
+            if self._slider.value() < 10:
+                self._slider.setValue(10)
+            else:
+                self._slider.setValue(0)
+
+    def on_index_button_click(self):
+        '''インデックスボタンクリック
+        インデックスの増減を行う
+        '''
+        if not self._media_filepaths: return
+        button = int(self.sender().text())
+        self.jump_to(self._index_label.index + button, button)
+
+    def jump_to(self, new_index, direction = 1):
+        '''インデックス移動
+        最大（最小）を逸脱する場合は最大（最小）に補正して設定する
+
+        Args:
+            new_index (int): 移動先のインデックス（1始まり）
+            direction (int): 先読みする方向（符号のみ使用）
+        '''
+        if not self._media_filepaths: return
+        if new_index >= len(self._media_filepaths):
+            new_index = len(self._media_filepaths)
+        elif new_index <= 0:
+            new_index = 1
+        # media/data画像の更新（先読み済みであればデコードは発生しない）
+        scene = self._gview.scene()
+        media_filepath = self._media_filepaths[new_index - 1]
+        data_filepath = self._data_filepaths[new_index - 1]
+        scene.set_media_image(media_filepath, self._prefetcher.get(media_filepath))
+        scene.set_data_image(data_filepath, self._prefetcher.get(data_filepath))
+        if self._outline_act.isChecked():
+            scene.set_contour_image(data_filepath, self._cache.derived(data_filepath, LabelContour.NAME, LabelContour.build))
+        if self._diff_dir:
+            old_filepath = DiffScorer.rebase(data_filepath, self._util.data_dir, self._diff_dir)
+            scene.set_diff_image(old_filepath, self._prefetcher.get(old_filepath))
+        self._region_indexer.request(data_filepath)
+        # インデックスラベルの更新
+        self._index_label.index = new_index
+        # ウィンドウファイルパスの更新
+        self.setWindowFilePath(media_filepath)
+        # viewメニューの活性状態更新
+        self._update_view_act()
+        # 進行方向の前後を先読み
+        self._prefetch(new_index, direction)
+        # レビュー状態、差分スコアの表示更新
+        self._update_review_label()
+        self._update_diff_label()
+        # サムネイル一覧の選択を現在の画像に合わせる
+        self._filmstrip.set_current(new_index - 1)
+        self._overview_dialog.view.set_current(new_index - 1)
+        # キャッシュ統計の更新
+        self._cache_label.setText(str(self._cache))
+
+    def _prefetch(self, index, direction):
+        '''前後画像の先読み
+        進行方向に prefetch_window 枚、逆方向にその1/4（最低1枚）のmedia/data画像を先読みする
+        近い画像から順にデコードされる
+
+        Args:
+            index (int): 現在のインデックス（1始まり）
+            direction (int): 直前の移動量（符号のみ使用）
+        '''
+        ahead = self._util.prefetch_window
+        behind = max(1, ahead // 4)
+        step = -1 if direction < 0 else 1
+        offsets = []
+        for i in range(1, max(ahead, behind) + 1):
+            if i <= ahead: offsets.append(i * step)
+            if i <= behind: offsets.append(-i * step)
+        filepaths = []
+        # 輪郭表示中は輪郭画像も作っておく
+        derive = {} if self._outline_act.isChecked() else None
+        for offset in offsets:
+            i = index - 1 + offset
+            if i < 0 or i >= len(self._media_filepaths): continue
+            filepaths.append(self._media_filepaths[i])
+            filepaths.append(self._data_filepaths[i])
+            if derive is not None: derive[self._data_filepaths[i]] = (LabelContour.NAME, LabelContour.build)
+        self._prefetcher.prefetch(filepaths, derive)
+
+    def on_file_tree_click(self, index):
+        '''ファイルツリークリック
+        クリックしたファイル（ディレクトリの場合はその中で文字列順で最初のファイル）に移動する
+
+        Args:
+            index (QModelIndex): クリックしたアイテムのインデックス
+        '''
+        i = self._file_tree_model.media_index(index)
+        if i is None or i == self._index_label.index - 1: return
+        self.jump_to(i + 1, i + 1 - self._index_label.index)
+
+    def on_review(self, status):
+        '''レビュー状態設定
+        現在の画像のレビュー状態を設定する
+        書き込みは FLUSH_INTERVAL ごとにまとめて行う
+
+        Args:
+            status (int): 状態
+        '''
+        if not self._media_filepaths or not self._review_store: return
+        pos = self._index_label.index - 1
+        media_filepath = self._media_filepaths[pos]
+        self._review_store.set(media_filepath, status, self._reviewer)
+        self._review_index.set(pos, status)
+        self._update_review_label()
+        if not self._review_timer.isActive(): self._review_timer.start()
+
+    def on_review_note(self):
+        '''レビューメモ入力
+        現在の画像にメモを設定する（未レビューの画像はフラグ付きにする）
+        '''
+        if not self._media_filepaths or not self._review_store: return
+        pos = self._index_label.index - 1
+        media_filepath = self._media_filepaths[pos]
+        record = self._review_store.get(media_filepath)
+        note, ok = QInputDialog.getText(self, self.tr('Note'), os.path.basename(media_filepath), text = (record[3] or '') if record else '')
+        if not ok: return
+        status = self._review_index.status(pos) or ReviewStore.FLAGGED
+        self._review_store.set(media_filepath, status, self._reviewer, note)
+        self._review_index.set(pos, status)
+        self._update_review_label()
+        if not self._review_timer.isActive(): self._review_timer.start()
+
+    def on_next_review(self, status):
+        '''次の未レビュー（フラグ付き）の画像に移動する
+
+        Args:
+            status (int): 状態
+        '''
+        if not self._media_filepaths: return
+        pos = self._review_index.next(status, self._index_label.index - 1)
+        if pos is None:
+            self.statusBar().showMessage('no {} images'.format(ReviewStore.STATUS_NAMES[status]), 3000)
+            return
+        self.jump_to(pos + 1, pos + 1 - self._index_label.index)
+
+    def flush_review(self):
+        '''レビュー状態の書き込み
+        '''
+        self._review_timer.stop()
+        if self._review_store: self._review_store.flush()
+
+    def _update_review_label(self):
+        '''現在の画像のレビュー状態を表示する
+        '''
+        record = None
+        if self._review_store and self._media_filepaths:
+            record = self._review_store.get(self._media_filepaths[self._index_label.index - 1])
+        if not record or record[0] == ReviewStore.UNREVIEWED:
+            self._review_label.setText('')
+            return
+        status, reviewer, updated, note = record
+        text = '{} {} {}'.format(ReviewStore.STATUS_NAMES[status], reviewer, time.strftime('%Y-%m-%d %H:%M', time.localtime(updated)))
+        self._review_label.setText(text + ' ' + note if note else text)
+
+    def on_search(self):
+        '''ファイル名検索
+        入力中の文字列で索引を検索し、結果一覧を更新する
+        '''
+        self._search_results.clear()
+        if not self._media_filepaths: return
+        prefix = os.path.join(self._util.media_dir, '') if self._util.media_dir else ''
+        for pos, kind in self._filename_index.search(self._search_edit.text()):
+            filepath = self._media_filepaths[pos]
+            if prefix and filepath.startswith(prefix): filepath = filepath[len(prefix):]
+            item = QListWidgetItem('{}: {}'.format(pos + 1, filepath))
+            item.setData(Qt.UserRole, pos)
+            item.setToolTip(kind)
+            self._search_results.addItem(item)
+
+    def on_search_return(self):
+        '''検索欄でEnter
+        検索結果の先頭に移動する
+        '''
+        if self._search_timer.isActive(): self.on_search()
+        if self._search_results.count(): self.on_search_result_click(self._search_results.item(0))
+
+    def on_search_result_click(self, item):
+        '''検索結果クリック
+        クリックした画像に移動する
+
+        Args:
+            item (QListWidgetItem): クリックした検索結果
+        '''
+        pos = item.data(Qt.UserRole)
+        if pos == self._index_label.index - 1: return
+        self.jump_to(pos + 1, pos + 1 - self._index_label.index)
+
+    def on_compare(self):
+        '''比較開始
+        旧dataディレクトリを選択し、表示中の画像との差分の強調と、全画像の差分スコアの計算を始める
+        '''
+        if not self._media_filepaths: return
+        old_dir = QColorPickerDialog.getExistingDirectory(parent = self, caption = 'select previous data base directory')
+        if not old_dir: return
+        self._diff_dir = old_dir
+        self._start_diff_scorer()
+        self._update_diff_act()
+        self.jump_to(self._index_label.index, 1)
+
+    def stop_compare(self):
+        '''比較終了
+        '''
+        if self._diff_scorer: self._diff_scorer.cancel()
+        self._diff_scorer = None
+        self._diff_dir = None
+        self._diff_scores = {}
+        self._diff_order = None
+        self._diff_rank = {}
+        self._gview.scene().set_diff_image(None, None)
+        self._diff_label.setText('')
+        self._update_diff_act()
+
+    def _start_diff_scorer(self):
+        '''差分スコアの計算開始
+        走査済みの一覧の分だけ計算する（走査中の場合は走査終了時に計算し直す）
+        '''
+        if self._diff_scorer: self._diff_scorer.cancel()
+        self._diff_scores = {}
+        self._diff_order = None
+        self._diff_rank = {}
+        self._diff_scorer = DiffScorer(list(self._data_filepaths), self._util.data_dir, self._diff_dir, self._util.cache_dir)
+        self._diff_scorer.progress.connect(self.on_diff_progress)
+        self._diff_scorer.finished.connect(self.on_diff_finished)
+        self._diff_scorer.start()
+
+    def on_diff_progress(self, scores):
+        '''差分スコアの追加
+
+        Args:
+            scores (list): [(一覧での位置, スコア), ...]
+        '''
+        if self.sender() is not self._diff_scorer: return
+        self._diff_scores.update(scores)
+        self._diff_order = None
+        self._update_diff_label()
+
+    def on_diff_finished(self, completed):
+        '''差分スコアの計算終了
+
+        Args:
+            completed (bool): 最後まで計算した場合はTrue
+        '''
+        if self.sender() is not self._diff_scorer or not completed: return
+        changed = sum(1 for score in self._diff_scores.values() if score > 0)
+        self.statusBar().showMessage('{} of {} images changed'.format(changed, len(self._diff_scores)), 3000)
+
+    def on_next_changed(self, step):
+        '''差分スコアの大きい順に次（前）の画像に移動する
+        差分の無い画像は飛ばす
+        現在の画像が並びに無い場合は先頭（末尾）に移動する、並びの端ではその旨を表示して移動しない
+
+        Args:
+            step (int): 1で次、-1で前
+        '''
+        if not self._diff_dir or not self._media_filepaths: return
+        if self._diff_order is None:
+            self._diff_order = sorted((pos for pos, score in self._diff_scores.items() if score > 0),
+                key = lambda pos: (-self._diff_scores[pos], pos))
+            self._diff_rank = {pos : rank for rank, pos in enumerate(self._diff_order)}
+        if not self._diff_order:
+            self.statusBar().showMessage('no changed images', 3000)
+            return
+        rank = self._diff_rank.get(self._index_label.index - 1)
+        rank = (0 if step > 0 else len(self._diff_order) - 1) if rank is None else rank + step
+        if rank < 0 or rank >= len(self._diff_order):
+            self.statusBar().showMessage('no more changed images', 3000)
+            return
+        pos = self._diff_order[rank]
+        if pos + 1 == self._index_label.index: return
+        self.jump_to(pos + 1, pos + 1 - self._index_label.index)
+
+    def _update_diff_label(self):
+        '''現在の画像の差分スコアと計算の進捗を表示する
+        '''
+        if not self._diff_dir or not self._media_filepaths:
+            self._diff_label.setText('')
+            return
+        score = self._diff_scores.get(self._index_label.index - 1)
+        text = 'diff {}'.format('-' if score is None else '{:.2%}'.format(score))
+        if len(self._diff_scores) < len(self._data_filepaths):
+            text += ' ({}/{})'.format(len(self._diff_scores), len(self._data_filepaths))
+        self._diff_label.setText(text)
+
+    def _update_diff_act(self):
+        '''Diffメニューの活性状態を更新する
+        '''
+        enable = self._diff_dir is not None
+        self._stop_compare_act.setEnabled(enable)
+        self._diff_act.setEnabled(enable)
+        self._next_changed_act.setEnabled(enable)
+        self._prev_changed_act.setEnabled(enable)
+
+    def on_thumbnail_click(self, index):
+        '''サムネイルクリック
+        クリックした画像に移動する
+
+        Args:
+            index (QModelIndex): クリックしたセルのインデックス
+        '''
+        if index.row() == self._index_label.index - 1: return
+        self.jump_to(index.row() + 1, index.row() + 1 - self._index_label.index)
+
+    def on_media_button_click(self):
+        '''mediaボタン押下
+        外部のビューアーでmedia画像を表示する
+        '''
+        self._util.exe_os_imageviewer(self._gview.scene().media_filepath)
+    
+    def on_data_button_click(self):
+        '''dataボタン押下
+        外部のビューアーでdata画像を表示する
+        '''
+        self._util.exe_os_imageviewer(self._gview.scene().data_filepath)
+
+    def on_file_open(self):
+        '''project open
+        プロジェクト選択ダイアログを表示し、
+        '''
+        # プロジェクトオープンダイアログを開く
+        result = self._project_open_dialog.exec()
+        # cancel もしくは不正な入力だった場合何もしない
+        if result == QDialog.Rejected: return
+        # ファイルを読み込む
+        self._util.load(self._project_open_dialog.config())
+        self._cache.budget = self._util.cache_size * 1024 * 1024
+        self._region_indexer.cache_dir = self._util.cache_dir
+        # data画像は展開済みの配列ファイルから読む
+        self._label_cache.cache_dir = self._util.cache_dir
+        self._label_cache.extensions = (self._util.data_extension.lower(),)
+        self._label_cache.budget = self._util.label_cache_size * 1024 * 1024
+        self._cache.clear()
+        self._cache.loader = self._label_cache.load if self._util.label_cache else QImage
+        self._util.media_dir = self._project_open_dialog.media()
+        self._util.data_dir = self._project_open_dialog.data()
+        # 走査中であれば中断する
+        if self._scanner: self._scanner.cancel()
+        self.stop_compare()
+        self._media_filepaths = []
+        self._data_filepaths = []
+        # レビュー状態は一覧の順に索引を作りながら追加する
+        if self._review_store: self._review_store.close()
+        self._review_timer.stop()
+        self._review_store = ReviewStore(ReviewStore.filepath_for(self._project_open_dialog.config()))
+        self._review_store.open()
+        self._review_statuses = self._review_store.statuses()
+        self._review_index = ReviewIndex()
+        self._review_label.setText('')
+        self._filename_index.clear()
+        self._search_results.clear()
+        self._file_tree_model.clear()
+        self._thumbnails.cache_dir = self._util.cache_dir
+        self._thumbnails.clear()
+        self._thumbnail_model.set_files(self._media_filepaths, self._data_filepaths)
+        self._index_label.index = 0
+        self._index_label.max_index = 0
+        # 前回から変更のあったディレクトリのみ走査し、見つかった分から順次追加する
+        manifest = ProjectManifest(ProjectManifest.filepath_for(self._project_open_dialog.config()))
+        self._scanner = MediaScanner(manifest,
+            self._project_open_dialog.media(), self._util.media_extensions,
+            self._util.media_filepaths_to_data_filepaths,
+            [self._project_open_dialog.data()] + self._util.mapping)
+        self._scanner.found.connect(self.on_scan_found)
+        self._scanner.finished.connect(self.on_scan_finished)
+        self.statusBar().showMessage('scanning...')
+        self._scanner.start()
+
+    def on_scan_found(self, media_filepaths, data_filepaths):
+        '''走査結果の追加
+        見つかったmedia/dataファイルを一覧に追加する
+        最初の追加時はインデックスを0に戻してから+1ボタンシグナルを発火する
+
+        Args:
+            media_filepaths (list): mediaファイルパスのリスト
+            data_filepaths (list): dataファイルパスのリスト
+        '''
+        # 中断した走査からの通知は無視する
+        if self.sender() is not self._scanner: return
+        self._media_filepaths.extend(media_filepaths)
+        self._data_filepaths.extend(data_filepaths)
+        self._index_label.max_index = len(self._media_filepaths)
+        self._thumbnail_model.update_count()
+        self._review_index.extend(self._review_statuses.get(fp, ReviewStore.UNREVIEWED) for fp in media_filepaths)
+        self._filename_index.extend(media_filepaths)
+        if self._index_label.index == 0:
+            self._index_buttons[3].clicked.emit()
+
+    def on_scan_finished(self, completed):
+        '''走査終了
+
+        Args:
+            completed (bool): 最後まで走査した場合はTrue
+        '''
+        if self.sender() is not self._scanner: return
+        # ファイルツリーは走査し終えた一覧から作る
+        self._file_tree_model.set_files(self._util.media_dir, self._media_filepaths, self._data_filepaths)
+        if self._diff_dir and completed: self._start_diff_scorer()
+        self.statusBar().showMessage('{} files'.format(len(self._media_filepaths)) if completed else '', 3000)
+
+    def on_outline_toggle(self, checked):
+        '''輪郭表示の切り替え
+        輪郭画像は data 画像ごとにキャッシュされるため、2回目以降の切り替えでは作り直さない
+
+        Args:
+            checked (bool): 輪郭表示する場合はTrue
+        '''
+        scene = self._gview.scene()
+        if checked and scene.data_filepath:
+            data_filepath = scene.data_filepath
+            scene.set_contour_image(data_filepath, self._cache.derived(data_filepath, LabelContour.NAME, LabelContour.build))
+        scene.outline = checked
+
+    def on_slider_change(self, value):
+        '''スライダーチェンジ
+        スライダーの増減に応じて透過率を設定する
+
+        Args:
+            value (QSliderEvent): スライダーイベント
+        '''
+        self._gview.scene().media_opacity = value / 10
+    
+    def closeEvent(self, event):
+        '''クローズイベント
+        先読みスレッドを停止する
+        '''
+        if self._scanner: self._scanner.cancel()
+        self._prefetcher.shutdown()
+        self._region_indexer.shutdown()
+        self._file_tree_model.shutdown()
+        self._thumbnails.shutdown()
+        self._review_timer.stop()
+        if self._review_store: self._review_store.close()
+        if self._diff_scorer: self._diff_scorer.cancel()
+        super().closeEvent(event)
+
+    def on_key_config(self):
+        print(self._key_config_dialog.result())
+        self._key_config_dialog.exec()
+        print(self._key_config_dialog.result())
+        if self._key_config_dialog.result() == QDialog.Accepted:
+            print(self._keyconfig.zoom_reset)
+            self._zoom_in_act.setShortcut(self._keyconfig.zoom_reset)
+            self._zoom_out_act.setShortcut(self._keyconfig.zoom_out)
+            self._zoom_reset_act.setShortcut(self._keyconfig.zoom_reset)
+            self._fit_act.setShortcut(self._keyconfig.fit)
+            self._grid_act.setShortcut(self._keyconfig.grid)
+            self._review_ok_act.setShortcut(self._keyconfig.review_ok)
+            self._review_flag_act.setShortcut(self._keyconfig.review_flag)
+            self._next_unreviewed_act.setShortcut(self._keyconfig.next_unreviewed)
+            self._next_flagged_act.setShortcut(self._keyconfig.next_flagged)
+            self._outline_act.setShortcut(self._keyconfig.outline)
+        print('end')
+    
+    def _update_view_act(self):
+        '''Viewメニューの活性状態を更新する
+        sceneの画像有無に応じてメニューの活性化、非活性を切り替える
+        '''
+        enable = self._gview.hasImage()
+        self._zoom_in_act.setEnabled(enable)
+        self._zoom_out_act.setEnabled(enable)
+        self._zoom_reset_act.setEnabled(enable)
+        self._fit_act.setEnabled(enable)
+        self._grid_act.setEnabled(enable)
+
+class QProjectOpenDialog(QDialog):
+    '''プロジェクトオープンダイアログ
+    media画像、data画像の基底ディレクトリと設定ファイルを選択するダイアログ
+    '''
+    def __init__(self, parent = None, f = Qt.WindowFlags()):
+        '''コンストラクタ
+        主にイベント処理の関連付けを行う
+
+        Args:
+            parent (QWidget): 親Widget
+            f (Qt.WindowFlag): フラグ一覧
+        '''
+        super().__init__(parent, f)
+        self.init_ui()
+
+        self._media_button.pressed.connect(self.on_browse_button_click)
+        self._data_button.pressed.connect(self.on_browse_button_click)
+        self._config_button.pressed.connect(self.on_browse_button_click)
+        self._ok_button.pressed.connect(self.on_ok_cancel_button_click)
+        self._cancel_button.pressed.connect(self.on_ok_cancel_button_click)
+
+    def init_ui(self):
+        '''UI初期化
+        各種パーツの初期化と配置を行う
+        '''
+        self._media_label = QLabel('Media')
+        self._media_edit = QLineEdit()
+        self._media_button = QPushButton('Browse')
+
+        self._data_label = QLabel('Data')
+        self._data_edit = QLineEdit()
+        self._data_button = QPushButton('Browse')
+
+        self._config_label = QLabel('Config')
+        self._config_edit = QLineEdit()
+        self._config_button = QPushButton('Browse')
+
+        self._ok_button = QPushButton('OK')
+        self._ok_button.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
+        self._cancel_button = QPushButton('Cancel')
+        self._cancel_button.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
+
+        grid = QGridLayout()
+        grid.addWidget(self._media_label, 0, 0)
+        grid.addWidget(self._media_edit, 0, 1)
+        grid.addWidget(self._media_button, 0, 2)
+        grid.addWidget(self._data_label, 1, 0)
+        grid.addWidget(self._data_edit, 1, 1)
+        grid.addWidget(self._data_button, 1, 2)
+        grid.addWidget(self._config_label, 2, 0)
+        grid.addWidget(self._config_edit, 2, 1)
+        grid.addWidget(self._config_button, 2, 2)
+        hbox = QHBoxLayout()
+        hbox.addWidget(self._ok_button)
+        hbox.addWidget(self._cancel_button)
+        layout = QVBoxLayout()
+        layout.addLayout(grid)
+        layout.addSpacing(10)
+        layout.addLayout(hbox)
+        self.setLayout(layout)
+        self.setFixedWidth(500)
+        self.setWindowTitle('Project Open')
+
+    def on_browse_button_click(self):
+        '''browseボタン押下
+        ディレクトリ（ファイル）選択ダイアログを表示する
+        '''
+        sender = self.sender()
+        if sender == self._media_button:
+            self._media_edit.setText(QColorPickerDialog.getExistingDirectory(parent = self, caption = 'select media base directory'))
+        elif sender == self._data_button:
+            self._data_edit.setText(QColorPickerDialog.getExistingDirectory(parent = self, caption = 'select data base directory'))
+        else:
+            self._config_edit.setText(QColorPickerDialog.getOpenFileName(parent = self, caption = 'select config json file', filter = 'config (*.json)'))
+
+    def on_ok_cancel_button_click(self):
+        '''ok(cancel)ボタン押下
+        OKボタンかつ各種データが妥当な場合はresultにQDialog.Acceptを設定し非表示にする
+        '''
+        if self.sender() == self._ok_button and os.path.isdir(self.media()) and os.path.isdir(self.data()) and os.path.isfile(self.config()):
+            self.setResult(QDialog.Accepted)
+        else:
+            self.setResult(QDialog.Rejected)
+        self.hide()
+
+    def media(self):
+        '''mediaディレクトリパス
+
+        Return:
+            str: mediaディレクトリのパス
+        '''
+        return self._media_edit.text()
+    
+    def data(self):
+        '''dataディレクトリパス
+
+        Return:
+            str: dataディレクトリのパス
+        '''
+        return self._data_edit.text()
+
+    def config(self):
+        '''configファイルパス
+
+        Return:
+            str: configファイルのパス
+        '''
+        return self._config_edit.text()    
+
+class QKeyConfigDialog(QDialog):
+    '''キーコンフィグダイアログ
+    キーコンフィグの設定ダイアログ
+    '''
+    def __init__(self, parent = None, f = Qt.WindowFlags()):
+        '''コンストラクタ
+        主にイベント処理の関連付けを行う
+
+        Args:
+            parent (QWidget): 親Widget
+            f (Qt.WindowFlag): フラグ一覧
+        '''
+        super().__init__(parent, f)
+        self._keyconfig = ColorPickerKeyConfig()
+        self._close_index = 0
+        self.init_ui()
+        for child in self.children():
+            if type(child) == QLineEdit and child != self._edit_name: child.keyPressEvent = self.on_key_press
+        self._combo_config.currentIndexChanged.connect(self.update_lineedit)
+        self._ok_button.pressed.connect(self.on_ok_button_click)
+        self._cancel_button.pressed.connect(self.on_cancel_button_click)
+
+    def showEvent(self, event):
+        '''表示イベント
+        再表示された際に、コンフィグコンボボックスのインデックス位置を前回選択された位置に設定する
+
+        Args:
+            event (QShowEvent) : QShowEvent
+        '''
+        self._combo_config.setCurrentIndex(self._close_index)
+        super().showEvent(event)
+
+    def init_ui(self):
+        '''UIの初期化
+        UIの初期化を行う
+        '''
+        self._edit_name = QLineEdit()
+        self._edit_next = QLineEdit()
+        self._edit_prev = QLineEdit()
+        self._edit_opacity = QLineEdit()
+        self._edit_fit = QLineEdit()
+        self._edit_zoom_in = QLineEdit()
+        self._edit_zoom_out = QLineEdit()
+        self._edit_zoom_reset = QLineEdit()
+        self._edit_grid = QLineEdit()
+        self._edit_review_ok = QLineEdit()
+        self._edit_review_flag = QLineEdit()
+        self._edit_next_unreviewed = QLineEdit()
+        self._edit_next_flagged = QLineEdit()
+        self._edit_outline = QLineEdit()
+
+        self._combo_config = QComboBox()
+        for i in range(0, self._keyconfig.count()):
+            self._keyconfig.index = i
+            self._combo_config.addItem(self._keyconfig.name)
+        self.update_lineedit()
+
+        self._ok_button = QPushButton('OK')
+        self._cancel_button = QPushButton('Cancel')
+
+        grid = QGridLayout()
+        def grid_add(title, edit_line):
+            r = grid.rowCount()
+            grid.addWidget(QLabel(title), r, 0)
+            grid.addWidget(edit_line, r, 1)
+        grid_add('名前', self._edit_name)
+        grid_add('進む', self._edit_next)
+        grid_add('戻る', self._edit_prev)
+        grid_add('透過切り替え', self._edit_opacity)
+        grid_add('画面フィット', self._edit_fit)
+        grid_add('拡大', self._edit_zoom_in)
+        grid_add('縮小', self._edit_zoom_out)
+        grid_add('リセット', self._edit_zoom_reset)
+        grid_add('グリッド', self._edit_grid)
+        grid_add('レビューOK', self._edit_review_ok)
+        grid_add('フラグ', self._edit_review_flag)
+        grid_add('次の未レビュー', self._edit_next_unreviewed)
+        grid_add('次のフラグ', self._edit_next_flagged)
+        grid_add('輪郭表示', self._edit_outline)
+
+        hbox = QHBoxLayout()
+        hbox.addWidget(self._ok_button)
+        hbox.addWidget(self._cancel_button)
+        layout = QVBoxLayout()
+        layout.addWidget(self._combo_config)
+        layout.addLayout(grid)
+        layout.addSpacing(10)
+        layout.addLayout(hbox)
+        self.setLayout(layout)
+
+    def update_lineedit(self):
+        '''lineeditの更新
+        選択されているコンフィグのインデックスを元に各LineEditを更新する
+        '''
+        self._keyconfig.index = self._combo_config.currentIndex()
+
+        self._edit_name.setText(self._keyconfig.name)
+        self._edit_next.setText(self._keyconfig.next)
+        self._edit_prev.setText(self._keyconfig.prev)
+        self._edit_opacity.setText(self._keyconfig.opacity)
+        self._edit_fit.setText(self._keyconfig.fit)
+        self._edit_zoom_in.setText(self._keyconfig.zoom_in)
+        self._edit_zoom_out.setText(self._keyconfig.zoom_out)
+        self._edit_zoom_reset.setText(self._keyconfig.zoom_reset)
+        self._edit_grid.setText(self._keyconfig.grid)
+        self._edit_review_ok.setText(self._keyconfig.review_ok)
+        self._edit_review_flag.setText(self._keyconfig.review_flag)
+        self._edit_next_unreviewed.setText(self._keyconfig.next_unreviewed)
+        self._edit_next_flagged.setText(self._keyconfig.next_flagged)
+        self._edit_outline.setText(self._keyconfig.outline)
+
+    def on_key_press(self, event):
+        '''キー押下イベント
+        LineEditに「押下されたキーの名前」を設定する
+
+        Args:
+            event (QKeyEvent): QKeyEvent
+        '''
+        if type(self.focusWidget()) == QLineEdit:
+            # QKeyEventをQKeySequenceに変換してキーの文字列を設定
+            self.focusWidget().setText(self._keyconfig.keyevent_to_keysquence(event).toString())
+
+    def on_ok_button_click(self):
+        '''okボタン押下
+        OKボタンかつデフォルト設定以外が選択されている場合は設定を保存する
+        '''
+        self._close_index = self._combo_config.currentIndex()
+        if 0 < self._close_index:
+            self._keyconfig.name = self._edit_name.text()
+            self._keyconfig.next = self._edit_next.text()
+            self._keyconfig.prev = self._edit_prev.text()
+            self._keyconfig.opacity = self._edit_opacity.text()
+            self._keyconfig.fit = self._edit_fit.text()
+            self._keyconfig.zoom_in = self._edit_zoom_in.text()
+            self._keyconfig.zoom_out = self._edit_zoom_out.text()
+            self._keyconfig.zoom_reset = self._edit_zoom_reset.text()
+            self._keyconfig.grid = self._edit_grid.text()
+            self._keyconfig.review_ok = self._edit_review_ok.text()
+            self._keyconfig.review_flag = self._edit_review_flag.text()
+            self._keyconfig.next_unreviewed = self._edit_next_unreviewed.text()
+            self._keyconfig.next_flagged = self._edit_next_flagged.text()
+            self._keyconfig.outline = self._edit_outline.text()
+            self._keyconfig.save()
+        self.setResult(QDialog.Accepted)
+        self.hide()
+
+    def on_cancel_button_click(self):
+        '''cancelボタン押下
+        ダイアログを非表示にする
+        '''
+        self.setResult(QDialog.Rejected)
+        self.hide()
+
+class ColorPickerKeyConfig():
+    '''キーコンフィグクラス
+    キーコンフィグを管理するクラス
+    実行ファイル直下に存在する key_config.json を読み込み初期化する
+    '''
+    __FILENAME = 'key_config.json'
+    __singleton = None
+    '''シングルトン
+    マルチスレッドには非対応
+    '''
+    DEFAULT_KEYS = {
+        'review_ok' : 'E',
+        'review_flag' : 'W',
+        'next_unreviewed' : 'S',
+        'next_flagged' : 'Shift+S',
+        'outline' : 'O',
+    }
+    '''後から追加したキーの既定値
+    以前のバージョンで保存した key_config.json には無いため、読み込み時に補う
+    '''
+
+    def __new__(cls):
+        '''__init__の前処理
+        一度だけインスタンスを生成する
+        '''
+        if cls.__singleton == None:
+            cls.__singleton = super().__new__(cls)
+        return cls.__singleton
+
+    def __init__(self):
+        '''コンストラクタ
+        '''
+        self._key_dic = {}
+        '''設定ファイル
+        読み込んだjsonをそのまま保持
+        '''
+        self._index = "0"
+        '''設定インデックス
+        設定1～6のインデックス（0はデフォルト設定）
+        '''
+
+        with open(self.__FILENAME, encoding = 'utf8') as f:
+            self._key_dic = json.load(f)
+            for keys in self._key_dic.values():
+                for name, key in self.DEFAULT_KEYS.items():
+                    keys.setdefault(name, key)
+            #for index in range(0, len(j)):
+            #    self._key_dic[str(index)] = {e : j[str(index)][e.value] for e in ColorPickerKey}
+
+    @property
+    def index(self):
+        return int(self._index)
+
+    @index.setter
+    def index(self, index):
+        if index <= self.count():
+            self._index = str(index)
+
+    @property
+    def next(self):
+        return self._key_dic[self._index]['next']
+    
+    @next.setter
+    def next(self, key):
+        self._key_dic[self._index]['next'] = key
+    
+    @property
+    def prev(self):
+        return self._key_dic[self._index]['prev']
+    
+    @prev.setter
+    def prev(self, key):
+        self._key_dic[self._index]['prev'] = key
+    
+    @property
+    def opacity(self):
+        return self._key_dic[self._index]['opacity']
+    
+    @opacity.setter
+    def opacity(self, key):
+        self._key_dic[self._index]['opacity'] = key
+
+    @property
+    def zoom_in(self):
+        return self._key_dic[self._index]['zoom_in']
+    
+    @zoom_in.setter
+    def zoom_in(self, key):
+        self._key_dic[self._index]['zoom_in'] = key
+    
+    @property
+    def zoom_out(self):
+        return self._key_dic[self._index]['zoom_out']
+    
+    @zoom_out.setter
+    def zoom_out(self, key):
+        self._key_dic[self._index]['zoom_out'] = key
+    
+    @property
+    def zoom_reset(self):
+        return self._key_dic[self._index]['zoom_reset']
+    
+    @zoom_reset.setter
+    def zoom_reset(self, key):
+        self._key_dic[self._index]['zoom_reset'] = key
+    
+    @property
+    def fit(self):
+        return self._key_dic[self._index]['fit']
+    
+    @fit.setter
+    def fit(self, key):
+        self._key_dic[self._index]['fit'] = key
+    
+    @property
+    def grid(self):
+        return self._key_dic[self._index]['grid']
+    
+    @grid.setter
+    def grid(self, key):
+        self._key_dic[self._index]['grid'] = key
+
+    @property
+    def review_ok(self):
+        return self._key_dic[self._index]['review_ok']
+    
+    @review_ok.setter
+    def review_ok(self, key):
+        self._key_dic[self._index]['review_ok'] = key
+
+    @property
+    def review_flag(self):
+        return self._key_dic[self._index]['review_flag']
+    
+    @review_flag.setter
+    def review_flag(self, key):
+        self._key_dic[self._index]['review_flag'] = key
+
+    @property
+    def next_unreviewed(self):
+        return self._key_dic[self._index]['next_unreviewed']
+    
+    @next_unreviewed.setter
+    def next_unreviewed(self, key):
+        self._key_dic[self._index]['next_unreviewed'] = key
+
+    @property
+    def next_flagged(self):
+        return self._key_dic[self._index]['next_flagged']
+    
+    @next_flagged.setter
+    def next_flagged(self, key):
+        self._key_dic[self._index]['next_flagged'] = key
+
+    @property
+    def outline(self):
+        return self._key_dic[self._index]['outline']
+    
+    @outline.setter
+    def outline(self, key):
+        self._key_dic[self._index]['outline'] = key
+    
+    @property
+    def name(self):
+        return self._key_dic[self._index]['name']
+    
+    @name.setter
+    def name(self, key):
+        self._key_dic[self._index]['name'] = key
+
+    def count(self):
+        '''コンフィグ設定数取得
+        コンフィグの設定上限数を取得する
+        '''
+        return len(self._key_dic)
+
+    def save(self):
+        '''設定保存
+        現在の情報を上書き保存する
+        '''
+        with open(self.__FILENAME, 'w', encoding = 'utf8') as f:
+            json.dump(self._key_dic, f, ensure_ascii = False, indent = 4, sort_keys = True)
+
+    def keyevent_to_keysquence(self, event):
+        '''QKeyEvent->文字列変換
+        QKeyEventをQKeySequenceに変換する
+
+        Args:
+            event (QKeyEvent): QKeyEvent
+        Return:
+            str: キー文字列
+        '''
+        modifier = ''
+        if (event.modifiers() & Qt.ShiftModifier):
+            modifier += "Shift+"
+        if (event.modifiers() & Qt.ControlModifier):
+        	modifier += "Ctrl+"
+        if (event.modifiers() & Qt.AltModifier):
+        	modifier += "Alt+"
+        if (event.modifiers() & Qt.MetaModifier):
+        	modifier += "Meta+"
+        key = QKeySequence(event.key()).toString()
+        return QKeySequence(modifier + key)
+
+if __name__ == '__main__':
+    '''メイン処理
+    スクリーンサイズに応じてウィンドウサイズを設定し
+    メインウィンドウを表示する
+    '''
+    app = QApplication(sys.argv)
+    app.setApplicationDisplayName('Color Picker')
+    # window size calc
+    s_size = app.desktop().availableGeometry().size()
+    w_size = QSize(int(s_size.width() * 9 / 10), int(s_size.height() * 9 / 10))
+    w_pos = QPoint(int((s_size.width() - w_size.width()) / 2), int((s_size.height() - w_size.height()) / 2))
+    main = MainWindow()
+    main.setGeometry(QRect(w_pos, w_size))
+    main.show()
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,175 @@
+import argparse
+import csv
+import json
+import os
+import sys
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from PyQt5.QtGui import QImage
+from PyQt5.QtGui import QImageReader
+
+from colorpicker import ColorPickerUtil
+from colorpicker import LabelArrayCache
+from colorpicker import ProjectManifest
+
+'''
+データセット検査ツール
+GUIを使わずに全media/data画像の組を検査し、結果をJSONもしくはCSVで出力する
+  - dataファイルが存在しない
+  - media/data画像のサイズが異なる
+  - config.json の colors に無い色（"?"）のピクセル数
+config.json の label_cache が true の場合、data画像は展開済みの配列ファイル（cache_dir/labels）から読む
+
+usage:
+    python dataset_check.py -m media -d data -c config.json -o result.json [-w 32]
+'''
+
+CSV_COLUMNS = ['media', 'data', 'status', 'media_width', 'media_height', 'data_width', 'data_height', 'unknown_pixels', 'unknown_colors']
+
+# ワーカープロセスごとの色テーブル（initializerで設定）
+_colors = None
+_names = None
+_labels = None
+
+def init_worker(color_dic, label_cache_dir = None, data_extension = '.png', label_cache_size = ColorPickerUtil.DEFAULT_LABEL_CACHE_SIZE):
+    '''ワーカー初期化
+    色テーブルを昇順の配列にしておき、画像ごとに二分探索で分類する
+
+    Args:
+        color_dic (dict): 色（0xRRGGBB） : オブジェクト名
+        label_cache_dir (:obj:`str`, optional): 展開済みdata画像の保存先（Noneの場合は毎回デコードする）
+        data_extension (:obj:`str`, optional): dataファイルの拡張子
+        label_cache_size (:obj:`int`, optional): 展開済みdata画像の合計上限（MB）
+    '''
+    global _colors, _names, _labels
+    keys = sorted(color_dic)
+    _colors = np.array(keys, dtype = np.uint32)
+    _names = [color_dic[k] for k in keys]
+    _labels = LabelArrayCache(label_cache_dir, (data_extension.lower(),), label_cache_size * 1024 * 1024) if label_cache_dir else None
+
+def load_data(data_filepath):
+    '''data画像読み込み
+
+    Args:
+        data_filepath (str): dataファイルパス
+    Return:
+        tuple: ((高さ, 幅) の uint32 配列, 配列が参照しているQImage)、読み込めない場合は (None, None)
+    '''
+    if _labels is not None:
+        return _labels.load_array(data_filepath), None
+    image = QImage(data_filepath)
+    if image.isNull(): return None, None
+    return ColorPickerUtil.qimage_to_array(image)
+
+def classify(rgb):
+    '''ピクセル分類
+    全ピクセルを一括で色テーブルと照合する
+
+    Args:
+        rgb (numpy.ndarray): 0xRRGGBB の uint32 配列
+    Return:
+        tuple: (クラスごとのピクセル数, 不明な色 : ピクセル数)
+    '''
+    rgb = rgb.ravel()
+    idx = np.searchsorted(_colors, rgb)
+    idx[idx == len(_colors)] = 0
+    known = _colors[idx] == rgb
+    counts = np.bincount(idx[known], minlength = len(_colors))
+    unknown_colors, unknown_counts = np.unique(rgb[~known], return_counts = True)
+    return (
+        {name : int(c) for name, c in zip(_names, counts) if c},
+        {'{:06X}'.format(int(c)) : int(n) for c, n in zip(unknown_colors, unknown_counts)}
+    )
+
+def check_pair(pair):
+    '''media/data画像の組を検査する
+    ワーカープロセスで実行される
+
+    Args:
+        pair (tuple): (mediaファイルパス, dataファイルパス)
+    Return:
+        dict: 検査結果
+    '''
+    media_filepath, data_filepath = pair
+    result = {'media' : media_filepath, 'data' : data_filepath, 'status' : 'ok'}
+    # mediaはヘッダーからサイズだけ読む
+    media_size = QImageReader(media_filepath).size()
+    result['media_width'] = media_size.width()
+    result['media_height'] = media_size.height()
+    if not data_filepath or not os.path.isfile(data_filepath):
+        result['status'] = 'missing'
+        return result
+    array, image = load_data(data_filepath)
+    if array is None:
+        result['status'] = 'unreadable'
+        return result
+    result['data_width'] = array.shape[1]
+    result['data_height'] = array.shape[0]
+    result['classes'], unknown = classify(array & 0x00FFFFFF)
+    result['unknown_pixels'] = sum(unknown.values())
+    result['unknown_colors'] = unknown
+    if (media_size.width(), media_size.height()) != (array.shape[1], array.shape[0]):
+        result['status'] = 'size_mismatch'
+    elif unknown:
+        result['status'] = 'unknown_color'
+    return result
+
+def write_json(filepath, results):
+    '''結果出力（JSON）
+    '''
+    summary = {}
+    for r in results:
+        summary[r['status']] = summary.get(r['status'], 0) + 1
+    with open(filepath, 'w', encoding = 'utf8') as f:
+        json.dump({'summary' : summary, 'images' : results}, f, ensure_ascii = False, indent = 1)
+
+def write_csv(filepath, results):
+    '''結果出力（CSV）
+    不明な色は "RRGGBB:ピクセル数" を空白区切りで出力する
+    '''
+    with open(filepath, 'w', encoding = 'utf8', newline = '') as f:
+        w = csv.DictWriter(f, CSV_COLUMNS, extrasaction = 'ignore')
+        w.writeheader()
+        for r in results:
+            row = dict(r)
+            row['unknown_colors'] = ' '.join('{}:{}'.format(c, n) for c, n in r.get('unknown_colors', {}).items())
+            w.writerow(row)
+
+def main(argv):
+    parser = argparse.ArgumentParser(description = 'check every media/data pair without GUI')
+    parser.add_argument('-m', '--media', required = True, help = 'media base directory')
+    parser.add_argument('-d', '--data', required = True, help = 'data base directory')
+    parser.add_argument('-c', '--config', required = True, help = 'config json file')
+    parser.add_argument('-o', '--output', required = True, help = 'result file (.json or .csv)')
+    parser.add_argument('-w', '--workers', type = int, default = os.cpu_count(), help = 'number of worker processes')
+    args = parser.parse_args(argv)
+
+    util = ColorPickerUtil()
+    util.load(args.config)
+    util.media_dir = args.media
+    util.data_dir = args.data
+    manifest = ProjectManifest(ProjectManifest.filepath_for(args.config))
+    manifest.load()
+    media_filepaths, data_filepaths = manifest.scan(args.media, util.media_extensions,
+        util.media_filepaths_to_data_filepaths, [args.data] + util.mapping)
+    manifest.save()
+
+    pairs = list(zip(media_filepaths, data_filepaths))
+    # プロセス間通信の回数を抑えるため、ワーカーあたり数十回に分けて渡す
+    chunksize = max(1, len(pairs) // (args.workers * 32))
+    with ProcessPoolExecutor(max_workers = args.workers, initializer = init_worker, initargs = (dict(util.color_dic), util.cache_dir if util.label_cache else None, util.data_extension, util.label_cache_size)) as executor:
+        results = list(executor.map(check_pair, pairs, chunksize = chunksize))
+
+    if args.output.lower().endswith('.csv'):
+        write_csv(args.output, results)
+    else:
+        write_json(args.output, results)
+    bad = sum(1 for r in results if r['status'] != 'ok')
+    print('{} images, {} with problems'.format(len(results), bad))
+    return 1 if bad else 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
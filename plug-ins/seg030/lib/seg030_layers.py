@@ -0,0 +1,144 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# layer normalization of seg030 without GIMP
+# shared by the seg030.py plugin (python 2) and build servers (python 3), numpy is optional
+# only for the plugin, which falls back to GIMP selections without it
+#
+# kept in plug-ins/seg030/lib, which GIMP does not query, the plugin adds it to sys.path
+#
+# usage:
+#   python plug-ins/seg030/lib/seg030_layers.py -o out_dir [-w 4] image1.npz image2.npz ...
+#   (one RGBA uint8 array of shape (height, width, 4) per layer, keyed by layer name)
+
+import argparse
+import os
+import struct
+import sys
+import zlib
+
+from multiprocessing import Pool
+
+try:
+  import numpy as np
+except ImportError:
+  np = None
+
+# layer name : layer color
+LAYER_COLORS = {
+  'A1' : (0, 255, 0),
+  'A2' : (255, 255, 0),
+  'A3' : (0, 0, 255),
+  'A4' : (255, 0, 0),
+  'C1' : (128, 0, 0),
+  'C2' : (0, 128, 0),
+  'C3' : (0, 0, 128),
+  'C4' : (128, 128, 128),
+  'D' : (255, 0, 255)
+}
+
+def layer_order(names):
+  # same order as seg030.sort_layers, top layer first: color layers by name, then the rest
+  return sorted(names, key=lambda name: name if name in LAYER_COLORS else 'z')
+
+def color_table():
+  # colors as little endian RGBA uint32 without alpha (0x00BBGGRR), sorted, and their layer names
+  names = sorted(LAYER_COLORS.keys())
+  colors = np.array([r | (g << 8) | (b << 16) for r, g, b in (LAYER_COLORS[n] for n in names)], dtype=np.uint32)
+  order = np.argsort(colors)
+  return colors[order], [names[i] for i in order]
+
+def move_misplaced(layers):
+  # move opaque pixels of another layer's color to that layer, in place
+  # layers: layer name : RGBA uint8 array (height, width, 4), all the same size
+  # returns the names of the layers that were changed
+  colors, owners = color_table()
+  pixels = dict((name, a.reshape(-1, 4).view('<u4').ravel()) for name, a in layers.items() if name in LAYER_COLORS)
+  dirty = set()
+  for name in owners:
+    if name not in pixels: continue
+    a = pixels[name]
+    # only opaque pixels of a foreign color are looked up in the color table
+    own = colors[owners.index(name)]
+    pos = np.flatnonzero((a > 0x00FFFFFF) & ((a & 0x00FFFFFF) != own))
+    rgb = a[pos] & 0x00FFFFFF
+    idx = np.searchsorted(colors, rgb)
+    idx[idx == len(colors)] = 0
+    known = colors[idx] == rgb
+    pos = pos[known]
+    if not len(pos): continue
+    # group the misplaced pixels by target layer
+    idx = idx[known]
+    order = np.argsort(idx, kind='mergesort')
+    pos = pos[order]
+    idx = idx[order]
+    bounds = np.flatnonzero(np.diff(idx)) + 1
+    for group, i in zip(np.split(pos, bounds), idx[np.r_[0, bounds]]):
+      target = owners[i]
+      if target not in pixels: continue
+      pixels[target][group] = a[group]
+      a[group] = 0
+      dirty.add(target)
+      dirty.add(name)
+  return dirty
+
+def flatten(layers):
+  # merge visible layers in layer_order (normal mode, straight alpha), like gimp_image_merge_visible_layers
+  names = layer_order(layers.keys())
+  h, w = layers[names[0]].shape[:2]
+  rgb = np.zeros((h, w, 3), dtype=np.float32)
+  alpha = np.zeros((h, w, 1), dtype=np.float32)
+  for name in reversed(names):
+    src = layers[name].astype(np.float32) / 255
+    sa = src[:, :, 3:]
+    out = sa + alpha * (1 - sa)
+    rgb = np.where(out > 0, (src[:, :, :3] * sa + rgb * alpha * (1 - sa)) / np.maximum(out, 1e-8), 0)
+    alpha = out
+  return (np.concatenate([rgb, alpha], axis=2) * 255).round().astype(np.uint8)
+
+def png_bytes(rgba):
+  # minimal RGBA 8bit PNG encoder, filter type 0 for every row
+  h, w = rgba.shape[:2]
+  raw = np.zeros((h, w * 4 + 1), dtype=np.uint8)
+  raw[:, 1:] = rgba.reshape(h, w * 4)
+  def chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xFFFFFFFF)
+  return (b'\x89PNG\r\n\x1a\n' +
+    chunk(b'IHDR', struct.pack('>IIBBBBB', w, h, 8, 6, 0, 0, 0)) +
+    chunk(b'IDAT', zlib.compress(raw.tobytes(), 6)) +
+    chunk(b'IEND', b''))
+
+def normalize(layers):
+  # move_misplaced then flatten, returns the merged RGBA array
+  move_misplaced(layers)
+  return flatten(layers)
+
+def normalize_file(args):
+  # worker: layers .npz -> merged .png
+  src, dst = args
+  with np.load(src) as npz:
+    layers = dict((name, np.ascontiguousarray(npz[name], dtype=np.uint8)) for name in npz.files)
+  with open(dst, 'wb') as f:
+    f.write(png_bytes(normalize(layers)))
+  return dst
+
+def main(argv):
+  parser = argparse.ArgumentParser(description='seg030 layer normalization without GIMP')
+  parser.add_argument('inputs', nargs='+', help='.npz files, one RGBA array per layer name')
+  parser.add_argument('-o', '--output', required=True, help='output directory for the merged png')
+  parser.add_argument('-w', '--workers', type=int, default=None, help='number of worker processes')
+  args = parser.parse_args(argv)
+
+  if not os.path.isdir(args.output): os.makedirs(args.output)
+  jobs = [(src, os.path.join(args.output, os.path.splitext(os.path.basename(src))[0] + '.png')) for src in args.inputs]
+  pool = Pool(args.workers)
+  try:
+    for dst in pool.imap_unordered(normalize_file, jobs):
+      print(dst)
+  finally:
+    pool.close()
+    pool.join()
+  return 0
+
+if __name__ == '__main__':
+  sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,226 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import sys
+import time
+import traceback
+from gimpfu import *
+
+# the color table and pixel logic are shared with the GIMP-less lib/seg030_layers.py
+# (GIMP only queries seg030.py in plug-ins/seg030, so the helper is not registered as a plug-in)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lib'))
+# np is None without numpy, then the selection based implementation is used
+from seg030_layers import LAYER_COLORS, move_misplaced, np
+
+# undo group decorator
+def undo(func):
+  def wrapper(*args, **kwargs):
+    args[0].undo_group_start()
+    func(*args, **kwargs)
+    args[0].undo_group_end()
+  return wrapper
+
+@undo
+def addLayer(image, drawable):
+  w = image.width
+  h = image.height
+  for dmg in reversed(sorted(LAYER_COLORS.keys())):
+    # skip existing layer
+    if pdb.gimp_image_get_layer_by_name(image, dmg): continue
+    layer = gimp.Layer(image, dmg, w, h, RGB_IMAGE, 100, NORMAL_MODE)
+    image.add_layer(layer, 0)
+    pdb.gimp_layer_add_alpha(layer)
+    pdb.gimp_edit_clear(layer)
+  sort_layers(image, drawable)
+
+@undo
+def exportPngPsd(image, drawable):
+
+  sort_layers(image, drawable)
+  move_correct_layer(image, drawable)
+
+  # save as png/psd
+  # get image filepath
+  filepath = pdb.gimp_image_get_filename(image)
+  # without extension
+  filepath = os.path.splitext(filepath)[0]
+  # save as png
+  # merge layers in memory, after remove the image in memory
+  tmpImage = pdb.gimp_image_duplicate(image)
+  layer = pdb.gimp_image_merge_visible_layers(tmpImage, CLIP_TO_IMAGE)
+  pdb.file_png_save_defaults(tmpImage, layer, filepath + '.png', filepath + '.png')
+  pdb.gimp_image_delete(tmpImage)
+  # save as psd
+  pdb.file_psd_save(image, drawable, filepath + '.psd', filepath + '.psd', 0, 0)
+
+def batchExport(filelist, summary):
+  # non-interactive: sort_layers, move_correct_layer and png/psd export for every
+  # file listed in filelist (one path per line), one json line per file to summary
+  with open(filelist) as f:
+    filepaths = [line.strip() for line in f if line.strip()]
+  with open(summary, 'w') as out:
+    for filepath in filepaths:
+      result = {'file' : filepath, 'status' : 'ok'}
+      t = time.time()
+      image = None
+      try:
+        image = pdb.gimp_file_load(filepath, filepath)
+        drawable = pdb.gimp_image_get_active_drawable(image) or image.layers[0]
+        exportPngPsd(image, drawable)
+      except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = '%s: %s' % (type(e).__name__, e)
+        result['traceback'] = traceback.format_exc()
+      finally:
+        if image is not None: pdb.gimp_image_delete(image)
+      result['sec'] = round(time.time() - t, 3)
+      out.write(json.dumps(result) + '\n')
+      out.flush()
+
+def move_correct_layer(image, drawable):
+  if np is None or not move_correct_layer_rgn(image, drawable):
+    move_correct_layer_select(image, drawable)
+
+def move_correct_layer_rgn(image, drawable):
+  # read every color layer once through a pixel region, classify all pixels
+  # against LAYER_COLORS in one pass and write the misplaced ones in bulk
+  # returns False when the layers can't be handled this way
+  w = image.width
+  h = image.height
+  layers = [layer for layer in image.layers if layer.name in LAYER_COLORS]
+  for layer in layers:
+    if layer.width != w or layer.height != h or layer.offsets != (0, 0): return False
+    if layer.bpp not in (3, 4): return False
+  pixels = {}
+  for layer in layers:
+    # cut leaves a transparent hole, so the layer needs alpha
+    if layer.bpp == 3: pdb.gimp_layer_add_alpha(layer)
+    rgn = layer.get_pixel_rgn(0, 0, w, h, False, False)
+    pixels[layer.name] = np.frombuffer(rgn[0:w, 0:h], dtype=np.uint8).reshape(h, w, 4).copy()
+
+  dirty = move_misplaced(pixels)
+
+  for layer in layers:
+    if layer.name not in dirty: continue
+    rgn = layer.get_pixel_rgn(0, 0, w, h, True, True)
+    rgn[0:w, 0:h] = pixels[layer.name].tobytes()
+    layer.flush()
+    layer.merge_shadow(True)
+    layer.update(0, 0, w, h)
+  return True
+
+def move_correct_layer_select(image, drawable):
+  for layer in image.layers:
+    # skip background
+    if not layer.name in LAYER_COLORS: continue
+    for k, c in LAYER_COLORS.items():
+      # skip own color
+      if k == layer.name: continue
+      pdb.gimp_image_select_color(image, 0, layer, c)
+      bounds = pdb.gimp_selection_bounds(image)
+      # exist invalid color bound
+      if bounds[0]:
+        pdb.gimp_edit_cut(layer)
+        toLayer = pdb.gimp_image_get_layer_by_name(image, k)
+        fsel = pdb.gimp_edit_paste(toLayer, False)
+        pdb.gimp_floating_sel_anchor(fsel)
+      pdb.gimp_selection_clear(image)
+
+def layer_pixels(image):
+  # layer name : pixels, color of fully transparent pixels is ignored
+  result = {}
+  for layer in image.layers:
+    rgn = layer.get_pixel_rgn(0, 0, layer.width, layer.height, False, False)
+    a = np.frombuffer(rgn[0:layer.width, 0:layer.height], dtype=np.uint8).reshape(layer.height, layer.width, layer.bpp).copy()
+    if layer.has_alpha: a[a[:, :, -1] == 0] = 0
+    result[layer.name] = a
+  return result
+
+def compareMoveCorrectLayer(image, drawable):
+  # run both implementations on copies of the image and report the time of each
+  if np is None:
+    pdb.gimp_message('numpy is not available, only the selection path can run')
+    return
+  results = []
+  for name, func in (('select', move_correct_layer_select), ('pixel region', move_correct_layer_rgn)):
+    dup = pdb.gimp_image_duplicate(image)
+    t = time.time()
+    func(dup, None)
+    results.append((name, time.time() - t, layer_pixels(dup)))
+    pdb.gimp_image_delete(dup)
+  message = ['%s: %.2f sec' % (name, sec) for name, sec, _ in results]
+  before = results[0][2]
+  after = results[1][2]
+  same = sorted(before) == sorted(after) and all(np.array_equal(before[k], after[k]) for k in before)
+  message.append('same result' if same else 'results differ')
+  pdb.gimp_message('\n'.join(message))
+
+def sort_layers(image, drawable):
+  # background to top
+  sortLayers = sorted(image.layers, key=lambda layer: layer.name if layer.name in LAYER_COLORS else "z")
+
+  # reorder layers
+  for i, layer in enumerate(sortLayers):
+    layer.visible = True
+    layer.linked = False
+    pdb.gimp_image_reorder_item(image, layer, None, i)
+
+#register old style
+register(
+  'python_fu_seg030_add_layer',
+  'add A1 to C4 layers',
+  'add A1 to C4 layers',
+  'nabedroid',
+  'nabedroid',
+  '2020',
+  '<Image>/seg030/Add Layer...',
+  'RGB*, GRAY*',
+  [],
+  [],
+  addLayer)
+
+register(
+  'python_fu_seg030_export',
+  'export as png/psd',
+  'export as png/psd',
+  'nabedroid',
+  'nabedroid',
+  '2020',
+  '<Image>/seg030/export...',
+  'RGB*, GRAY*',
+  [],
+  [],
+  exportPngPsd)
+
+register(
+  'python_fu_seg030_batch',
+  'export every listed xcf/psd as png/psd without ui',
+  'gimp -i -b \'(python-fu-seg030-batch RUN-NONINTERACTIVE "list.txt" "summary.jsonl")\' -b \'(gimp-quit 0)\'',
+  'nabedroid',
+  'nabedroid',
+  '2020',
+  '',
+  '',
+  [
+    (PF_STRING, 'filelist', 'text file with one image path per line', ''),
+    (PF_STRING, 'summary', 'result file, one json line per image', '')
+  ],
+  [],
+  batchExport)
+
+register(
+  'python_fu_seg030_compare_move',
+  'compare move_correct_layer implementations',
+  'compare move_correct_layer implementations',
+  'nabedroid',
+  'nabedroid',
+  '2020',
+  '<Image>/seg030/compare move...',
+  'RGB*, GRAY*',
+  [],
+  [],
+  compareMoveCorrectLayer)
+
+main()
\ No newline at end of file
@@ -0,0 +1,122 @@
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+'''
+seg030 一括エクスポート
+ディレクトリ内の .xcf/.psd を複数のGIMPプロセス（gimp -i -b）に振り分け、
+seg030.py の python_fu_seg030_batch（sort_layers, move_correct_layer, png/psd出力）を実行する
+ファイルごとの処理時間と失敗を集計してJSONで出力する
+plug-ins/seg030 をディレクトリごとGIMPのプラグインディレクトリに配置しておくこと（lib はGIMPから呼ばれない）
+
+usage:
+    python seg030_batch.py -i images -o summary.json [-w 4] [-g gimp-console-2.10]
+'''
+
+EXTENSIONS = ('.xcf', '.psd')
+
+def find_images(input_dir):
+    '''対象ファイル検索
+
+    Args:
+        input_dir (str): 検索するディレクトリ
+    Return:
+        list: .xcf/.psd ファイルパス（サイズの大きい順）
+    '''
+    filepaths = [os.path.abspath(fp) for fp in glob.glob(os.path.join(glob.escape(input_dir), '**', '*'), recursive = True)
+        if fp.lower().endswith(EXTENSIONS)]
+    # 大きいファイルから割り振ると各プロセスの終了時刻が揃いやすい
+    return sorted(filepaths, key = os.path.getsize, reverse = True)
+
+def split(filepaths, workers):
+    '''ファイルの振り分け
+    順番に配ることでプロセスごとの合計サイズを均す
+
+    Args:
+        filepaths (list): ファイルパス
+        workers (int): プロセス数
+    Return:
+        list: プロセスごとのファイルパスのリスト
+    '''
+    return [chunk for chunk in (filepaths[i::workers] for i in range(workers)) if chunk]
+
+def script_fu_string(s):
+    return '"' + s.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def start_gimp(gimp, filelist, summary):
+    '''GIMPプロセス起動
+
+    Args:
+        gimp (str): GIMPの実行ファイル
+        filelist (str): 処理するファイルの一覧
+        summary (str): 結果の出力先
+    Return:
+        subprocess.Popen: GIMPプロセス
+    '''
+    batch = '(python-fu-seg030-batch RUN-NONINTERACTIVE {} {})'.format(script_fu_string(filelist), script_fu_string(summary))
+    return subprocess.Popen([gimp, '-i', '-d', '-f', '-b', batch, '-b', '(gimp-quit 0)'])
+
+def read_summary(summary, filepaths):
+    '''結果読み込み
+    GIMPが途中で落ちた場合、出力されなかったファイルは失敗扱いにする
+
+    Args:
+        summary (str): GIMPが出力した結果（1行1ファイルのJSON）
+        filepaths (list): そのプロセスに割り振ったファイルパス
+    Return:
+        list: ファイルごとの結果
+    '''
+    results = []
+    if os.path.isfile(summary):
+        with open(summary, encoding = 'utf8') as f:
+            results = [json.loads(line) for line in f if line.strip()]
+    done = set(r['file'] for r in results)
+    results.extend({'file' : fp, 'status' : 'failed', 'error' : 'not processed (gimp exited)'} for fp in filepaths if fp not in done)
+    return results
+
+def main(argv):
+    parser = argparse.ArgumentParser(description = 'run seg030 export on every xcf/psd with several headless GIMP processes')
+    parser.add_argument('-i', '--input', required = True, help = 'directory searched for .xcf/.psd recursively')
+    parser.add_argument('-o', '--output', required = True, help = 'summary file (.json)')
+    parser.add_argument('-w', '--workers', type = int, default = os.cpu_count(), help = 'number of GIMP processes')
+    parser.add_argument('-g', '--gimp', default = 'gimp', help = 'GIMP executable')
+    args = parser.parse_args(argv)
+
+    filepaths = find_images(args.input)
+    chunks = split(filepaths, max(1, args.workers))
+    t = time.time()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        jobs = []
+        for i, chunk in enumerate(chunks):
+            filelist = os.path.join(tmp, 'files{}.txt'.format(i))
+            summary = os.path.join(tmp, 'summary{}.jsonl'.format(i))
+            with open(filelist, 'w', encoding = 'utf8') as f:
+                f.write('\n'.join(chunk) + '\n')
+            jobs.append((start_gimp(args.gimp, filelist, summary), summary, chunk))
+        for process, summary, chunk in jobs:
+            process.wait()
+            results.extend(read_summary(summary, chunk))
+
+    failed = [r for r in results if r['status'] != 'ok']
+    with open(args.output, 'w', encoding = 'utf8') as f:
+        json.dump({
+            'files' : len(results),
+            'failed' : len(failed),
+            'workers' : len(chunks),
+            'sec' : round(time.time() - t, 3),
+            'cpu_sec' : round(sum(r.get('sec', 0) for r in results), 3),
+            'images' : results
+        }, f, ensure_ascii = False, indent = 1)
+    for r in failed:
+        print('failed: {} {}'.format(r['file'], r.get('error', '')))
+    print('{} files, {} failed, {:.1f} sec'.format(len(results), len(failed), time.time() - t))
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
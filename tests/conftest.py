@@ -0,0 +1,6 @@
+import os
+import sys
+
+# colorpicker.py はリポジトリ直下の単一ファイルのため、パスを通して読み込む
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
@@ -0,0 +1,30 @@
+from colorpicker import FilenameIndex
+
+def make_index(count):
+    '''全ての名前が同じ文字で始まる連番の索引を作る
+    '''
+    index = FilenameIndex()
+    index.extend(['/data/img_{:06d}.jpg'.format(i) for i in range(count)])
+    return index
+
+def names(results):
+    return ['img_{:06d}'.format(pos) for pos, kind in results]
+
+def test_prefix_and_substring():
+    index = make_index(20000)
+    results = index.search('img_01234')
+    assert names(results)[:10] == ['img_{:06d}'.format(i) for i in range(12340, 12350)]
+    assert all(kind == FilenameIndex.PREFIX for pos, kind in results[:10])
+    assert index.search('2345')[0] == (2345, FilenameIndex.SUBSTRING)
+
+def test_fuzzy_substitution_with_shared_prefix():
+    results = make_index(20000).search('img_01234x')
+    # img_01234N はどれも1文字違い
+    assert (12345, FilenameIndex.FUZZY) in results[:10]
+
+def test_fuzzy_deletion_with_shared_prefix():
+    results = make_index(20000).search('img_12345')
+    assert results[0] == (12345, FilenameIndex.FUZZY)
+
+def test_fuzzy_ignores_short_query():
+    assert make_index(100).search('zzz') == []
@@ -0,0 +1,36 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+
+from colorpicker import ThumbnailCache
+
+def make_images(tmp_path, count):
+    '''media/dataの組を count 組作る
+    '''
+    pairs = []
+    for i in range(count):
+        media = str(tmp_path / '{:03d}.jpg'.format(i))
+        data = str(tmp_path / '{:03d}.png'.format(i))
+        image = QImage(640, 480, QImage.Format_RGB32)
+        image.fill(Qt.red)
+        image.save(media)
+        image.fill(Qt.green)
+        image.save(data)
+        pairs.append((media, data))
+    return pairs
+
+def test_clear_with_pending(tmp_path):
+    # ワーカー数より多く依頼しておき、作成待ちが残っている状態でクリアする
+    thumbnails = ThumbnailCache(workers = 1)
+    try:
+        for media, data in make_images(tmp_path, 20):
+            assert thumbnails.get(media, data) is None
+        thumbnails.clear()
+        assert thumbnails.get(media, data) is None
+    finally:
+        thumbnails.shutdown()
+
+def test_shutdown_with_pending(tmp_path):
+    thumbnails = ThumbnailCache(workers = 1)
+    for media, data in make_images(tmp_path, 20):
+        thumbnails.get(media, data)
+    thumbnails.shutdown()
@@ -1,44 +1,58 @@
-from PyQt5.QtCore import QVariant
-
-class TreeItem():
-
-    def __init__(self, data, parent=None):
-        # QVector<TreeItem>
-        # ぶら下がってるアイテム 行
-        self.m_childItems = []
-        # QVector<TreeItemData>
-        # 自身のアイテム 列
-        self.m_itemData = data
-        # parent TreeItem
-        self.m_parentItem = parent
-
-    def __del__(self):
-        pass
-        #self.qDeleteAll(m_childItems)
-
-    def appendChild(self, item):
-        self.m_childItems.append(item)
-
-    def child(self, row):
-        if row < 0 or row >= len(self.m_childItems):
-            return None
-        return self.m_childItems[row]
-
-    def childCount(self):
-        return len(self.m_childItems)
-
-    def columnCount(self):
-        return len(self.m_itemData)
-
-    def data(self, column):
-        if column < 0 or column >= len(self.m_itemData):
-            return QVariant()
-        return self.m_itemData[column]
-
-    def parentItem(self):
-        return self.m_parentItem
-
-    def row(self):
-        if self.m_parentItem:
-            return self.m_parentItem.m_childItems.index(self)
-        return 0
+from PyQt5.QtCore import QVariant
+
+class TreeItem():
+
+    # 10万ノード規模でもメモリを抑えるため __dict__ を持たない
+    __slots__ = ('m_childItems', 'm_itemData', 'm_parentItem', 'm_row', 'm_next', 'm_end')
+
+    def __init__(self, data, parent=None):
+        # QVector<TreeItem>
+        # ぶら下がってるアイテム 行
+        self.m_childItems = []
+        # QVector<TreeItemData>
+        # 自身のアイテム 列
+        self.m_itemData = data
+        # parent TreeItem
+        self.m_parentItem = parent
+        # 親の m_childItems での位置（appendChild で設定）
+        self.m_row = 0
+        # 未読み込みの子の位置（全て読み込み済みなら None）、子の範囲の終わり
+        # 位置の意味はモデル側で決める（TreeModel では行番号）
+        self.m_next = None
+        self.m_end = None
+
+    def __del__(self):
+        pass
+        #self.qDeleteAll(m_childItems)
+
+    def appendChild(self, item):
+        item.m_row = len(self.m_childItems)
+        self.m_childItems.append(item)
+
+    def canFetchMore(self):
+        return self.m_next is not None
+
+    def hasChildren(self):
+        return bool(self.m_childItems) or self.m_next is not None
+
+    def child(self, row):
+        if row < 0 or row >= len(self.m_childItems):
+            return None
+        return self.m_childItems[row]
+
+    def childCount(self):
+        return len(self.m_childItems)
+
+    def columnCount(self):
+        return len(self.m_itemData)
+
+    def data(self, column):
+        if column < 0 or column >= len(self.m_itemData):
+            return QVariant()
+        return self.m_itemData[column]
+
+    def parentItem(self):
+        return self.m_parentItem
+
+    def row(self):
+        return self.m_row
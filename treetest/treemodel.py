@@ -1,135 +1,184 @@
-from treeitem import TreeItem
-from PyQt5.QtCore import Qt
-from PyQt5.QtCore import QVariant
-from PyQt5.QtCore import QModelIndex
-from PyQt5.QtCore import QAbstractItemModel
-import sys
-from PyQt5.QtWidgets import QTreeView
-from PyQt5.QtWidgets import QPushButton
-from PyQt5.QtWidgets import QLabel
-from PyQt5.QtWidgets import QApplication
-
-class TreeModel(QAbstractItemModel):
-
-    def __init__(self, data, parent=None):
-        super().__init__(parent)
-        self.rootItem = TreeItem([self.tr('title'), self.tr('summary')])
-        self.setupModelData(data.split('\n'), self.rootItem)
-
-    def __del__(self):
-        # delete self.rootItem
-        pass
-
-    def columnCount(self, parent):
-        '''
-        QModelIndex.internalPointer() -> TreeItem
-        Args:
-            parent (QModelIndex): QModelIndex
-        '''
-        if parent.isValid():
-            return parent.internalPointer().columnCount()
-        return self.rootItem.columnCount()
-
-    def data(self, index, role):
-        if not index:
-            return QVariant()
-        if role != Qt.DisplayRole:
-            return QVariant()
-        item = index.internalPointer()
-
-        return item.data(index.column())
-
-    def flags(self, index):
-        if not index.isValid():
-            return Qt.NoItemFlags
-        return QAbstractItemModel.flags(self, index)
-
-    def headerData(self, section, orientation, role=Qt.DisplayRole):
-        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
-            return self.rootItem.data(section)
-        return QVariant()
-
-    def index(self, row, column, parent=QModelIndex()):
-        if not self.hasIndex(row, column, parent):
-            return QModelIndex()
-
-        parentItem = None
-
-        if not parent.isValid():
-            parentItem = self.rootItem
-        else:
-            parentItem = parent.internalPointer()
-        childItem = parentItem.child(row)
-        if childItem:
-            return self.createIndex(row, column, childItem)
-        return QModelIndex()
-
-    def parent(self, index):
-        if not index.isValid():
-            return QModelIndex()
-        childItem = index.internalPointer()
-        parentItem = childItem.parentItem()
-    
-        if parentItem == self.rootItem:
-            return QModelIndex()
-
-        return self.createIndex(parentItem.row(), 0, parentItem)
-
-    def rowCount(self, parent=QModelIndex()):
-        parentItem = None
-        if parent.column() > 0:
-            return 0
-        if not parent.isValid():
-            parentItem = self.rootItem
-        else:
-            parentItem = parent.internalPointer()
-
-        return parentItem.childCount()
-
-    def setupModelData(self, lines, parent):
-        parents = []
-        indentations = []
-        parents.append(parent)
-        indentations.append(0)
-
-        number = 0
-        while number < len(lines):
-            position = 0
-            while position < len(lines[number]):
-                if lines[number][position] != ' ':
-                    break
-                position = position + 1
-
-            lineData = lines[number][position:].strip()
-
-            if lineData:
-                # Read the column data from the rest of the line.
-                columnStrings = [x for x in lineData.split('\t') if x]
-                columnData = [None] * len(columnStrings)
-
-                for i, columnString in enumerate(columnStrings):
-                    columnData[i] = columnString
-                if position > indentations[-1]:
-                    # The last child of the current parent is now the new parent
-                    # unless the current parent has no children.
-                    if parents[-1].childCount() > 0:
-                        parents.append(parents[-1].child(parents[-1].childCount() - 1))
-                        indentations.append(position)
-                else:
-                    while position < indentations[-1] and len(parents) > 0:
-                        parents.pop(-1)
-                        indentations.pop(-1)
-
-                # Append a new item to the current parent's list of children.
-                parents[-1].appendChild(TreeItem(columnData, parents[-1]))
-            number = number + 1
-
-if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    with open('view/default.txt', 'r', encoding='utf8') as f:
-        model = TreeModel(f.read())
-    view = QTreeView()
-    view.setModel(model)
-    view.setWindowTitle("Simple Tree Model")
-    view.show()
-    sys.exit(app.exec())
+from treeitem import TreeItem
+from PyQt5.QtCore import Qt
+from PyQt5.QtCore import QVariant
+from PyQt5.QtCore import QModelIndex
+from PyQt5.QtCore import QAbstractItemModel
+import sys
+from PyQt5.QtWidgets import QTreeView
+from PyQt5.QtWidgets import QPushButton
+from PyQt5.QtWidgets import QLabel
+from PyQt5.QtWidgets import QApplication
+
+class TreeModel(QAbstractItemModel):
+
+    # fetchMore 1回で作るアイテム数
+    FETCH_SIZE = 256
+
+    def __init__(self, data, parent=None):
+        super().__init__(parent)
+        self.rootItem = TreeItem([self.tr('title'), self.tr('summary')])
+        self.setupModelData(data.split('\n'), self.rootItem)
+
+    def __del__(self):
+        # delete self.rootItem
+        pass
+
+    def columnCount(self, parent):
+        '''
+        QModelIndex.internalPointer() -> TreeItem
+        Args:
+            parent (QModelIndex): QModelIndex
+        '''
+        if parent.isValid():
+            return parent.internalPointer().columnCount()
+        return self.rootItem.columnCount()
+
+    def data(self, index, role):
+        if not index:
+            return QVariant()
+        if role != Qt.DisplayRole:
+            return QVariant()
+        item = index.internalPointer()
+
+        return item.data(index.column())
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return QAbstractItemModel.flags(self, index)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.rootItem.data(section)
+        return QVariant()
+
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+
+        parentItem = None
+
+        if not parent.isValid():
+            parentItem = self.rootItem
+        else:
+            parentItem = parent.internalPointer()
+        childItem = parentItem.child(row)
+        if childItem:
+            return self.createIndex(row, column, childItem)
+        return QModelIndex()
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        childItem = index.internalPointer()
+        parentItem = childItem.parentItem()
+    
+        if parentItem == self.rootItem:
+            return QModelIndex()
+
+        return self.createIndex(parentItem.row(), 0, parentItem)
+
+    def hasChildren(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return False
+        return self.itemFromIndex(parent).hasChildren()
+
+    def canFetchMore(self, parent):
+        if parent.column() > 0:
+            return False
+        return self.itemFromIndex(parent).canFetchMore()
+
+    def fetchMore(self, parent):
+        '''
+        未読み込みの子を FETCH_SIZE 件だけ読み込んで追加する
+        '''
+        parentItem = self.itemFromIndex(parent)
+        items = self.fetchChildren(parentItem, self.FETCH_SIZE)
+        if not items:
+            return
+        first = parentItem.childCount()
+        self.beginInsertRows(parent, first, first + len(items) - 1)
+        for item in items:
+            parentItem.appendChild(item)
+        self.endInsertRows()
+
+    def itemFromIndex(self, index):
+        if not index.isValid():
+            return self.rootItem
+        return index.internalPointer()
+
+    def rowCount(self, parent=QModelIndex()):
+        parentItem = None
+        if parent.column() > 0:
+            return 0
+        if not parent.isValid():
+            parentItem = self.rootItem
+        else:
+            parentItem = parent.internalPointer()
+
+        return parentItem.childCount()
+
+    def setupModelData(self, lines, parent):
+        '''
+        行ごとのインデントと、その行の子孫が続く範囲（その行が親の積み上げから外れる行）だけを求める
+        親の積み上げは従来の作り方と同じで、インデントが深くなったら直前の行を親に積み、浅くなったら親のインデントより浅い間だけ外す
+        アイテムは fetchMore で必要になった分だけ作る
+        '''
+        self.m_lines = []
+        self.m_indentations = []
+        for line in lines:
+            text = line.lstrip(' ')
+            lineData = text.strip()
+            if lineData:
+                self.m_lines.append(lineData)
+                self.m_indentations.append(len(line) - len(text))
+
+        count = len(self.m_lines)
+        self.m_ends = [number + 1 for number in range(count)]
+        # 親の行番号（ルートは None）と、その子のインデント
+        parents = [None]
+        indentations = [0]
+        for number, position in enumerate(self.m_indentations):
+            if position > indentations[-1]:
+                # 直前の行（現在の親の最後の子）が新しい親になる、親に子が無い（先頭行）場合を除く
+                if number > 0:
+                    parents.append(number - 1)
+                    indentations.append(position)
+                    self.m_ends[number - 1] = count
+            else:
+                while position < indentations[-1]:
+                    self.m_ends[parents.pop(-1)] = number
+                    indentations.pop(-1)
+
+        parent.m_next = 0 if count else None
+        parent.m_end = count
+
+    def fetchChildren(self, parentItem, count):
+        '''
+        parentItem の未読み込みの子を最大 count 件作る
+        子の子孫の行は m_ends で読み飛ばすので、作った件数分の処理で済む
+        '''
+        items = []
+        number = parentItem.m_next
+        while number is not None and number < parentItem.m_end and len(items) < count:
+            # Read the column data from the rest of the line.
+            columnData = [x for x in self.m_lines[number].split('\t') if x]
+            item = TreeItem(columnData, parentItem)
+            end = self.m_ends[number]
+            if number + 1 < end:
+                item.m_next = number + 1
+                item.m_end = end
+            items.append(item)
+            number = end
+        parentItem.m_next = number if number is not None and number < parentItem.m_end else None
+        return items
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    with open('view/default.txt', 'r', encoding='utf8') as f:
+        model = TreeModel(f.read())
+    view = QTreeView()
+    view.setModel(model)
+    view.setWindowTitle("Simple Tree Model")
+    view.show()
+    sys.exit(app.exec())
@@ -0,0 +1,87 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+from PyQt5.QtGui import QPainter
+from PyQt5.QtGui import QPen
+from PyQt5.QtGui import QPixmap
+
+class Compositor():
+    # keeps premultiplied media/data pixmaps and the grid overlay resident and blends them
+    # while painting the widget, so an alpha or grid change costs one repaint of the
+    # visible area instead of building (and copying) a full frame image
+
+    GRID_GAP = 20
+
+    def __init__(self, pen=None):
+        self._pen = pen if pen else QPen(Qt.DotLine)
+        self._media = None
+        self._data = None
+        self._grid_overlay = None
+        self._alpha = 0
+        self._grid = False
+
+    def set_images(self, media_image, data_image):
+        if media_image is None or data_image is None or media_image.isNull() or data_image.isNull():
+            self._media = self._data = None
+            return
+        self._media = self._to_pixmap(media_image)
+        self._data = self._to_pixmap(data_image)
+        if self._grid_overlay and self._grid_overlay.size() != self._data.size():
+            self._grid_overlay = None
+
+    @property
+    def media(self):
+        return self._media
+
+    @property
+    def data(self):
+        return self._data
+
+    @property
+    def alpha(self):
+        return self._alpha
+
+    @alpha.setter
+    def alpha(self, alpha):
+        self._alpha = min(max(alpha, 0), 1)
+
+    @property
+    def grid(self):
+        return self._grid
+
+    @grid.setter
+    def grid(self, grid):
+        self._grid = grid
+
+    def has_images(self):
+        return self._data is not None
+
+    def paint(self, painter):
+        # draws in image coordinates, scaling is left to the painter transform
+        if not self._data: return
+        painter.drawPixmap(0, 0, self._data)
+        if self._alpha > 0:
+            painter.setOpacity(self._alpha)
+            painter.drawPixmap(0, 0, self._media)
+            painter.setOpacity(1)
+        if self._grid:
+            painter.drawPixmap(0, 0, self.grid_overlay())
+
+    def grid_overlay(self):
+        # drawn once per image size and reused while toggling
+        if not self._grid_overlay:
+            w = self._data.width()
+            h = self._data.height()
+            self._grid_overlay = QPixmap(w, h)
+            self._grid_overlay.fill(Qt.transparent)
+            p = QPainter(self._grid_overlay)
+            p.setPen(self._pen)
+            for y in range(self.GRID_GAP, h, self.GRID_GAP):
+                p.drawLine(0, y, w, y)
+            p.end()
+        return self._grid_overlay
+
+    @staticmethod
+    def _to_pixmap(image):
+        if image.format() != QImage.Format_ARGB32_Premultiplied:
+            image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+        return QPixmap.fromImage(image)
@@ -1,12 +1,60 @@
-from PyQt5.QtCore import pyqtSignal
-from PyQt5.QtWidgets import QLabel
-
-class ImageLabel(QLabel):
-
-    size_change = pyqtSignal(int, int)
-
-    def __init__(self):
-        super().__init__()
-
-    def resizeEvent(self, e):
-        self.size_change.emit(e.size().width(), e.size().height())
\ No newline at end of file
+import math
+
+from PyQt5.QtCore import QPoint
+from PyQt5.QtCore import QPointF
+from PyQt5.QtCore import QTimer
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtGui import QPainter
+from PyQt5.QtGui import QTransform
+from PyQt5.QtWidgets import QLabel
+
+class ImageLabel(QLabel):
+
+    # emitted once the size has settled, not on every resize event
+    size_change = pyqtSignal(int, int)
+    RESIZE_DELAY = 100
+
+    def __init__(self):
+        super().__init__()
+        self._compositor = None
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(self.RESIZE_DELAY)
+        self._resize_timer.timeout.connect(lambda: self.size_change.emit(self.width(), self.height()))
+
+    @property
+    def compositor(self):
+        return self._compositor
+
+    @compositor.setter
+    def compositor(self, compositor):
+        self._compositor = compositor
+        self.update()
+
+    def transform(self):
+        # image pixel -> widget coordinates, the image is stretched over the contents rect
+        pixmap = self.pixmap()
+        if not pixmap or pixmap.isNull(): return QTransform()
+        cr = self.contentsRect()
+        t = QTransform.fromTranslate(cr.x(), cr.y())
+        return t.scale(cr.width() / pixmap.width(), cr.height() / pixmap.height())
+
+    def map_to_image(self, pos):
+        # widget -> image pixel coordinates of the original resolution image
+        p = self.transform().inverted()[0].map(QPointF(pos))
+        return QPoint(math.floor(p.x()), math.floor(p.y()))
+
+    def paintEvent(self, e):
+        # with an image loaded the layers are blended straight onto the widget
+        if not self._compositor or not self._compositor.has_images() or not self.pixmap():
+            super().paintEvent(e)
+            return
+        p = QPainter(self)
+        p.setClipRegion(e.region())
+        p.setTransform(self.transform())
+        self._compositor.paint(p)
+        p.end()
+
+    def resizeEvent(self, e):
+        super().resizeEvent(e)
+        self._resize_timer.start()
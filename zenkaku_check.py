@@ -1,24 +1,144 @@
-import glob
-import openpyxl as px
-
-wb = px.Workbook()
-ws = wb.active
-ws.title = 'result'
-
-filepaths = glob.glob('data/**/*.jpg', recursive=True)
-
-# Header
-ws.append(['#', 'ファイル', 'Serial', 'テキスト', '見つかった文字', '画像'])
-for i, w in enumerate([5, 50, 5, 30, 15, 30]):
-  col = px.utils.get_column_letter(i + 1)
-  ws.column_dimensions[col].width = w
-
-# body
-for r, fp in enumerate(filepaths, 2):
-  cols = [r - 1, fp, 999, 'TEXT TEXT TEXT', 'A B C', fp]
-  ws.append(cols)
-  img = px.drawing.image.Image(cols[5])
-  ws.add_image(img, 'F' + str(r))
-  ws.row_dimensions[r].height = img.height * 0.75 + 1
-
-wb.save('aaa.xlsx')
+import argparse
+import glob
+import io
+import os
+import re
+import sys
+import unicodedata
+
+from concurrent.futures import ProcessPoolExecutor
+
+import openpyxl as px
+from PIL import Image
+
+'''
+全角文字チェックのレポート作成
+画像と同名のテキストファイル（xxx.jpg -> xxx.txt）の各行から全角文字を探し、
+見つかった行ごとに1行、縮小した画像を貼り付けたExcelファイルを出力する
+  - 全角文字は Unicode の East Asian Width が F（Fullwidth）、W（Wide）の文字
+  - 画像ごとの検査はプロセスプールで並列に行う
+  - write_only モードで1行ずつ書き出す
+  - 縮小画像はプロセスプールで作成する
+  - 1ファイルあたりの行数を超えたら report_002.xlsx, report_003.xlsx ... に分ける
+
+usage:
+  python zenkaku_check.py -i data -o report.xlsx [-t .txt] [-e utf-8] [-s 200] [-r 1000] [-w 4]
+'''
+
+HEADER = ['#', 'ファイル', 'Serial', 'テキスト', '見つかった文字', '画像']
+COLUMN_WIDTHS = [5, 50, 5, 30, 15, 30]
+
+def zenkaku_ranges(first, last):
+  # 全角文字の連続区間 [(開始, 終了), ...]
+  ranges = []
+  start = None
+  for cp in range(first, last + 1):
+    if unicodedata.east_asian_width(chr(cp)) in ('F', 'W'):
+      if start is None: start = cp
+    elif start is not None:
+      ranges.append((start, cp - 1))
+      start = None
+  if start is not None: ranges.append((start, last))
+  return ranges
+
+def char_class(ranges):
+  return ''.join(re.escape(chr(a)) if a == b else '{}-{}'.format(re.escape(chr(a)), re.escape(chr(b))) for a, b in ranges)
+
+# 起動時に1度だけ作る
+# BMPは区間の文字クラス（reがビットマップにするので1文字数ns）、
+# BMP外は区間が細かく文字クラスが遅くなるため、まとめて拾ってから集合で判定する
+ZENKAKU_RE = re.compile('[' + char_class(zenkaku_ranges(0, 0xFFFF)) + '\U00010000-\U0003FFFF]+')
+ASTRAL_ZENKAKU = frozenset(chr(cp) for a, b in zenkaku_ranges(0x10000, 0x3FFFF) for cp in range(a, b + 1))
+
+def make_thumbnail(filepath, size):
+  # JPEGは draft で縮小デコードしてから仕上げる
+  try:
+    with Image.open(filepath) as img:
+      img.draft('RGB', (size, size))
+      img = img.convert('RGB')
+      img.thumbnail((size, size))
+      buf = io.BytesIO()
+      img.save(buf, 'JPEG', quality = 80)
+      return buf.getvalue()
+  except OSError:
+    return None
+
+def find_zenkaku(text):
+  # 全角文字を含む行の (行番号, 行, 見つかった文字) のリスト
+  # ファイル全体で1度検索し、見つかった場合のみ行ごとに調べる
+  if not ZENKAKU_RE.search(text): return []
+  found = []
+  for n, line in enumerate(text.splitlines(), 1):
+    runs = ZENKAKU_RE.findall(line)
+    if not runs: continue
+    chars = [c for c in dict.fromkeys(''.join(runs)) if c < '\U00010000' or c in ASTRAL_ZENKAKU]
+    if chars: found.append((n, line, ' '.join(chars)))
+  return found
+
+def check(filepath, text_ext, encoding, size):
+  # ワーカープロセスで実行される
+  # テキストファイルが無い場合は None、全角文字が見つかった場合のみ縮小画像も作る
+  try:
+    with open(os.path.splitext(filepath)[0] + text_ext, encoding = encoding, errors = 'replace') as f:
+      found = find_zenkaku(f.read())
+  except OSError:
+    return None, None
+  return found, make_thumbnail(filepath, size) if found else None
+
+def part_filepath(output, part):
+  if part == 1: return output
+  base, ext = os.path.splitext(output)
+  return '{}_{:03d}{}'.format(base, part, ext)
+
+def new_sheet(size):
+  wb = px.Workbook(write_only = True)
+  ws = wb.create_sheet('result')
+  for i, w in enumerate(COLUMN_WIDTHS):
+    ws.column_dimensions[px.utils.get_column_letter(i + 1)].width = w
+  # write_only では行ごとに高さを設定できないので、縮小画像に合わせた既定の高さにする
+  ws.sheet_format.defaultRowHeight = size * 0.75 + 1
+  ws.sheet_format.customHeight = True
+  ws.append(HEADER)
+  return wb, ws
+
+def main(argv):
+  parser = argparse.ArgumentParser(description = 'full-width character check report')
+  parser.add_argument('-i', '--input', required = True, help = 'directory searched for *.jpg recursively')
+  parser.add_argument('-o', '--output', required = True, help = 'report file (.xlsx)')
+  parser.add_argument('-t', '--text-ext', default = '.txt', help = 'extension of the transcription next to each image')
+  parser.add_argument('-e', '--encoding', default = 'utf-8', help = 'encoding of the transcription files')
+  parser.add_argument('-s', '--size', type = int, default = 200, help = 'thumbnail size in pixels')
+  parser.add_argument('-r', '--rows', type = int, default = 1000, help = 'max rows per workbook')
+  parser.add_argument('-w', '--workers', type = int, default = os.cpu_count(), help = 'number of worker processes')
+  args = parser.parse_args(argv)
+
+  filepaths = sorted(glob.glob(os.path.join(glob.escape(args.input), '**', '*.jpg'), recursive = True))
+  chunksize = max(1, len(filepaths) // (args.workers * 32))
+  n = len(filepaths)
+  wb = ws = None
+  part = 0
+  i = 0
+  missing = 0
+  with ProcessPoolExecutor(max_workers = args.workers) as executor:
+    results = executor.map(check, filepaths, [args.text_ext] * n, [args.encoding] * n, [args.size] * n, chunksize = chunksize)
+    for fp, (found, thumbnail) in zip(filepaths, results):
+      if found is None:
+        missing += 1
+        continue
+      for j, (serial, text, chars) in enumerate(found):
+        r = i % args.rows + 2
+        if r == 2:
+          if wb: wb.save(part_filepath(args.output, part))
+          part += 1
+          wb, ws = new_sheet(args.size)
+        i += 1
+        ws.append([i, fp, serial, text, chars, fp])
+        # 縮小画像は画像ごとの最初の行にだけ貼る
+        if j == 0 and thumbnail:
+          ws.add_image(px.drawing.image.Image(io.BytesIO(thumbnail)), 'F' + str(r))
+  if wb: wb.save(part_filepath(args.output, part))
+  print('{} images, {} without text, {} lines with zenkaku, {} files'.format(n, missing, i, part))
+  return 1 if i else 0
+
+if __name__ == '__main__':
+  sys.exit(main(sys.argv[1:]))